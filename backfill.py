@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, timezone
+from selenium.webdriver.common.by import By
+
+from browser_profile import record_page_weight
+from date_normalizer import parse_timestamp
+from event_record import EventRecord
+from extraction import EVENT_SELECTOR, extract_events_bulk
+from location_resolver import resolve_coordinates
+from metrics import metrics
+from rate_limit import throttle
+from site_config import region_url
+from seen_index import INCREMENTAL, SeenIndex, event_key
+from waits import wait_for_element, wait_for_page_ready, wait_until
+
+logger = logging.getLogger(__name__)
+
+# Nodes already extracted carry this attribute, so each batch only reads new ones
+DONE_ATTR = "data-lum-done"
+PENDING_SELECTOR = f"{EVENT_SELECTOR}:not([{DONE_ATTR}])"
+# Extracted nodes kept in the DOM; older ones are removed to bound page memory
+KEEP_RENDERED = 60
+MAX_IDLE_SCROLLS = 3
+MAX_BATCHES = 500
+SCROLL_WAIT = 3
+
+SCROLL_FEED_JS = """
+var scroller = document.querySelector("div.scroller");
+var nodes = document.querySelectorAll(arguments[0]);
+if (nodes.length) { nodes[nodes.length - 1].scrollIntoView({block: "end"}); }
+if (scroller) { scroller.scrollTop = scroller.scrollHeight; }
+"""
+
+PRUNE_JS = """
+var done = document.querySelectorAll("[" + arguments[0] + "]");
+var excess = done.length - arguments[1];
+for (var i = 0; i < excess; i++) { done[i].parentNode.removeChild(done[i]); }
+return Math.max(excess, 0);
+"""
+
+COUNT_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+
+def backfill_region(driver, subdomain, horizon, emit=None, keep_rendered=KEEP_RENDERED, max_batches=MAX_BATCHES):
+    """Scroll a region's feed, extracting new events batch by batch until `horizon` or a known event."""
+    url = region_url(subdomain)
+    logger.info(f"Backfilling {url} back to {horizon}.")
+
+    throttle(url)
+    with metrics.timer("page load"):
+        driver.get(url)
+        wait_for_page_ready(driver)
+    wait_for_element(driver, (By.CLASS_NAME, "scroller"), name="feed scroller")
+    record_page_weight(driver, subdomain)
+
+    seen = SeenIndex(subdomain) if INCREMENTAL else None
+    event_data_list = []
+    stop_reason = None
+    unresolved = 0
+    pruned = 0
+    idle_scrolls = 0
+    batches = 0
+
+    while batches < max_batches:
+        with metrics.timer("extraction", mode="bulk"):
+            records = extract_events_bulk(driver, PENDING_SELECTOR, mark=DONE_ATTR) or []
+        if records:
+            idle_scrolls = 0
+            batches += 1
+            page_coordinates = resolve_coordinates(driver, records)
+
+            for record, coordinates in zip(records, page_coordinates):
+                event_data = EventRecord.from_fields(subdomain, record, None, coordinates=coordinates)
+                # Normalized time, so an exact timestamp in the page beats the relative date
+                moment = parse_timestamp(event_data.time)
+                if moment is not None and datetime.now(timezone.utc) - moment > horizon:
+                    stop_reason = f"reached horizon at '{record['date']}'"
+                    break
+                if seen is not None and event_key(record) in seen:
+                    stop_reason = "reached an already-seen event"
+                    break
+                if coordinates is None:
+                    unresolved += 1
+                # Not added to `seen` here; the caller does that once the region is stored
+                event_data.seen_key = event_key(record)
+                event_data_list.append(event_data)
+                metrics.incr("events scraped", region=subdomain)
+                if emit:
+                    emit(event_data)
+
+            if stop_reason:
+                break
+            pruned += driver.execute_script(PRUNE_JS, DONE_ATTR, keep_rendered) or 0
+        else:
+            idle_scrolls += 1
+            if idle_scrolls > MAX_IDLE_SCROLLS:
+                stop_reason = "feed stopped loading new events"
+                break
+
+        driver.execute_script(SCROLL_FEED_JS, EVENT_SELECTOR)
+        wait_until(
+            driver, lambda d: d.execute_script(COUNT_JS, PENDING_SELECTOR) > 0, "feed backfill load",
+            timeout=SCROLL_WAIT, raise_on_timeout=False
+        )
+
+    stop_reason = stop_reason or f"batch limit ({max_batches})"
+
+    logger.info(
+        f"✅ {subdomain}: backfilled {len(event_data_list)} events in {batches} batches ({stop_reason}); "
+        f"{unresolved} without page location, {pruned} nodes pruned."
+    )
+    return event_data_list
@@ -0,0 +1,266 @@
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import importlib.util
+import subprocess
+import tracemalloc
+from functools import partial
+
+from fixture_server import EVENTS_PER_REGION, FIXTURE_DIR, FIXTURE_REGIONS, FixtureSite, start_fixture_server, use_fixture_site
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+SCENARIOS = ["startup", "discovery", "dynamic", "china", "backfill"]
+HEAVY_MODULES = ["selenium", "pymongo", "urllib3", "webdriver_manager"]
+IMPORT_PROBE = (
+    "import json, sys, time; started = time.perf_counter(); import dynamic_scraper; "
+    "print(json.dumps({'seconds': time.perf_counter() - started, "
+    "'loaded': [m for m in %r if m in sys.modules]}))" % HEAVY_MODULES
+)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_china_scraper():
+    # The filename has a hyphen, so it can't be imported by name
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "china_scraper-csv.py")
+    spec = importlib.util.spec_from_file_location("china_scraper_csv", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _measure(name, fn):
+    """Run fn() under tracemalloc; fn returns (events, per-region timings)."""
+    from metrics import metrics
+
+    metrics.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        events, regions = fn()
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    seconds = time.perf_counter() - start
+    result = {
+        "seconds": round(seconds, 3),
+        "events": events,
+        "events_per_sec": round(events / seconds, 2) if seconds > 0 else None,
+        "peak_python_mb": round(peak / 2 ** 20, 2),
+        "regions": regions,
+        "stages": metrics.summary()["timers"],
+    }
+    logger.info(f"⏱️ {name}: {events} events in {seconds:.2f}s ({result['events_per_sec']} events/s).")
+    return result
+
+
+def startup_probe(base_url, subdomain):
+    """Import cost of dynamic_scraper and time to first request for a fresh CSV/HTTP-only CLI run."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here, LIVEUAMAP_REGION_URL=base_url + "/{subdomain}/",
+               LIVEUAMAP_HOME_URL=base_url + "/")
+    probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, text=True)
+    imported = json.loads(probe.stdout.strip().splitlines()[-1]) if probe.returncode == 0 else {}
+
+    metrics_path = os.path.abspath("startup-metrics.json")
+    start = time.perf_counter()
+    run = subprocess.run(
+        [sys.executable, os.path.join(here, "dynamic_scraper.py"), "--regions", subdomain, "--output", "jsonl",
+         "--tier", "http", "--metrics-out", metrics_path],
+        env=env, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    startup = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path, encoding="utf-8") as f:
+            startup = json.load(f).get("startup", {})
+    result = {
+        "seconds": round(seconds, 3),
+        "import_seconds": round(imported.get("seconds", 0), 4) if imported else None,
+        "heavy_modules_at_import": imported.get("loaded"),
+        "first_request_seconds": startup.get("first request"),
+        "exit_code": run.returncode,
+    }
+    logger.info(
+        f"⏱️ startup: import {result['import_seconds']}s (loaded {result['heavy_modules_at_import']}), "
+        f"first request after {result['first_request_seconds']}s, whole run {seconds:.2f}s."
+    )
+    return result
+
+
+def _timed_region_runs(pool, subdomains, scrape_fn, workers):
+    from concurrent_scrape import scrape_regions_concurrently
+
+    timings = {}
+
+    def timed(driver, subdomain):
+        start = time.perf_counter()
+        events = scrape_fn(driver, subdomain)
+        timings[subdomain] = {"seconds": round(time.perf_counter() - start, 3), "events": len(events)}
+        return events
+
+    counts = scrape_regions_concurrently(pool, subdomains, timed, workers=workers, on_result=lambda *_: None)
+    return sum(counts.values()), timings
+
+
+def run_benchmark(subdomains, scenarios=SCENARIOS, workers=1, events_per_region=EVENTS_PER_REGION,
+                  embed_coordinates=True, fixture_dir=FIXTURE_DIR):
+    site = FixtureSite(events_per_region=events_per_region, embed_coordinates=embed_coordinates,
+                       fixture_dir=fixture_dir)
+    server, base_url = start_fixture_server(site)
+    use_fixture_site(base_url)
+
+    # Deferred so the fixture URLs and throwaway state dir are in place before the scrapers load
+    from driver_pool import DriverPool
+    from dynamic_scraper import get_available_regions, scrape_region
+
+    results = {}
+    if "startup" in scenarios:
+        results["startup"] = startup_probe(base_url, subdomains[0])
+
+    pool = DriverPool(size=workers)
+    try:
+        if set(scenarios) - {"startup"}:
+            pool.warm()
+        if "discovery" in scenarios:
+            def discovery():
+                start = time.perf_counter()
+                regions = get_available_regions(pool)
+                return len(regions), {"home": {"seconds": round(time.perf_counter() - start, 3),
+                                               "events": len(regions)}}
+            results["discovery"] = _measure("discovery", discovery)
+            results["discovery"]["unit"] = "regions"
+
+        if "dynamic" in scenarios:
+            results["dynamic"] = _measure(
+                "dynamic", lambda: _timed_region_runs(pool, subdomains, scrape_region, workers)
+            )
+
+        if "china" in scenarios:
+            china = _load_china_scraper()
+
+            def china_run():
+                timings = {}
+                total = 0
+                for subdomain in subdomains:
+                    start = time.perf_counter()
+                    china.visit_liveumap(subdomain, pool)
+                    events = 0
+                    if os.path.exists(f"{subdomain}_events.csv"):
+                        with open(f"{subdomain}_events.csv", encoding="utf-8") as f:
+                            events = max(0, sum(1 for _ in f) - 1)
+                    timings[subdomain] = {"seconds": round(time.perf_counter() - start, 3), "events": events}
+                    total += events
+                return total, timings
+            results["china"] = _measure("china", china_run)
+
+        if "backfill" in scenarios:
+            from backfill import backfill_region
+            from date_normalizer import parse_duration
+
+            scrape_fn = partial(backfill_region, horizon=parse_duration("365d"))
+            results["backfill"] = _measure(
+                "backfill", lambda: _timed_region_runs(pool, subdomains, scrape_fn, workers)
+            )
+    finally:
+        pool.close()
+        server.shutdown()
+    return results
+
+
+def compare(current, baseline):
+    """Log the change in throughput and wall time per scenario against an earlier result."""
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("seconds"):
+            logger.info(f"{name}: no baseline.")
+            continue
+        speedup = before["seconds"] / result["seconds"] if result["seconds"] else float("inf")
+        logger.info(
+            f"{name}: {before['seconds']:.2f}s -> {result['seconds']:.2f}s ({speedup:.2f}x), "
+            f"{before.get('events_per_sec')} -> {result.get('events_per_sec')} events/s, "
+            f"peak python {before.get('peak_python_mb')} -> {result.get('peak_python_mb')} MB"
+        )
+
+
+def latest_result(directory=RESULTS_DIR):
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")))
+    if not paths:
+        return None
+    with open(paths[-1], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers end to end against the offline fixture site.")
+    parser.add_argument("--regions", default=",".join(r["subdomain"] for r in FIXTURE_REGIONS[:3]),
+                        help="comma-separated fixture subdomains")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--events-per-region", type=int, default=EVENTS_PER_REGION)
+    parser.add_argument("--no-coordinates", action="store_true",
+                        help="leave coordinates out of the pages so every location needs the click fallback")
+    parser.add_argument("--compare", metavar="RESULT_JSON", help="baseline result (default: latest saved result)")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    results_dir = os.path.abspath(args.results_dir)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        baseline = latest_result(results_dir)
+
+    # Scrapers write CSVs and seen-index state relative to the working directory; keep the tree clean
+    revision = _git_revision()
+    fixture_dir = os.path.abspath(FIXTURE_DIR)
+    workdir = tempfile.mkdtemp(prefix="liveuamap-bench-")
+    os.environ["LIVEUAMAP_STATE_DIR"] = os.path.join(workdir, "state")
+    os.environ["LIVEUAMAP_INCREMENTAL"] = "0"
+    os.chdir(workdir)
+
+    subdomains = [s.strip() for s in args.regions.split(",") if s.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": revision,
+        "config": {
+            "regions": subdomains,
+            "workers": args.workers,
+            "events_per_region": args.events_per_region,
+            "coordinates": not args.no_coordinates,
+        },
+        "scenarios": run_benchmark(subdomains, scenarios, args.workers, args.events_per_region,
+                                   embed_coordinates=not args.no_coordinates, fixture_dir=fixture_dir),
+        # ru_maxrss is KiB on Linux; the browser runs in grandchild processes and isn't counted
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    logger.info(f"✅ Benchmark results saved to {path}")
+
+    if baseline:
+        compare(result, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
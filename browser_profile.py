@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import logging
+import time
+from urllib.parse import quote
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LEAN_PROFILE = os.environ.get("LIVEUAMAP_LEAN", "1") != "0"
+# Hosts the feed and marker scripts load from; everything else is refused. Subdomains match too.
+ALLOWED_HOSTS = ["liveuamap.com", "localhost", "127.0.0.1", "ajax.googleapis.com", "code.jquery.com",
+                 "cdnjs.cloudflare.com", "cdn.jsdelivr.net", "unpkg.com"]
+ALLOWED_HOSTS += [h.strip() for h in os.environ.get("LIVEUAMAP_ALLOW_HOSTS", "").split(",") if h.strip()]
+# Nothing listens on the discard port, so requests routed here fail immediately
+BLACKHOLE_PROXY = "PROXY 127.0.0.1:9"
+
+LEAN_PREFERENCES = {
+    # Images (event pictures, map tiles, marker icons): <img src> stays in the DOM, the bytes aren't fetched
+    "permissions.default.image": 2,
+    # Audio/video and web fonts
+    "media.autoplay.default": 5,
+    "media.autoplay.blocking_policy": 2,
+    "media.play-stand-alone": False,
+    "media.peerconnection.enabled": False,
+    "gfx.downloadable_fonts.enabled": False,
+    "browser.display.use_document_fonts": 0,
+    # Speculative and background traffic
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "network.predictor.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "app.update.auto": False,
+    "toolkit.telemetry.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "extensions.pocket.enabled": False,
+    # Ads, analytics and social widgets that slip through the host allowlist
+    "privacy.trackingprotection.enabled": True,
+    "privacy.trackingprotection.socialtracking.enabled": True,
+    "privacy.trackingprotection.cryptomining.enabled": True,
+    "privacy.trackingprotection.fingerprinting.enabled": True,
+    "dom.webnotifications.enabled": False,
+    "geo.enabled": False,
+}
+
+# Resource timing for the current page; blocked requests never show up here
+PAGE_WEIGHT_JS = """
+var nav = performance.getEntriesByType("navigation")[0];
+var resources = performance.getEntriesByType("resource");
+var bytes = nav ? (nav.transferSize || nav.encodedBodySize || 0) : 0;
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || resources[i].encodedBodySize || 0;
+}
+var images = document.images, unloaded = 0;
+for (var j = 0; j < images.length; j++) {
+    if (!images[j].complete || images[j].naturalWidth === 0) { unloaded++; }
+}
+return {
+    requests: resources.length + (nav ? 1 : 0),
+    bytes: bytes,
+    complete_ms: nav ? Math.round(nav.domComplete) : null,
+    images_not_loaded: unloaded
+};
+"""
+
+
+def pac_script(allowed_hosts=ALLOWED_HOSTS):
+    hosts = json.dumps(allowed_hosts)
+    return (
+        "function FindProxyForURL(url, host) {"
+        f" var allowed = {hosts};"
+        " for (var i = 0; i < allowed.length; i++) {"
+        "  if (host === allowed[i] || dnsDomainIs(host, '.' + allowed[i])) { return 'DIRECT'; }"
+        " }"
+        f" return '{BLACKHOLE_PROXY}';"
+        "}"
+    )
+
+
+def apply_lean_profile(options, allowed_hosts=ALLOWED_HOSTS):
+    """Set Firefox preferences that skip images, media, fonts and any host outside the allowlist."""
+    for name, value in LEAN_PREFERENCES.items():
+        options.set_preference(name, value)
+    options.set_preference("network.proxy.type", 2)
+    options.set_preference("network.proxy.autoconfig_url", "data:text/javascript," + quote(pac_script(allowed_hosts)))
+    return options
+
+
+def page_weight(driver):
+    try:
+        return driver.execute_script(PAGE_WEIGHT_JS)
+    except Exception as e:
+        logger.debug(f"Could not read resource timing: {e}")
+        return None
+
+
+def record_page_weight(driver, region):
+    """Add the loaded page's requests and bytes to the run metrics."""
+    weight = page_weight(driver)
+    if not weight:
+        return None
+    metrics.incr("page requests", weight["requests"], region=region)
+    metrics.incr("page bytes", weight["bytes"], region=region)
+    if weight.get("complete_ms") is not None:
+        metrics.observe("dom complete", weight["complete_ms"] / 1000, region=region)
+    logger.info(
+        f"📦 {region}: {weight['requests']} requests, {weight['bytes'] / 1024:.0f} KiB, "
+        f"DOM complete at {weight['complete_ms']} ms."
+    )
+    return weight
+
+
+def compare_profiles(subdomains, page_wait=5):
+    """Load each region with the full and lean profiles and report what the lean one saves."""
+    from driver_pool import initialize_driver
+    from site_config import region_url
+    from waits import wait_for_network_idle, wait_for_page_ready
+
+    results = {subdomain: {} for subdomain in subdomains}
+    for profile, lean in [("full", False), ("lean", True)]:
+        driver = initialize_driver(lean=lean)
+        try:
+            for subdomain in subdomains:
+                start = time.perf_counter()
+                driver.get(region_url(subdomain))
+                wait_for_page_ready(driver)
+                ready = time.perf_counter() - start
+                # Let late XHRs, tiles and ads arrive so the byte count covers the whole page
+                wait_for_network_idle(driver, name=f"{profile} network idle", timeout=page_wait)
+                weight = page_weight(driver) or {}
+                weight["ready_seconds"] = round(ready, 3)
+                results[subdomain][profile] = weight
+        finally:
+            driver.quit()
+
+    for subdomain, profiles in results.items():
+        full, lean = profiles.get("full") or {}, profiles.get("lean") or {}
+        if not full or not lean:
+            continue
+        profiles["saved"] = {
+            "requests": full.get("requests", 0) - lean.get("requests", 0),
+            "bytes": full.get("bytes", 0) - lean.get("bytes", 0),
+            "ready_seconds": round(full["ready_seconds"] - lean["ready_seconds"], 3),
+        }
+        saved = profiles["saved"]
+        logger.info(
+            f"📦 {subdomain}: saved {saved['requests']} requests and {saved['bytes'] / 1024:.0f} KiB; "
+            f"readyState complete {full['ready_seconds']:.2f}s -> {lean['ready_seconds']:.2f}s."
+        )
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    regions = sys.argv[1].split(",") if len(sys.argv) > 1 else ["pirates"]
+    print(json.dumps(compare_profiles(regions), indent=2))
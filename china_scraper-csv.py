@@ -1,16 +1,22 @@
-import os
-import logging
 import time
+_import_started = time.perf_counter()
+
+import sys
+import logging
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
-from webdriver_manager.firefox import GeckoDriverManager
-from selenium.common.exceptions import ElementClickInterceptedException
+from browser_profile import record_page_weight
+from driver_pool import DriverPool, initialize_driver
+from event_record import EventRecord
+from location_resolver import resolve_coordinates
+from metrics import metrics
+from rate_limit import throttle
+from site_config import region_url
+from sinks import mongo_db
+from stream_writer import StreamingWriter
+from seen_index import INCREMENTAL, SeenIndex, event_key, select_new_events
+
+# Selenium and the modules built on it (extraction, waits) are imported inside the functions
+# that drive the browser, so importing this script (e.g. from benchmark.py) stays cheap.
 
 # from pymongo import MongoClient
 
@@ -18,58 +24,21 @@ from selenium.common.exceptions import ElementClickInterceptedException
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-geckodriver_path = r'C:\Users\aarus\Downloads\geckodriver-v0.36.0-win64\geckodriver.exe'
+# Startup cost up to here; time to first request is marked when the first page is throttled
+IMPORT_SECONDS = time.perf_counter() - _import_started
+metrics.process_started = _import_started
 
 # # MongoDB configuration
 # mongo_client = MongoClient("mongodb://localhost:27017/")  
 # db = mongo_client["liveuamap"]
 
-import csv
-
-def save_to_csv(data, filename="scraped_events.csv"):
-    if not data:
-        logger.info("No data to save.")
-        return
-
-    keys = data[0].keys()
-
-    with open(filename, 'w', newline='', encoding='utf-8') as output_file:
-        dict_writer = csv.DictWriter(output_file, fieldnames=keys)
-        dict_writer.writeheader()
-        dict_writer.writerows(data)
-
-    logger.info(f"Saved {len(data)} events to {filename}")
-
-def setup_firefox_service():
-    try:
-        if os.path.exists(geckodriver_path):
-            return FirefoxService(geckodriver_path)
-        else:
-            raise FileNotFoundError(f"GeckoDriver not found at {geckodriver_path}")
-    except WebDriverException as e:
-        logger.error("Error setting up Firefox service: %s", e)
-        raise
-
-def initialize_driver():
-    try:
-        firefox_service = setup_firefox_service()
-        firefox_options = webdriver.FirefoxOptions()
-        # firefox_options.add_argument('--headless')  # Uncomment for headless mode
-        firefox_options.add_argument('--disable-notifications')
-        driver = webdriver.Firefox(service=firefox_service, options=firefox_options)
-        logger.info("Firefox driver initialized successfully.")
-        return driver
-    except WebDriverException as e:
-        logger.error("Driver initialization failed: %s", e)
-        raise
-
 def store_data_in_mongo(event_data_list, collection_name):
     try:
         # Create a unique identifier (e.g., using source_url or any other unique field)
         scrape_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Get the collection based on the dynamic collection_name
-        collection = db[collection_name]
+        collection = mongo_db()[collection_name]
         
         # Check if the document already exists (based on a field like scrape_time or source_url)
         existing_document = collection.find_one({"scrape_time": scrape_time})
@@ -105,144 +74,180 @@ def store_data_in_mongo(event_data_list, collection_name):
 def get_china_only():
     return ["china"]
 
-def visit_liveumap(query):
-    url = f"https://{query}.liveuamap.com/"
+def visit_liveumap(query, pool=None):
+    from selenium.webdriver.common.by import By
+    from extraction import extract_events
+    from waits import wait_for_dom_settled, wait_for_element, wait_for_page_ready
+
+    url = region_url(query)
     logger.info(f"Visiting {url}")
     driver = None  # Initialize driver variable
+    writer = None
 
     try:
-        # Initialize WebDriver for each query
-        driver = initialize_driver()
+        # Borrow a warm WebDriver from the pool, or start one for a standalone call
+        driver = pool.acquire() if pool else initialize_driver()
 
-        driver.get(url)
-        WebDriverWait(driver, 10).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        throttle(url)  # Shared request budget toward *.liveuamap.com
+        with metrics.timer("page load"):
+            driver.get(url)
+            wait_for_page_ready(driver)
         logger.info("Page loaded successfully.")
         
         # Wait for the div with class 'scroller' to be present
-        scroller_div = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "scroller"))
-        )
+        scroller_div = wait_for_element(driver, (By.CLASS_NAME, "scroller"), name="feed scroller")
         logger.info("Found the div with class 'scroller'.")
+        record_page_weight(driver, query.lower())  # Requests and bytes this region's page cost
         
-        event_data_list = []  # List to store the scraped event data
+        # Events are appended to the query's CSV as they are scraped instead of being held in memory
+        writer = StreamingWriter(f"{query.lower()}_events.csv", "csv")
         
         # Find all divs with class 'event cat' and process them one by one
         event_cat_divs = driver.find_elements(By.CSS_SELECTOR, "div[class^='event cat']")
+
+        # Pull the text fields for every event up front in one execute_script call
+        extracted_events = extract_events(driver, event_cat_divs, base_url=url)
+        page_coordinates = resolve_coordinates(driver, extracted_events)
+        fallback_count = 0
+
+        # Skip events scraped by earlier runs and stop at the first run of known ones
+        seen = SeenIndex(query.lower()) if INCREMENTAL else None
+        new_indexes = set(select_new_events(extracted_events, seen) if seen is not None else range(len(extracted_events)))
+        logger.info(f"{len(new_indexes)} new of {len(event_cat_divs)} events in the feed.")
+
         if event_cat_divs:
             for idx, event_div in enumerate(event_cat_divs, 1):
+                if idx - 1 not in new_indexes:
+                    continue
                 logger.info(f"Processing Event {idx} div.")
                 try:
-                    # Click the div the first time with handling for overlapping elements
-                    attempt_click(event_div)
-                    time.sleep(2)  # Wait for 2 seconds
-                    
-                    # Click the div again with handling for overlapping elements
-                    attempt_click(event_div)
-                    logger.info(f"Clicked Event {idx} div twice.")
-                    
-                    # Locate and scrape the location from the 'marker-time' div
-                    try:
-                        marker_time_div = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "marker-time"))
-                        )
-                        location_a = marker_time_div.find_element(By.TAG_NAME, "a")
-                        location = location_a.text if location_a else "Location not found"
-                        logger.info(f"Location scraped for Event {idx}: {location}")
-                    except NoSuchElementException:
-                        logger.error(f"No 'marker-time' div found for Event {idx} location.")
-
-                    # Click the specific XPath to continue scraping
-                    try:
-                        xpath_button = driver.find_element(By.XPATH, "//*[@id='top']/div[2]/div[2]/div[2]/div[4]/a")
-                        xpath_button.click()
-                        logger.info(f"Clicked the specific XPath button for Event {idx} to continue.")
-                    except NoSuchElementException:
-                        logger.error(f"No XPath button found to continue for Event {idx}.")
-                        # If XPath fails, try clicking the alternative 'Jump to map' link
-                        try:
-                            jump_to_map_link = driver.find_element(By.CSS_SELECTOR, "div.map_link_par a.map-link")
-                            jump_to_map_link.click()
-                            logger.info(f"Clicked 'Jump to map' link for Event {idx}.")
-                        except NoSuchElementException:
-                            logger.error(f"No 'Jump to map' link found for Event {idx}.")
-
-                    # Now, continue scraping for the clicked div (Event {idx})
-                    logger.info(f"Continuing scraping process for Event {idx}.")
-
-                    # Extract date
-                    try:
-                        date = event_div.find_element(By.CSS_SELECTOR, "span.date_add").text
-                    except NoSuchElementException:
-                        date = "Date not found"
-                    
-                    # Extract source
-                    try:
-                        source_url = event_div.find_element(By.CSS_SELECTOR, "a.source-link").get_attribute("href")
-                    except NoSuchElementException:
-                        source_url = "Source not found"
+                    # Use coordinates already present in the page; only click through when they are missing
+                    coordinates = page_coordinates[idx - 1]
+                    location = None
+                    if coordinates is None:
+                        fallback_count += 1
+                        metrics.incr("location click fallbacks")
+                        location = get_location_by_click(driver, event_div, idx)
+                        # Let the map finish panning before the next event (at most 2 seconds)
+                        wait_for_dom_settled(driver, name="map pan settle", timeout=2)
+
+                    fields = extracted_events[idx - 1]
+                    event_data = EventRecord.from_fields(query.lower(), fields, location, coordinates=coordinates)
                     
-                    # Extract data (title)
-                    try:
-                        data = event_div.find_element(By.CSS_SELECTOR, "div.title").text
-                    except NoSuchElementException:
-                        data = "Data not found"
-                    
-                    # Extract image source if present
-                    try:
-                        img_src = event_div.find_element(By.CSS_SELECTOR, "label img").get_attribute("src")
-                    except NoSuchElementException:
-                        img_src = "Image not found"
-                    
-                    event_data = {
-                        "date": date,
-                        "source_url": source_url,
-                        "data": data,
-                        "img_src": img_src,
-                        "location": location  # Add the location to the scraped data
-                    }
-                    
-                    # Append the event data to the list
-                    event_data_list.append(event_data)
-
-                    # Add a 2-second delay between processing each event
-                    time.sleep(2)
+                    # Append the event data to the CSV
+                    writer.write(event_data)
+                    metrics.incr("events scraped", region=query.lower())
+                    if seen is not None:
+                        seen.add(event_key(fields))
 
                 except Exception as e:
                     logger.error(f"Error during processing Event {idx}: {e}")
 
-        # Store the scraped data in MongoDB (collection named after query)
-        # store_data_in_mongo(event_data_list, query.lower())
-        save_to_csv(event_data_list, f"{query.lower()}_events.csv")
+        logger.info(f"{fallback_count}/{len(new_indexes)} events needed the click fallback for location.")
+
+        writer.flush()
+
+        # Remember what was written so the next run only picks up new events; ones
+        # that failed above are left out and retried then
+        if seen is not None:
+            seen.save()
 
     except Exception as e:
         logger.error(f"Error while scraping {url}: {e}")
     finally:
-        if driver:
+        if writer:
+            writer.close()
+        if driver and pool:
+            pool.release(driver)  # Hand the driver back for the next query
+        elif driver:
             driver.quit()  # Close the driver for each query
             logger.info("Driver closed.")
 
 def attempt_click(element, retries=3, delay=1):
     """Try to click an element with retries if it's obscured by another element."""
+    from selenium.common.exceptions import ElementClickInterceptedException
+    from selenium.webdriver.support import expected_conditions as EC
+    from waits import wait_until
+
     for attempt in range(retries):
         try:
             element.click()
             return
         except ElementClickInterceptedException:
             logger.warning(f"Attempt {attempt + 1} failed. Element is obscured. Retrying...")
-            time.sleep(delay)  # Wait before retrying
+            metrics.incr("click retries", fn="attempt_click")
+            # Retry as soon as the element is clickable again, waiting at most `delay` seconds
+            wait_until(element.parent, EC.element_to_be_clickable(element), "attempt_click retry",
+                       timeout=delay, raise_on_timeout=False)
     logger.error("Failed to click element after several attempts.")
 
 
+def get_location_by_click(driver, event_div, idx):
+    """Open the event on the map and read its location from the 'marker-time' popup."""
+    with metrics.timer("location click"):
+        return _location_by_click(driver, event_div, idx)
+
+
+def _location_by_click(driver, event_div, idx):
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+    from waits import wait_for_dom_settled, wait_for_element
+
+    location = None
+
+    # Click the div the first time with handling for overlapping elements
+    attempt_click(event_div)
+    wait_for_dom_settled(driver, name="event click settle", timeout=2)  # Wait up to 2 seconds
+
+    # Click the div again with handling for overlapping elements
+    attempt_click(event_div)
+    logger.info(f"Clicked Event {idx} div twice.")
+
+    # Locate and scrape the location from the 'marker-time' div
+    try:
+        marker_time_div = wait_for_element(driver, (By.CLASS_NAME, "marker-time"), name="marker-time popup")
+        location_a = marker_time_div.find_element(By.TAG_NAME, "a")
+        location = location_a.text if location_a else None
+        logger.info(f"Location scraped for Event {idx}: {location}")
+    except NoSuchElementException:
+        logger.error(f"No 'marker-time' div found for Event {idx} location.")
+
+    # Click the specific XPath to continue scraping
+    try:
+        xpath_button = driver.find_element(By.XPATH, "//*[@id='top']/div[2]/div[2]/div[2]/div[4]/a")
+        xpath_button.click()
+        logger.info(f"Clicked the specific XPath button for Event {idx} to continue.")
+    except NoSuchElementException:
+        logger.error(f"No XPath button found to continue for Event {idx}.")
+        # If XPath fails, try clicking the alternative 'Jump to map' link
+        try:
+            jump_to_map_link = driver.find_element(By.CSS_SELECTOR, "div.map_link_par a.map-link")
+            jump_to_map_link.click()
+            logger.info(f"Clicked 'Jump to map' link for Event {idx}.")
+        except NoSuchElementException:
+            logger.error(f"No 'Jump to map' link found for Event {idx}.")
+
+    return location
+
+
 def main():
+    metrics.observe("startup import", IMPORT_SECONDS)
+    pool = DriverPool()
     try:
         # queries = get_queries_from_file()
         queries = get_china_only()
         for query in queries:
-            visit_liveumap(query)  # No need to pass driver anymore, it's handled in visit_liveumap
+            visit_liveumap(query, pool)  # Drivers are reused across queries through the pool
     except Exception as e:
         logger.error(f"Scraper encountered an error: {e}")
+    finally:
+        pool.close()
+        if "waits" in sys.modules:
+            # Only loaded if a browser ran
+            sys.modules["waits"].wait_stats.log_summary()
+        # Per-run timing breakdown: driver init, page load, extraction, location, sink writes
+        metrics.log_summary()
+        metrics.write_summary()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,56 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+# Number of regions scraped at once; each worker owns one browser session from the pool
+WORKERS = int(os.environ.get("LIVEUAMAP_WORKERS", "3"))
+
+
+def scrape_regions_concurrently(pool, subdomains, scrape_fn, workers=WORKERS, on_result=None):
+    """Run scrape_fn(driver, subdomain) for every region on a bounded worker pool.
+
+    Without `on_result`, results are merged in the order the regions were
+    selected, regardless of which worker finished first. With `on_result`,
+    each region's events are handed to on_result(subdomain, events) as soon
+    as that region finishes and are not kept, and the return value is a
+    {subdomain: event_count} dict. A region that fails is logged and
+    contributes no events; it does not abort the rest of the sweep.
+    """
+    workers = max(1, min(workers, len(subdomains) or 1))
+    results = {}
+    counts = {}
+
+    def run(subdomain):
+        with pool.session() as driver:
+            return scrape_fn(driver, subdomain)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="region") as executor:
+        futures = {executor.submit(run, subdomain): subdomain for subdomain in subdomains}
+        for future in as_completed(futures):
+            subdomain = futures[future]
+            try:
+                events = future.result()
+                counts[subdomain] = len(events)
+                logger.info(f"✅ {subdomain}: {len(events)} events.")
+            except Exception as e:
+                logger.error(f"❌ Region {subdomain} failed: {e}")
+                events = []
+                counts[subdomain] = 0
+
+            if on_result is None:
+                results[subdomain] = events
+                continue
+            try:
+                on_result(subdomain, events)
+            except Exception as e:
+                logger.error(f"❌ Failed to store results for {subdomain}: {e}")
+
+    if on_result is not None:
+        return counts
+
+    merged = []
+    for subdomain in subdomains:
+        merged.extend(results.get(subdomain, []))
+    return merged
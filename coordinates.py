@@ -0,0 +1,80 @@
+import re
+
+# 14°20′N, 14°20'30"N, 14.5°N (the marker popup and format_coordinates)
+DMS_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*°\s*(?:(\d+(?:\.\d+)?)\s*[′']\s*)?(?:(\d+(?:\.\d+)?)\s*(?:[″\"]|′′|'')\s*)?([NSEW])",
+    re.I,
+)
+# 14.3333,42.2833 (data-ll), 14.3333 42.2833, 14.3333N 42.2833E
+DECIMAL_RE = re.compile(
+    r"^\s*([-+]?\d+(?:\.\d+)?)\s*°?\s*([NS])?\s*(?:[,;/]\s*|\s+)([-+]?\d+(?:\.\d+)?)\s*°?\s*([EW])?\s*$",
+    re.I,
+)
+
+
+def _signed(value, hemisphere):
+    return -value if hemisphere and hemisphere.upper() in "SW" else value
+
+
+def _valid(lat, lon):
+    return (lat, lon) if -90 <= lat <= 90 and -180 <= lon <= 180 else None
+
+
+def format_coordinates(lat, lng):
+    """Render decimal degrees the way the marker popup does, e.g. 14°20′N 42°17′E."""
+    def dms(value, positive, negative):
+        hemisphere = positive if value >= 0 else negative
+        value = abs(value)
+        degrees = int(value)
+        minutes = int(round((value - degrees) * 60))
+        if minutes == 60:
+            degrees += 1
+            minutes = 0
+        return f"{degrees}°{minutes}′{hemisphere}"
+
+    return f"{dms(lat, 'N', 'S')} {dms(lng, 'E', 'W')}"
+
+
+def parse_coordinates(text):
+    """(lat, lon) in decimal degrees from a location string, or None if it isn't a coordinate pair.
+
+    Accepts degree-minute(-second) pairs such as '14°20′N 42°17′E' in either
+    order, and decimal pairs as written in data-ll attributes or with
+    hemisphere letters ('14.33,42.28', '14.33N 42.28E').
+    """
+    if not text:
+        return None
+
+    parts = DMS_RE.findall(text)
+    if len(parts) == 2:
+        lat = lon = None
+        for degrees, minutes, seconds, hemisphere in parts:
+            value = float(degrees) + float(minutes or 0) / 60 + float(seconds or 0) / 3600
+            if hemisphere.upper() in "NS":
+                lat = _signed(value, hemisphere)
+            else:
+                lon = _signed(value, hemisphere)
+        if lat is None or lon is None:
+            return None
+        return _valid(lat, lon)
+
+    match = DECIMAL_RE.match(text)
+    if match:
+        lat = _signed(float(match.group(1)), match.group(2))
+        lon = _signed(float(match.group(3)), match.group(4))
+        return _valid(lat, lon)
+    return None
+
+
+def parse_coordinate_columns(locations):
+    """Parallel lat and lon lists (None where unparseable), parsing each distinct string once."""
+    parsed = {}
+    lats = []
+    lons = []
+    for location in locations:
+        if location not in parsed:
+            parsed[location] = parse_coordinates(location)
+        hit = parsed[location]
+        lats.append(hit[0] if hit else None)
+        lons.append(hit[1] if hit else None)
+    return lats, lons
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import heapq
+import signal
+import logging
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from concurrent_scrape import WORKERS
+from dedup import DEDUP, Deduplicator
+from driver_pool import DriverPool
+from metrics import metrics
+from seen_index import INCREMENTAL, STATE_DIR, mark_seen
+from stream_writer import StreamingWriter
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = float(os.environ.get("LIVEUAMAP_MIN_POLL", "300"))
+MAX_INTERVAL = float(os.environ.get("LIVEUAMAP_MAX_POLL", str(6 * 3600)))
+# Aim for roughly this many new events per poll: busy regions are polled often, quiet ones rarely
+TARGET_EVENTS_PER_POLL = 5
+RATE_SMOOTHING = 0.3
+MAX_BACKOFF = 3600
+STATUS_PATH = os.path.join(STATE_DIR, "daemon_status.json")
+
+
+class RegionState:
+    def __init__(self, subdomain, interval):
+        self.subdomain = subdomain
+        self.interval = interval
+        self.rate = None  # smoothed new events per second
+        self.failures = 0
+        self.last_poll = None
+        self.last_success = None
+        self.next_due = time.time()
+        self.total_events = 0
+
+    def record_success(self, new_events, now, min_interval, max_interval):
+        if self.last_success is not None:
+            observed = new_events / max(now - self.last_success, 1.0)
+            self.rate = observed if self.rate is None else RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * self.rate
+        self.failures = 0
+        self.last_poll = now
+        self.last_success = now
+        self.total_events += new_events
+        if self.rate:
+            self.interval = min(max_interval, max(min_interval, TARGET_EVENTS_PER_POLL / self.rate))
+        elif self.rate == 0:
+            self.interval = min(max_interval, self.interval * 2)
+        self.next_due = now + self.interval
+
+    def record_failure(self, now, min_interval):
+        self.failures += 1
+        self.last_poll = now
+        self.next_due = now + min(MAX_BACKOFF, min_interval * (2 ** (self.failures - 1)))
+
+    def status(self, now):
+        return {
+            "interval_seconds": round(self.interval),
+            "events_per_hour": round(self.rate * 3600, 2) if self.rate is not None else None,
+            "staleness_seconds": round(now - self.last_success) if self.last_success else None,
+            "failures": self.failures,
+            "next_poll_in_seconds": round(max(0, self.next_due - now)),
+            "total_events": self.total_events,
+        }
+
+
+class PollingDaemon:
+    """Polls regions forever, each at an interval adapted to how often it posts."""
+
+    def __init__(self, subdomains, scrape_fn, pool, workers=WORKERS, min_interval=MIN_INTERVAL,
+                 max_interval=MAX_INTERVAL, status_path=STATUS_PATH, prometheus_path=None):
+        self.scrape_fn = scrape_fn
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.status_path = status_path
+        self.prometheus_path = prometheus_path
+        self.states = {subdomain: RegionState(subdomain, min_interval) for subdomain in subdomains}
+        self._queue = [(state.next_due, subdomain) for subdomain, state in self.states.items()]
+        heapq.heapify(self._queue)
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        logger.info("Stopping daemon after in-flight polls finish.")
+        self._stop.set()
+
+    def _poll(self, subdomain):
+        with metrics.timer("region poll", region=subdomain), self.pool.session() as driver:
+            return self.scrape_fn(driver, subdomain)
+
+    def status(self):
+        now = time.time()
+        return {subdomain: state.status(now) for subdomain, state in self.states.items()}
+
+    def write_status(self):
+        directory = os.path.dirname(self.status_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.status_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"updated_at": time.time(), "regions": self.status()}, f, indent=2)
+        os.replace(tmp_path, self.status_path)
+
+    def run(self):
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="poll") as executor:
+            while not self._stop.is_set() or in_flight:
+                now = time.time()
+                while (not self._stop.is_set() and self._queue and self._queue[0][0] <= now
+                       and len(in_flight) < self.workers):
+                    _, subdomain = heapq.heappop(self._queue)
+                    logger.info(f"🔁 Polling {subdomain}.")
+                    in_flight[executor.submit(self._poll, subdomain)] = subdomain
+
+                if in_flight:
+                    until_next = self._queue[0][0] - now if self._queue else 1.0
+                    done, _ = wait(list(in_flight), timeout=max(0.1, min(until_next, 1.0)),
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(in_flight.pop(future), future)
+                elif self._queue:
+                    self._stop.wait(max(0.1, min(self._queue[0][0] - now, 1.0)))
+                else:
+                    self._stop.wait(1.0)
+
+    def _finish(self, subdomain, future):
+        state = self.states[subdomain]
+        now = time.time()
+        try:
+            events = future.result()
+            state.record_success(len(events), now, self.min_interval, self.max_interval)
+            metrics.incr("polls", region=subdomain, outcome="ok")
+            logger.info(f"✅ {subdomain}: {len(events)} new events, next poll in {state.interval / 60:.1f} min.")
+        except Exception as e:
+            state.record_failure(now, self.min_interval)
+            metrics.incr("polls", region=subdomain, outcome="failed")
+            logger.error(f"❌ {subdomain} poll failed ({state.failures} in a row): {e}")
+        heapq.heappush(self._queue, (state.next_due, subdomain))
+        try:
+            self.write_status()
+            if self.prometheus_path:
+                metrics.write_prometheus(self.prometheus_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write daemon status: {e}")
+
+
+def main(argv=None):
+    from dynamic_scraper import scrape_region
+
+    parser = argparse.ArgumentParser(description="Continuously poll liveuamap.com regions.")
+    parser.add_argument("--regions", required=True, help="comma-separated subdomains, e.g. pirates,china")
+    parser.add_argument("--output", default="scraped_events.jsonl", help="CSV or JSONL file to append events to")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL, help="seconds")
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL, help="seconds")
+    parser.add_argument("--prometheus-file", help="rewrite this Prometheus text file after every poll")
+    parser.add_argument("--prometheus-port", type=int, help="serve Prometheus metrics over HTTP on this port")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    subdomains = [region.strip().lower() for region in args.regions.split(",") if region.strip()]
+    pool = DriverPool(size=args.workers)
+    writer = StreamingWriter(args.output)
+    # Incidents posted to several regions are written once, by whichever region is polled first
+    dedup = Deduplicator.load() if DEDUP else None
+    emit = dedup.wrap(writer.write) if dedup is not None else writer.write
+
+    def poll(driver, subdomain):
+        events = scrape_region(driver, subdomain, emit=emit)
+        # Only once the rows are on disk, so a crash before the flush re-scrapes them next poll
+        writer.flush()
+        if INCREMENTAL:
+            mark_seen(subdomain, events)
+        return events
+
+    daemon = PollingDaemon(
+        subdomains, poll, pool, workers=args.workers,
+        min_interval=args.min_interval, max_interval=args.max_interval, prometheus_path=args.prometheus_file
+    )
+    metrics_server = metrics.serve_prometheus(args.prometheus_port) if args.prometheus_port else None
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.run()
+    finally:
+        writer.close()
+        if dedup is not None:
+            dedup.save()
+        pool.close()
+        if metrics_server:
+            metrics_server.shutdown()
+        metrics.write_summary()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
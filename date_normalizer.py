@@ -0,0 +1,115 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+UNIT_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+}
+
+RELATIVE_RE = re.compile(r"^(?P<count>\d+|an?|one)\s+(?P<unit>second|minute|hour|day|week|month|year)s?\s+ago$")
+EPOCH_RE = re.compile(r"^\d{9,13}(?:\.\d+)?$")
+
+
+def _parse_relative(text):
+    """(age, unit) for a relative date, or None."""
+    if not text:
+        return None
+    text = " ".join(text.lower().split())
+    if text in ("just now", "now", "a few seconds ago"):
+        return timedelta(0), "minute"
+    if text == "yesterday":
+        return timedelta(days=1), "day"
+    match = RELATIVE_RE.match(text)
+    if not match:
+        return None
+    count = match.group("count")
+    count = 1 if not count.isdigit() else int(count)
+    unit = match.group("unit")
+    return timedelta(seconds=count * UNIT_SECONDS[unit]), unit
+
+
+def parse_relative_age(text):
+    """Age of a span.date_add value such as '4 days ago' or 'a month ago', or None if unrecognised."""
+    parsed = _parse_relative(text)
+    return parsed[0] if parsed else None
+
+
+def parse_timestamp(value):
+    """Aware UTC datetime from a datetime, ISO 8601 string or epoch seconds/milliseconds, or None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        if EPOCH_RE.match(text):
+            seconds = float(text)
+            # 13 digits: milliseconds, as JavaScript's Date.now() writes them
+            return datetime.fromtimestamp(seconds / 1000 if seconds > 1e11 else seconds, timezone.utc)
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def truncate(moment, unit):
+    """Start of the UTC calendar `unit` (minute, day, week from Monday, month, ...) containing moment."""
+    if unit == "year":
+        return moment.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    if unit == "month":
+        return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if unit == "week":
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day - timedelta(days=day.weekday())
+    # Seconds up to days divide a day evenly, so flooring the epoch lands on UTC boundaries
+    seconds = UNIT_SECONDS[unit]
+    return datetime.fromtimestamp(moment.timestamp() // seconds * seconds, timezone.utc)
+
+
+def format_utc(moment):
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def normalize_date(text, exact=None, scraped_at=None):
+    """(UTC datetime, precision) for an event, or (None, None) if its date can't be read.
+
+    An exact timestamp from the page wins ("exact"); then an absolute date in
+    the text itself. Otherwise the relative date ('4 days ago') is anchored on
+    `scraped_at` (default: now) and truncated to the start of its unit, which
+    becomes the precision: '4 days ago' read at 10:00 or at 11:37 is the same
+    day, 00:00Z. Reads that straddle a unit boundary can still differ by one
+    unit, so sinks that upsert keep the first time they stored.
+    """
+    for candidate in (exact, text):
+        moment = parse_timestamp(candidate)
+        if moment is not None:
+            return moment, "exact"
+    parsed = _parse_relative(text)
+    if parsed is None:
+        return None, None
+    age, unit = parsed
+    anchor = parse_timestamp(scraped_at) or datetime.now(timezone.utc)
+    return truncate(anchor - age, unit), unit
+
+
+def normalize_event_time(text, exact=None, scraped_at=None):
+    """normalize_date() as the ISO 'YYYY-MM-DDTHH:MM:SSZ' string and precision EventRecord stores."""
+    moment, precision = normalize_date(text, exact, scraped_at)
+    return (format_utc(moment) if moment is not None else None), precision
+
+
+def parse_duration(text):
+    """Parse a CLI horizon such as '24h', '30m', '7d' or '2w'."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*", text or "")
+    if not match:
+        raise ValueError(f"Invalid duration: {text!r} (expected e.g. 30m, 24h, 7d)")
+    unit = {"s": "second", "m": "minute", "h": "hour", "d": "day", "w": "week"}[match.group(2)]
+    return timedelta(seconds=float(match.group(1)) * UNIT_SECONDS[unit])
@@ -0,0 +1,262 @@
+import os
+import re
+import json
+import time
+import base64
+import random
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+from date_normalizer import parse_duration
+from metrics import metrics
+from seen_index import STATE_DIR, event_key
+
+logger = logging.getLogger(__name__)
+
+DEDUP = os.environ.get("LIVEUAMAP_DEDUP", "1") != "0"
+DEDUP_PATH = os.path.join(STATE_DIR, "dedup.json")
+# Events are only compared with events seen within this window, and at most this many are kept
+DEDUP_WINDOW = parse_duration(os.environ.get("LIVEUAMAP_DEDUP_WINDOW", "48h")).total_seconds()
+DEDUP_MAX_ENTRIES = int(os.environ.get("LIVEUAMAP_DEDUP_MAX_ENTRIES", "20000"))
+# Estimated Jaccard similarity of the text shingles above which two events are the same incident
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("LIVEUAMAP_DEDUP_THRESHOLD", "0.6"))
+SAVE_INTERVAL = 300
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands of 4 rows: pairs around 0.5 similarity and up become candidates
+SHINGLE_WORDS = 3
+MIN_WORDS = 6  # shorter texts ("Explosions reported") are too generic to match on
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures saved by one run must line up with the next run's
+_rng = random.Random(20250708)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_URL_RE = re.compile(r"https?://\S+")
+_WORD_RE = re.compile(r"\w+")
+_HOST_ALIASES = {"twitter.com": "x.com", "mobile.twitter.com": "x.com", "mobile.x.com": "x.com"}
+
+
+def canonical_url(url):
+    """Source URL reduced to what identifies the post: no fragment, 'www.', trailing slash or twitter.com."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    host = _HOST_ALIASES.get(host, host)
+    return urlunsplit(("https", host, parts.path.rstrip("/"), parts.query, ""))
+
+
+def shingles(text):
+    words = _WORD_RE.findall(_URL_RE.sub(" ", (text or "").lower()))
+    if len(words) < MIN_WORDS:
+        return set()
+    return {" ".join(words[idx:idx + SHINGLE_WORDS]) for idx in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text):
+    """MinHash signature of the text's word shingles as 32-bit values, or None for short texts."""
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+              for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return array("I", (min((a * h + b) % _PRIME for h in hashes) & 0xFFFFFFFF for a, b in _PERMUTATIONS))
+
+
+def similarity(signature, other):
+    return sum(1 for x, y in zip(signature, other) if x == y) / NUM_PERM
+
+
+def _bands(signature):
+    rows = NUM_PERM // BANDS
+    return [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(BANDS)]
+
+
+class Entry:
+    """A canonical event in the index: where it was first stored and every region it appeared in."""
+
+    __slots__ = ("region", "event_key", "url", "signature", "regions", "seen_at")
+
+    def __init__(self, region, event_key, url, signature, regions, seen_at):
+        self.region = region
+        self.event_key = event_key
+        self.url = url
+        self.signature = signature
+        self.regions = regions
+        self.seen_at = seen_at
+
+    @property
+    def key(self):
+        return f"{self.region}|{self.event_key}"
+
+    def to_json(self):
+        signature = base64.b64encode(self.signature.tobytes()).decode("ascii") if self.signature else None
+        return {"region": self.region, "event_key": self.event_key, "url": self.url, "signature": signature,
+                "regions": self.regions, "seen_at": self.seen_at}
+
+    @classmethod
+    def from_json(cls, payload):
+        signature = None
+        if payload.get("signature"):
+            signature = array("I")
+            signature.frombytes(base64.b64decode(payload["signature"]))
+        return cls(payload["region"], payload["event_key"], payload.get("url"), signature,
+                   payload.get("regions") or [payload["region"]], payload["seen_at"])
+
+
+class Deduplicator:
+    """Streaming cross-region dedup: an exact index on source URL plus MinHash LSH over the text.
+
+    check() is called once per event as it is scraped. The first sighting
+    becomes the canonical event and gets `regions` = [its region]; later
+    sightings from other regions (same canonical URL, or text whose
+    estimated similarity reaches `threshold`) are reported as duplicates and
+    their region is added to the canonical event's list. Only events seen in
+    the last `window` seconds are kept, capped at `max_entries`, and the
+    index is saved under STATE_DIR so dedup carries across runs.
+
+    A region that turns up after the canonical event was written only reaches
+    sinks with add_region() (mongo-events, search); the snapshot outputs leave
+    `regions` out (see event_record.FILE_FIELDS).
+    """
+
+    def __init__(self, path=DEDUP_PATH, window=DEDUP_WINDOW, max_entries=DEDUP_MAX_ENTRIES,
+                 threshold=NEAR_DUPLICATE_THRESHOLD, save_interval=SAVE_INTERVAL):
+        self.path = path
+        self.window = window
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.save_interval = save_interval
+        self._entries = OrderedDict()
+        self._by_url = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+
+    @classmethod
+    def load(cls, path=DEDUP_PATH, **kwargs):
+        dedup = cls(path, **kwargs)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        except FileNotFoundError:
+            return dedup
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable dedup index {path}: {e}")
+            return dedup
+        for payload in entries:
+            dedup._add(Entry.from_json(payload))
+        dedup._expire(time.time())
+        return dedup
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, entry):
+        if entry.key in self._entries:
+            # The same event seen again in its own region: refresh it at the back of the window
+            self._remove(self._entries.pop(entry.key))
+        self._entries[entry.key] = entry
+        if entry.url:
+            self._by_url.setdefault(entry.url, entry)
+        if entry.signature:
+            for band in _bands(entry.signature):
+                self._buckets.setdefault(band, set()).add(entry.key)
+
+    def _remove(self, entry):
+        if entry.url and self._by_url.get(entry.url) is entry:
+            del self._by_url[entry.url]
+        if entry.signature:
+            for band in _bands(entry.signature):
+                bucket = self._buckets.get(band)
+                if bucket is not None:
+                    bucket.discard(entry.key)
+                    if not bucket:
+                        del self._buckets[band]
+
+    def _expire(self, now):
+        # Entries are kept in the order they were first seen, so the oldest are at the front
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.seen_at >= now - self.window and len(self._entries) <= self.max_entries:
+                break
+            self._remove(self._entries.popitem(last=False)[1])
+
+    def _near_duplicate(self, signature, region):
+        best, best_score = None, 0.0
+        candidates = set()
+        for band in _bands(signature):
+            candidates.update(self._buckets.get(band, ()))
+        for candidate_key in candidates:
+            entry = self._entries.get(candidate_key)
+            if entry is None or entry.region == region:
+                continue
+            score = similarity(signature, entry.signature)
+            if score >= self.threshold and score > best_score:
+                best, best_score = entry, score
+        return best
+
+    def check(self, event):
+        """None if the event is new (it is now canonical), else the canonical Entry it duplicates."""
+        region = event.get("region")
+        key = event_key(event)
+        url = canonical_url(event.get("source_url"))
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            match, kind = None, None
+            if url:
+                entry = self._by_url.get(url)
+                # Repeats within one region are left to the seen index, so a retried region keeps its events
+                if entry is not None and entry.region != region:
+                    match, kind = entry, "url"
+            signature = minhash(event.get("data"))
+            if match is None and signature:
+                match, kind = self._near_duplicate(signature, region), "text"
+
+            if match is None:
+                regions = [region] if region else []
+                event["regions"] = regions
+                self._add(Entry(region, key, url, signature, regions, now))
+                canonical = None
+            else:
+                if region and region not in match.regions:
+                    # Same list object as the canonical event's `regions`, if it is still in memory
+                    match.regions.append(region)
+                metrics.incr("duplicates", kind=kind, region=region)
+                canonical = match
+
+            if self.save_interval and time.monotonic() - self._last_save >= self.save_interval:
+                self._save()
+        return canonical
+
+    def wrap(self, emit, on_duplicate=None):
+        """emit() that forwards only new events; on_duplicate(entry, event) is called for the rest."""
+        def deduplicated(event):
+            canonical = self.check(event)
+            if canonical is None:
+                emit(event)
+            elif on_duplicate is not None:
+                on_duplicate(canonical, event)
+        return deduplicated
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"updated_at": time.time(), "entries": [entry.to_json() for entry in self._entries.values()]}, f)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def save(self):
+        with self._lock:
+            self._expire(time.time())
+            self._save()
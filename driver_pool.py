@@ -0,0 +1,190 @@
+import os
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from browser_profile import LEAN_PROFILE, apply_lean_profile
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration, overridable from the environment
+GECKODRIVER_PATH = os.environ.get(
+    "GECKODRIVER_PATH", r'C:\Users\aarus\Downloads\geckodriver-v0.36.0-win64\geckodriver.exe'
+)
+POOL_SIZE = int(os.environ.get("LIVEUAMAP_POOL_SIZE", "1"))
+MAX_PAGES_PER_DRIVER = int(os.environ.get("LIVEUAMAP_MAX_PAGES_PER_DRIVER", "25"))
+HEADLESS = os.environ.get("LIVEUAMAP_HEADLESS", "1") != "0"
+
+
+# Selenium is imported inside the functions that start or talk to a browser, so creating
+# a pool (or importing this module) costs nothing until a driver is actually needed.
+def setup_firefox_service(geckodriver_path=GECKODRIVER_PATH):
+    from selenium.webdriver.firefox.service import Service as FirefoxService
+
+    if os.path.exists(geckodriver_path):
+        return FirefoxService(geckodriver_path)
+    else:
+        raise FileNotFoundError(f"GeckoDriver not found at {geckodriver_path}")
+
+
+def initialize_driver(geckodriver_path=GECKODRIVER_PATH, headless=HEADLESS, lean=LEAN_PROFILE):
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+        firefox_service = setup_firefox_service(geckodriver_path)
+        firefox_options = webdriver.FirefoxOptions()
+        if headless:
+            firefox_options.add_argument('--headless')
+        firefox_options.add_argument('--disable-notifications')
+        if lean:
+            apply_lean_profile(firefox_options)
+        with metrics.timer("driver init"):
+            driver = webdriver.Firefox(service=firefox_service, options=firefox_options)
+        logger.info(f"Firefox driver initialized successfully{' (lean profile)' if lean else ''}.")
+        return driver
+    except WebDriverException as e:
+        logger.error("Driver initialization failed: %s", e)
+        raise
+
+
+class DriverPool:
+    """Hands out warm Firefox sessions and recycles them after max_pages or a crash."""
+
+    def __init__(self, size=POOL_SIZE, geckodriver_path=GECKODRIVER_PATH, headless=HEADLESS,
+                 max_pages=MAX_PAGES_PER_DRIVER, lean=LEAN_PROFILE):
+        self.size = max(1, size)
+        self.geckodriver_path = geckodriver_path
+        self.headless = headless
+        self.max_pages = max_pages
+        self.lean = lean
+        self._idle = queue.LifoQueue()
+        self._page_counts = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _launch(self):
+        driver = initialize_driver(self.geckodriver_path, self.headless, self.lean)
+        with self._lock:
+            self._page_counts[id(driver)] = 0
+        return driver
+
+    def warm(self, count=None):
+        """Start sessions ahead of time so the first region jobs skip Firefox cold start."""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._lock:
+                if self._created >= count:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._launch())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("DriverPool is closed.")
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_launch = self._created < self.size
+                if can_launch:
+                    self._created += 1
+            if can_launch:
+                try:
+                    return self._launch()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # Poll so a slot freed by a discarded driver is noticed, not just returned drivers
+            wait = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if wait <= 0:
+                raise TimeoutError("Timed out waiting for a free driver.")
+            try:
+                return self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+    def release(self, driver, pages=1, broken=False):
+        with self._lock:
+            count = self._page_counts.get(id(driver), 0) + pages
+            self._page_counts[id(driver)] = count
+
+        if not broken and not self._closed and count < self.max_pages:
+            broken = not self._reset(driver)
+            if not broken:
+                self._idle.put(driver)
+                return
+
+        if not broken and count >= self.max_pages:
+            logger.info(f"♻️ Recycling driver after {count} pages.")
+        self._discard(driver)
+
+    def _reset(self, driver):
+        """Clear per-region state so the next job starts from a blank page."""
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+            driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            logger.warning(f"⚠️ Driver failed to reset, discarding it: {e}")
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Ignoring error while quitting driver: {e}")
+
+    @contextmanager
+    def session(self, pages=1):
+        from selenium.common.exceptions import InvalidSessionIdException
+
+        driver = self.acquire()
+        try:
+            yield driver
+        except InvalidSessionIdException:
+            self.release(driver, pages=pages, broken=True)
+            raise
+        except BaseException:
+            # Wait timeouts and other page-level errors leave the browser usable; if it
+            # isn't, _reset() fails and release() discards it
+            self.release(driver, pages=pages)
+            raise
+        else:
+            self.release(driver, pages=pages)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+        logger.info("Driver pool closed.")
@@ -1,150 +1,47 @@
-import os
-import logging
 import time
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    WebDriverException,
-    ElementClickInterceptedException
-)
-from pymongo import MongoClient
-import csv
+_import_started = time.perf_counter()
+
+import sys
+import argparse
+import logging
+from region_catalog import get_regions, load_run_config, needs_catalog, select_regions
+from browser_profile import record_page_weight
+from date_normalizer import parse_duration
+from datetime import timedelta
+from functools import partial
+from event_record import EventRecord
+from driver_pool import DriverPool, initialize_driver
+from metrics import metrics
+from rate_limit import throttle
+from site_config import region_url
+from seen_index import INCREMENTAL, SeenIndex, event_key, mark_seen, select_new_events
+from sinks import OUTPUT_SINKS, SinkSet, store_scrape_document
+from concurrent_scrape import WORKERS
+from http_tier import TIERS, scrape_regions_hybrid
+from run_manifest import DEFAULT_RETRIES, FAILED, RunManifest
+from dedup import DEDUP, Deduplicator
+from search_index import SEARCH_INDEX
+
+# Selenium and the browser-side modules (extraction, waits, region discovery, backfill) are
+# imported inside the functions that drive a browser, and MongoDB is only connected to when
+# a Mongo output is chosen, so CSV/HTTP-only runs and tools importing this module skip both.
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Set GeckoDriver path
-geckodriver_path = r'C:\Users\aarus\Downloads\geckodriver-v0.36.0-win64\geckodriver.exe'
-
-# MongoDB Configuration
-mongo_client = MongoClient("mongodb://localhost:27017/")
-db = mongo_client["liveuamap"]
-
-def save_to_csv(data, filename="scraped_events.csv"):
-    if not data:
-        print("No data to save.")
-        return
-    keys = data[0].keys()
-    with open(filename, mode='w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(data)
-    print(f"✅ Saved {len(data)} events to CSV: {filename}")
-
-def setup_firefox_service():
-    if os.path.exists(geckodriver_path):
-        return FirefoxService(geckodriver_path)
-    else:
-        raise FileNotFoundError(f"GeckoDriver not found at {geckodriver_path}")
-
-def initialize_driver():
-    firefox_service = setup_firefox_service()
-    firefox_options = webdriver.FirefoxOptions()
-    # firefox_options.add_argument('--headless')  # Uncomment for headless mode
-    firefox_options.add_argument('--disable-notifications')
-    return webdriver.Firefox(service=firefox_service, options=firefox_options)
-def get_available_regions():
-    driver = initialize_driver()
-    driver.get("https://liveuamap.com")
-
-    WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    time.sleep(2)
-
-    try:
-        select_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, "modalRegions"))
-        )
-        driver.execute_script("arguments[0].scrollIntoView(true);", select_button)
-        select_button.click()
-        logger.info("Clicked 'Select regions' button.")
-        time.sleep(1)
-
-        # Scroll modal to bottom to ensure all regions load
-        scroll_modal_to_bottom(driver)
-
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a.modalRegName"))
-        )
-        time.sleep(1)
-
-    except Exception as e:
-        logger.error("❌ Could not open region selector: %s", e)
-        driver.quit()
-        return []
-
-    regions = []
-    seen = set()
+IMPORT_SECONDS = time.perf_counter() - _import_started
+metrics.process_started = _import_started
 
-    def extract_links():
-        links = driver.find_elements(By.CSS_SELECTOR, "a.modalRegName")
-        new_regions = []
-
-        for link in links:
-            try:
-                class_attr = link.get_attribute("class") or ""
-                is_parent = "hasLvl" in class_attr
-                href = link.get_attribute("href")
-                title = link.get_attribute("title").strip()
-
-                # ✅ Parent Region → expand to get subregions
-                if is_parent:
-                    logger.debug(f"📂 Expanding parent region: {title}")
-                    if not safe_click(driver, link):
-                        logger.warning(f"⚠️ Failed to click or extract subregions for {title}")
-                        continue
-                    time.sleep(1)
-
-                    try:
-                        subregion_anchors = driver.find_elements(By.CSS_SELECTOR, "li.col-md-4 > a[href*='liveuamap.com']")
-                        for sub_a in subregion_anchors:
-                            sub_href = sub_a.get_attribute("href")
-                            sub_name = sub_a.text.strip() or sub_a.get_attribute("title").strip()
-                            if not sub_name:
-                                continue
-                            subdomain = sub_href.split("//")[1].split(".")[0]
-                            if subdomain not in seen:
-                                seen.add(subdomain)
-                                new_regions.append({"name": sub_name, "subdomain": subdomain})
-                                logger.debug(f"✅ Subregion added: {sub_name} ({subdomain})")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed extracting subregions from {title}: {e}")
-
-                    try:
-                        return_link = driver.find_element(By.CSS_SELECTOR, "a.retallregs")
-                        safe_click(driver, return_link)
-                        time.sleep(1)
-                        scroll_modal_to_bottom(driver)  # Scroll again after returning
-                    except Exception as e:
-                        logger.warning(f"⚠️ Could not return to all regions after {title}: {e}")
-                    continue
-
-                # ✅ Standalone Region
-                if href and "liveuamap.com" in href:
-                    subdomain = href.split("//")[1].split(".")[0]
-                    if subdomain.lower() in ["login", "about", "privacy", "terms"]:
-                        continue
-                    if subdomain not in seen:
-                        name = link.text.strip() or link.get_attribute("title").strip()
-                        if not name:
-                            continue
-                        seen.add(subdomain)
-                        new_regions.append({"name": name, "subdomain": subdomain})
-                        logger.debug(f"✅ Region added: {name} ({subdomain})")
-
-            except Exception as e:
-                logger.warning(f"⚠️ Error processing region link: {e}")
-
-        return new_regions
+def get_available_regions(pool, method="fast"):
+    from region_discovery import discover_regions, open_region_modal
 
+    driver = pool.acquire()
     try:
-        regions = extract_links()
+        if not open_region_modal(driver):
+            return []
+        with metrics.timer("region discovery", method=method):
+            regions = discover_regions(driver, method=method)
         logger.info(f"✅ Found {len(regions)} valid regions.")
         return regions
 
@@ -153,38 +50,7 @@ def get_available_regions():
         return []
 
     finally:
-        driver.quit()
-        
-def scroll_modal_to_bottom(driver, container_selector="div.modal-body", pause_time=0.5, max_scrolls=30):
-    try:
-        scroll_box = driver.find_element(By.CSS_SELECTOR, container_selector)
-        last_height = driver.execute_script("return arguments[0].scrollHeight", scroll_box)
-        for _ in range(max_scrolls):
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_box)
-            time.sleep(pause_time)
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_box)
-            if new_height == last_height:
-                break
-            last_height = new_height
-        logger.info("✅ Scrolled modal to bottom.")
-    except Exception as e:
-        logger.warning(f"⚠️ Failed to scroll modal: {e}")
-
-
-def safe_click(driver, element, retries=3):
-    for attempt in range(retries):
-        try:
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", element)
-            time.sleep(0.5)
-            element.click()
-            return True
-        except Exception as e:
-            logger.warning(f"⚠️ Retry {attempt + 1} clicking failed: {e}")
-            time.sleep(1)
-    logger.error("❌ Could not click element after retries.")
-    return False
-
-
+        pool.release(driver)
 
 def get_user_selected_regions(regions):
     print("\nAvailable Regions:")
@@ -200,200 +66,376 @@ def get_user_selected_regions(regions):
     return selected
 
 def attempt_click(element, retries=3, delay=1):
+    from selenium.common.exceptions import ElementClickInterceptedException
+    from selenium.webdriver.support import expected_conditions as EC
+    from waits import wait_until
+
     for attempt in range(retries):
         try:
             element.click()
             return
         except ElementClickInterceptedException:
             logger.warning(f"Click attempt {attempt + 1} failed. Retrying...")
-            time.sleep(delay)
+            metrics.incr("click retries", fn="attempt_click")
+            # element.parent is the owning WebDriver; retry as soon as the overlay is gone
+            wait_until(element.parent, EC.element_to_be_clickable(element), "attempt_click retry",
+                       timeout=delay, raise_on_timeout=False)
     logger.error("Failed to click element after several attempts.")
 
+def get_location_by_click(driver, event_div, idx, click_pause=1, wait_timeout=5):
+    with metrics.timer("location click"):
+        return _location_by_click(driver, event_div, idx, click_pause, wait_timeout)
+
+def _location_by_click(driver, event_div, idx, click_pause, wait_timeout):
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+    from waits import wait_for_dom_settled, wait_for_element
+
+    attempt_click(event_div)
+    wait_for_dom_settled(driver, name="event click settle", timeout=click_pause)
+    attempt_click(event_div)
+
+    try:
+        marker_time_div = wait_for_element(driver, (By.CLASS_NAME, "marker-time"), name="marker-time popup",
+                                           timeout=wait_timeout)
+        location_a = marker_time_div.find_element(By.TAG_NAME, "a")
+        location = location_a.text if location_a else None
+    except NoSuchElementException:
+        location = None
+
+    try:
+        xpath_button = driver.find_element(By.XPATH, "//*[@id='top']/div[2]/div[2]/div[2]/div[4]/a")
+        xpath_button.click()
+    except NoSuchElementException:
+        try:
+            jump_to_map_link = driver.find_element(By.CSS_SELECTOR, "div.map_link_par a.map-link")
+            jump_to_map_link.click()
+        except NoSuchElementException:
+            logger.warning(f"No jump-to-map link for Event {idx}.")
+
+    return location
+
 def store_data_in_mongo(event_data_list, collection_name):
-    scrape_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    collection = db[collection_name]
-    existing_document = collection.find_one({"scrape_time": scrape_time})
-
-    if existing_document:
-        collection.update_one(
-            {"scrape_time": scrape_time},
-            {"$push": {"events": {"$each": event_data_list}}}
-        )
-        logger.info(f"Updated existing document with scrape time {scrape_time}.")
-    else:
-        collection.insert_one({
-            "scrape_time": scrape_time,
-            "events": event_data_list
-        })
-        logger.info(f"Inserted new document with scrape time {scrape_time}.")
-
-def visit_liveumap(query):
-    url = f"https://{query}.liveuamap.com/"
+    # Kept for callers of the old helper; the document layout now lives with the "mongo" sink
+    store_scrape_document(event_data_list, collection_name)
+
+def visit_liveumap(query, pool=None):
+    from selenium.webdriver.common.by import By
+    from extraction import extract_events
+    from location_resolver import resolve_coordinates
+    from waits import wait_for_dom_settled, wait_for_element, wait_for_page_ready
+
+    url = region_url(query)
     logger.info(f"Visiting {url}")
     driver = None
 
     try:
-        driver = initialize_driver()
-        driver.get(url)
-        WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        driver = pool.acquire() if pool else initialize_driver()
+        throttle(url)
+        with metrics.timer("page load"):
+            driver.get(url)
+            wait_for_page_ready(driver)
 
-        scroller_div = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "scroller"))
-        )
+        scroller_div = wait_for_element(driver, (By.CLASS_NAME, "scroller"), name="feed scroller")
 
         event_data_list = []
         event_cat_divs = driver.find_elements(By.CSS_SELECTOR, "div[class^='event cat']")
+        extracted_events = extract_events(driver, event_cat_divs, base_url=url)
+        page_coordinates = resolve_coordinates(driver, extracted_events)
+        fallback_count = 0
+        seen = SeenIndex(query.lower()) if INCREMENTAL else None
+        new_indexes = set(select_new_events(extracted_events, seen) if seen is not None else range(len(extracted_events)))
+        logger.info(f"🆕 {len(new_indexes)} new of {len(event_cat_divs)} events in the feed.")
+
         if event_cat_divs:
             for idx, event_div in enumerate(event_cat_divs, 1):
+                if idx - 1 not in new_indexes:
+                    continue
                 try:
                     logger.info(f"Processing Event {idx} div.")
-                    attempt_click(event_div)
-                    time.sleep(2)
-                    attempt_click(event_div)
-
-                    try:
-                        marker_time_div = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "marker-time"))
-                        )
-                        location_a = marker_time_div.find_element(By.TAG_NAME, "a")
-                        location = location_a.text if location_a else "Location not found"
-                    except NoSuchElementException:
-                        location = "Location not found"
-
-                    try:
-                        xpath_button = driver.find_element(By.XPATH, "//*[@id='top']/div[2]/div[2]/div[2]/div[4]/a")
-                        xpath_button.click()
-                    except NoSuchElementException:
-                        try:
-                            jump_to_map_link = driver.find_element(By.CSS_SELECTOR, "div.map_link_par a.map-link")
-                            jump_to_map_link.click()
-                        except NoSuchElementException:
-                            logger.warning(f"No jump-to-map link for Event {idx}.")
-
-                    try:
-                        date = event_div.find_element(By.CSS_SELECTOR, "span.date_add").text
-                    except NoSuchElementException:
-                        date = "Date not found"
-
-                    try:
-                        source_url = event_div.find_element(By.CSS_SELECTOR, "a.source-link").get_attribute("href")
-                    except NoSuchElementException:
-                        source_url = "Source not found"
-
-                    try:
-                        data = event_div.find_element(By.CSS_SELECTOR, "div.title").text
-                    except NoSuchElementException:
-                        data = "Data not found"
-
-                    try:
-                        img_src = event_div.find_element(By.CSS_SELECTOR, "label img").get_attribute("src")
-                    except NoSuchElementException:
-                        img_src = "Image not found"
-
-                    event_data = {
-                        "date": date,
-                        "source_url": source_url,
-                        "data": data,
-                        "img_src": img_src,
-                        "location": location
-                    }
+                    coordinates = page_coordinates[idx - 1]
+                    location = None
+                    if coordinates is None:
+                        fallback_count += 1
+                        metrics.incr("location click fallbacks")
+                        location = get_location_by_click(driver, event_div, idx, click_pause=2, wait_timeout=10)
+                        wait_for_dom_settled(driver, name="map pan settle", timeout=2)
+
+                    fields = extracted_events[idx - 1]
+                    event_data = EventRecord.from_fields(query.lower(), fields, location, coordinates=coordinates)
 
                     event_data_list.append(event_data)
-                    time.sleep(2)
+                    if seen is not None:
+                        seen.add(event_key(fields))
 
                 except Exception as e:
                     logger.error(f"Error during processing Event {idx}: {e}")
 
+        logger.info(f"📍 {fallback_count}/{len(new_indexes)} events needed the click fallback for location.")
         store_data_in_mongo(event_data_list, query.lower())
+        if seen is not None:
+            seen.save()
 
     except Exception as e:
         logger.error(f"Error while scraping {url}: {e}")
     finally:
-        if driver:
+        if driver and pool:
+            pool.release(driver)
+        elif driver:
             driver.quit()
             logger.info("Driver closed.")
 
-def main():
-    try:
-        regions = get_available_regions()
-        selected_subdomains = get_user_selected_regions(regions)
-
-        all_events = []
-
-        for subdomain in selected_subdomains:
-            url = f"https://{subdomain}.liveuamap.com/"
-            logger.info(f"Scraping: {url}")
+def scrape_region(driver, subdomain, emit=None):
+    from selenium.webdriver.common.by import By
+    from extraction import extract_events
+    from location_resolver import resolve_coordinates
+    from waits import wait_for_element, wait_for_page_ready
 
-            driver = initialize_driver()
-            driver.get(url)
-            WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "scroller")))
+    url = region_url(subdomain)
+    logger.info(f"Scraping: {url}")
 
-            event_data_list = []
-            event_cat_divs = driver.find_elements(By.CSS_SELECTOR, "div[class^='event cat']")
-            for idx, event_div in enumerate(event_cat_divs, 1):
-                try:
-                    logger.info(f"Processing Event {idx}...")
-                    attempt_click(event_div)
-                    time.sleep(1)
-                    attempt_click(event_div)
-
-                    try:
-                        marker_time_div = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "marker-time"))
-                        )
-                        location_a = marker_time_div.find_element(By.TAG_NAME, "a")
-                        location = location_a.text if location_a else "Location not found"
-                    except NoSuchElementException:
-                        location = "Location not found"
-
-                    try:
-                        xpath_button = driver.find_element(By.XPATH, "//*[@id='top']/div[2]/div[2]/div[2]/div[4]/a")
-                        xpath_button.click()
-                    except NoSuchElementException:
-                        try:
-                            jump_to_map_link = driver.find_element(By.CSS_SELECTOR, "div.map_link_par a.map-link")
-                            jump_to_map_link.click()
-                        except NoSuchElementException:
-                            pass
-
-                    event_data = {
-                        "region": subdomain,
-                        "date": event_div.find_element(By.CSS_SELECTOR, "span.date_add").text if event_div.find_elements(By.CSS_SELECTOR, "span.date_add") else "Date not found",
-                        "source_url": event_div.find_element(By.CSS_SELECTOR, "a.source-link").get_attribute("href") if event_div.find_elements(By.CSS_SELECTOR, "a.source-link") else "Source not found",
-                        "data": event_div.find_element(By.CSS_SELECTOR, "div.title").text if event_div.find_elements(By.CSS_SELECTOR, "div.title") else "Data not found",
-                        "img_src": event_div.find_element(By.CSS_SELECTOR, "label img").get_attribute("src") if event_div.find_elements(By.CSS_SELECTOR, "label img") else "Image not found",
-                        "location": location
-                    }
-                    event_data_list.append(event_data)
-
-                except Exception as e:
-                    logger.error(f"Error during processing Event {idx}: {e}")
-
-            all_events.extend(event_data_list)
-            driver.quit()
+    throttle(url)
+    with metrics.timer("page load"):
+        driver.get(url)
+        wait_for_page_ready(driver)
+    wait_for_element(driver, (By.CLASS_NAME, "scroller"), name="feed scroller")
+    record_page_weight(driver, subdomain)
+
+    event_data_list = []
+    event_cat_divs = driver.find_elements(By.CSS_SELECTOR, "div[class^='event cat']")
+    extracted_events = extract_events(driver, event_cat_divs, base_url=url)
+    page_coordinates = resolve_coordinates(driver, extracted_events)
+    fallback_count = 0
+    seen = SeenIndex(subdomain) if INCREMENTAL else None
+    new_indexes = set(select_new_events(extracted_events, seen) if seen is not None else range(len(extracted_events)))
+    logger.info(f"🆕 {subdomain}: {len(new_indexes)} new of {len(event_cat_divs)} events in the feed.")
+
+    for idx, event_div in enumerate(event_cat_divs, 1):
+        if idx - 1 not in new_indexes:
+            continue
+        try:
+            logger.info(f"Processing Event {idx}...")
+            coordinates = page_coordinates[idx - 1]
+            location = None
+            if coordinates is None:
+                fallback_count += 1
+                metrics.incr("location click fallbacks")
+                location = get_location_by_click(driver, event_div, idx)
+
+            fields = extracted_events[idx - 1]
+            event_data = EventRecord.from_fields(subdomain, fields, location, coordinates=coordinates)
+            # Marked seen by the caller once the region is stored (see seen_index.mark_seen)
+            event_data.seen_key = event_key(fields)
+            if emit:
+                emit(event_data)
+            event_data_list.append(event_data)
+            metrics.incr("events scraped", region=subdomain)
 
-        if not all_events:
-            logger.warning("⚠️ No events collected from selected regions.")
+        except Exception as e:
+            logger.error(f"Error during processing Event {idx}: {e}")
+
+    logger.info(f"📍 {subdomain}: {fallback_count}/{len(new_indexes)} events needed the click fallback for location.")
+    return event_data_list
+
+def get_output_choice():
+    while True:
+        output_choice = input(f"\nSave scraped data to: [{' / '.join(OUTPUT_CHOICES)}] → ").strip().lower()
+        if output_choice in OUTPUT_CHOICES:
+            return output_choice
+        print(f"Invalid input. Please enter {', '.join(repr(choice) for choice in OUTPUT_CHOICES[:-1])}, "
+              f"or {OUTPUT_CHOICES[-1]!r}.")
+
+OUTPUT_CHOICES = list(OUTPUT_SINKS)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape liveuamap.com regions.")
+    parser.add_argument("--regions", help="'all' or comma-separated subdomains, names or catalog numbers")
+    parser.add_argument("--output", choices=OUTPUT_CHOICES, help="where to save scraped events")
+    parser.add_argument("--config", help="JSON file with 'regions' and 'output' keys")
+    parser.add_argument("--refresh-regions", action="store_true", help="rediscover regions instead of using the cache")
+    parser.add_argument("--list-regions", action="store_true", help="print the region catalog and exit")
+    parser.add_argument("--backfill", metavar="HORIZON", type=parse_duration,
+                        help="scroll each feed back to this age, e.g. 24h or 7d")
+    parser.add_argument("--tier", choices=TIERS, default="auto",
+                        help="auto: plain HTTP first, browser only for regions that need it (default)")
+    parser.add_argument("--fetch-images", action="store_true",
+                        help="download event images into the content-addressed cache while scraping")
+    parser.add_argument("--metrics-out", metavar="PATH",
+                        help="where to write the run's timing summary (default: .liveuamap_state/metrics/)")
+    parser.add_argument("--resume", metavar="RUN", nargs="?", const="latest",
+                        help="finish an interrupted run: its id or manifest path, or the latest run if omitted")
+    parser.add_argument("--search-index", action="store_true", default=SEARCH_INDEX,
+                        help="also add events to the local full-text index (query with search_index.py)")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="keep events that were already seen in another region")
+    parser.add_argument("--retries", type=int,
+                        help=f"extra attempts for a region that fails (default: {DEFAULT_RETRIES})")
+    args = parser.parse_args(argv)
+
+    args.region_retries = DEFAULT_RETRIES
+    if args.config:
+        config = load_run_config(args.config)
+        args.regions = args.regions or config.get("regions")
+        args.output = args.output or config.get("output")
+        # An int for every region, or {"subdomain": retries} for flaky ones
+        args.region_retries = config.get("retries", DEFAULT_RETRIES)
+        if args.output and args.output not in OUTPUT_CHOICES:
+            parser.error(f"invalid output in {args.config}: {args.output}")
+    if args.retries is not None:
+        args.region_retries = args.retries
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics.observe("startup import", IMPORT_SECONDS)
+    logger.info(f"🚀 Modules imported in {IMPORT_SECONDS * 1000:.0f} ms.")
+    # No browser starts until a region (or the region modal) actually needs one
+    pool = DriverPool(size=WORKERS)
+    sinks = None
+    image_fetcher = None
+    manifest = None
+    dedup = Deduplicator.load() if DEDUP and not args.no_dedup else None
+    try:
+        if args.resume:
+            manifest = RunManifest.find(args.resume)
+            selected_subdomains = manifest.unfinished()
+            # Finish the run the way it was started
+            options = manifest.options
+            args.output = options.get("output")
+            args.tier = options.get("tier", args.tier)
+            args.backfill = timedelta(seconds=options["backfill"]) if options.get("backfill") else None
+            args.fetch_images = options.get("fetch_images", False)
+            logger.info(f"🔁 Resuming run {manifest.run_id}: {len(selected_subdomains)} regions left.")
+        elif args.regions and not (args.refresh_regions or args.list_regions or needs_catalog(args.regions)):
+            # Explicit subdomains: only consult an existing cache, never open the region modal
+            regions = get_regions(lambda: [], ttl=None)
+            selected_subdomains = select_regions(regions or [], args.regions)
+        else:
+            regions = get_regions(lambda: get_available_regions(pool), refresh=args.refresh_regions)
+            if args.list_regions:
+                for idx, region in enumerate(regions, 1):
+                    parent = f" ({region['parent']})" if region.get("parent") else ""
+                    print(f"{idx}. {region['name']} [{region['subdomain']}]{parent}")
+                return
+            if args.regions:
+                selected_subdomains = select_regions(regions, args.regions)
+            else:
+                selected_subdomains = get_user_selected_regions(regions)
+
+        if not selected_subdomains:
+            logger.warning("⚠️ No regions selected." if manifest is None else "✅ Nothing left to resume.")
             return
 
-        # Prompt user where to save
-        while True:
-            output_choice = input("\nSave scraped data to: [csv / mongo / both] → ").strip().lower()
-            if output_choice in ["csv", "mongo", "both"]:
-                break
-            print("Invalid input. Please enter 'csv', 'mongo', or 'both'.")
-
-        if output_choice in ["csv", "both"]:
-            save_to_csv(all_events)
-
-        if output_choice in ["mongo", "both"]:
-            for subdomain in selected_subdomains:
-                relevant_data = [e for e in all_events if e["region"] == subdomain]
-                store_data_in_mongo(relevant_data, subdomain.lower())
+        # Decide on outputs up front so events can be written as they are scraped
+        output_choice = args.output or get_output_choice()
+        if manifest is None:
+            manifest = RunManifest.create(selected_subdomains, retries=args.region_retries, options={
+                "output": output_choice, "tier": args.tier,
+                "backfill": args.backfill.total_seconds() if args.backfill else None,
+                "fetch_images": args.fetch_images,
+            })
+        sinks = SinkSet.for_output(output_choice, extra=["search"] if args.search_index else [])
+        # Rows an earlier attempt of this run already streamed (before a region failed, or before
+        # the crash being resumed from) aren't written again; the region's batch sinks still get them
+        sinks.on_streamed(manifest.record_streamed)
+
+        def write_event(event):
+            if manifest.claim_stream(event["region"], event_key(event)):
+                sinks.write(event)
+
+        if args.fetch_images:
+            # Lazy so the HTTP client is only set up when images are wanted
+            from image_fetcher import ImageFetcher
+
+            image_fetcher = ImageFetcher()
+
+            def emit(event):
+                # Written once its image is cached; the scrape loop doesn't wait for downloads
+                image_fetcher.submit(event, then=write_event)
+        else:
+            emit = write_event
+
+        if dedup is not None:
+            def on_duplicate(canonical, event):
+                # Flagged on the record, so store_region leaves it out of the region's commit
+                event.duplicate_of = canonical.key
+                sinks.add_region(canonical, event["region"])
+
+            # Before images and sinks, so a duplicate is neither downloaded nor stored
+            emit = dedup.wrap(emit, on_duplicate)
+
+        def store_region(subdomain, events):
+            if image_fetcher is not None:
+                image_fetcher.wait()
+            if manifest.status(subdomain) == FAILED:
+                # Already recorded by manifest.track; left for the retry pass
+                return
+            kept = [event for event in events if event.duplicate_of is None]
+            if len(kept) < len(events):
+                logger.info(f"🧬 {subdomain}: {len(events) - len(kept)} events already seen in other regions.")
+            try:
+                outputs = sinks.commit(subdomain, kept)
+            except Exception as e:
+                # Failed rather than left in-progress, so the retry pass and --resume pick it up
+                manifest.mark_failed(subdomain, e)
+                raise
+            manifest.mark_done(subdomain, len(kept), outputs)
+            if INCREMENTAL:
+                # Duplicates too: their canonical event is stored. Not before the commit, so a region
+                # whose sinks failed is scraped in full again
+                mark_seen(subdomain, events)
+            metrics.incr("regions scraped")
+
+        if args.backfill:
+            from backfill import backfill_region
+
+            # Scrolling the feed back in time needs the browser
+            scrape_fn = partial(backfill_region, horizon=args.backfill, emit=emit)
+            tier = "browser"
+        else:
+            scrape_fn = partial(scrape_region, emit=emit)
+            tier = args.tier
+        scrape_fn = manifest.track(scrape_fn)
+
+        counts = {}
+        pending = selected_subdomains
+        while pending:
+            manifest.mark_started(pending)
+            pass_counts, stats = scrape_regions_hybrid(
+                pool, pending, scrape_fn, workers=WORKERS, on_result=store_region, emit=emit, tier=tier
+            )
+            counts.update(pass_counts)
+            for subdomain in pending:
+                if stats.get(subdomain, {}).get("tier") == "skipped":
+                    manifest.mark_failed(subdomain, stats[subdomain].get("http_result"))
+            pending = manifest.retryable()
+            if pending:
+                logger.info(f"🔁 Retrying {len(pending)} failed regions: {', '.join(pending)}")
+
+        if not sum(counts.values()):
+            logger.warning("⚠️ No events collected from selected regions.")
 
     except Exception as e:
         logger.error(f"Scraper encountered an error: {e}")
+    finally:
+        if image_fetcher is not None:
+            image_fetcher.close()
+        if sinks is not None:
+            sinks.close()
+        if dedup is not None:
+            dedup.save()
+        pool.close()
+        if manifest is not None:
+            counts = manifest.counts()
+            logger.info(f"🗒️ Run {manifest.run_id}: {counts['done']} regions done, {counts['failed']} failed, "
+                        f"{counts['pending'] + counts['in-progress']} unfinished.")
+            if counts["done"] < len(manifest.regions):
+                logger.info(f"🗒️ Resume with: --resume {manifest.run_id}")
+        if "waits" in sys.modules:
+            # Only loaded if a browser ran
+            sys.modules["waits"].wait_stats.log_summary()
+        metrics.log_summary()
+        metrics.write_summary(args.metrics_out)
 
 
 if __name__ == "__main__":
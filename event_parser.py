@@ -0,0 +1,143 @@
+import json
+import logging
+import sys
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+# Fields read from each event node; a field the node doesn't have is None. "timestamp" is
+# an exact time when the markup carries one (data-time on the node, datetime on the date)
+EVENT_FIELDS = ["date", "timestamp", "source_url", "data", "img_src"]
+TIMESTAMP_ATTRS = ["data-time", "data-timestamp", "datetime"]
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+def _collapse_whitespace(text):
+    return " ".join(text.split())
+
+
+class _EventFeedParser(HTMLParser):
+    """Collects every div[class^='event cat'] in a single pass over the markup."""
+
+    def __init__(self, base_url=None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.events = []
+        self._current = None
+        self._depth = 0
+        self._label_depth = None
+        self._capture = None
+        self._capture_depth = None
+        self._buffer = []
+
+    def _absolute(self, url):
+        if url and self.base_url:
+            return urljoin(self.base_url, url)
+        return url
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+
+        if self._current is None:
+            if tag == "div" and (attrs.get("class") or "").startswith("event cat"):
+                self._current = {"event_id": attrs.get("id") or attrs.get("data-id")}
+                self._set_timestamp(attrs)
+                self._depth = 1
+            return
+
+        if tag not in VOID_TAGS:
+            self._depth += 1
+
+        if tag == "label" and self._label_depth is None:
+            self._label_depth = self._depth
+        elif tag == "img" and self._label_depth is not None and "img_src" not in self._current:
+            self._current["img_src"] = self._absolute(attrs.get("src"))
+        elif tag == "a" and "source-link" in classes and "source_url" not in self._current:
+            self._current["source_url"] = self._absolute(attrs.get("href"))
+        elif self._capture is None:
+            if tag == "span" and "date_add" in classes and "date" not in self._current:
+                self._set_timestamp(attrs)
+                self._start_capture("date")
+            elif tag == "div" and "title" in classes and "data" not in self._current:
+                self._start_capture("data")
+
+    def handle_endtag(self, tag):
+        if self._current is None or tag in VOID_TAGS:
+            return
+
+        if self._capture is not None and self._depth == self._capture_depth:
+            self._current[self._capture] = _collapse_whitespace("".join(self._buffer))
+            self._capture = None
+            self._capture_depth = None
+            self._buffer = []
+
+        if self._label_depth is not None and self._depth == self._label_depth:
+            self._label_depth = None
+
+        self._depth -= 1
+        if self._depth == 0:
+            self._finish_event()
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._buffer.append(data)
+
+    def _set_timestamp(self, attrs):
+        for name in TIMESTAMP_ATTRS:
+            if attrs.get(name) and "timestamp" not in self._current:
+                self._current["timestamp"] = attrs[name]
+
+    def _start_capture(self, field):
+        self._capture = field
+        self._capture_depth = self._depth
+        self._buffer = []
+
+    def _finish_event(self):
+        event = {"event_id": self._current.get("event_id")}
+        for field in EVENT_FIELDS:
+            event[field] = self._current.get(field) or None
+        self.events.append(event)
+        self._current = None
+        self._label_depth = None
+        self._capture = None
+        self._capture_depth = None
+        self._buffer = []
+
+    def close(self):
+        super().close()
+        # Truncated markup (e.g. a partial page dump) still yields the last event
+        if self._current is not None:
+            self._finish_event()
+
+
+def parse_events(html, base_url=None, region=None):
+    """Parse event records out of a page source or a div.scroller fragment."""
+    parser = _EventFeedParser(base_url=base_url)
+    parser.feed(html)
+    parser.close()
+
+    events = parser.events
+    if region is not None:
+        events = [{"region": region, **event} for event in events]
+    logger.debug(f"Parsed {len(events)} events from HTML.")
+    return events
+
+
+def parse_events_file(path, base_url=None, region=None):
+    with open(path, encoding="utf-8") as f:
+        return parse_events(f.read(), base_url=base_url, region=region)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python event_parser.py <saved_page.html> [base_url]")
+        sys.exit(1)
+    base = sys.argv[2] if len(sys.argv) > 2 else None
+    for record in parse_events_file(sys.argv[1], base_url=base):
+        print(json.dumps(record, ensure_ascii=False))
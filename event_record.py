@@ -0,0 +1,232 @@
+import sys
+import csv
+import json
+
+from coordinates import format_coordinates, parse_coordinates
+from date_normalizer import normalize_event_time, parse_timestamp
+
+# Column order of every output: the original scraped_events.csv columns, with the
+# normalized UTC time (see date_normalizer.normalize_date) next to the raw date, the
+# decimal coordinates next to the location text and, last, every region the event was
+# seen in (see dedup.Deduplicator)
+FIELDS = ("region", "date", "time", "time_precision", "source_url", "data", "img_src", "location", "lat", "lon",
+          "img_sha256", "img_path", "regions")
+
+# What snapshot outputs (CSV/JSONL, the event store, per-scrape Mongo documents) write.
+# `regions` only fills in as duplicates arrive from other regions, often after the
+# event was written, so it is kept only by sinks that update stored events in place
+# (mongo-events, search)
+FILE_FIELDS = tuple(field for field in FIELDS if field != "regions")
+
+# Few distinct values across a sweep ("4 days ago", region names, place names), so one
+# shared string per value instead of one per event
+INTERNED_FIELDS = frozenset(["region", "date", "time_precision", "location"])
+# Decimal degrees; read back from CSV cells as text
+FLOAT_FIELDS = frozenset(["lat", "lon"])
+
+# Placeholders older versions wrote instead of leaving a field empty; read back as missing
+LEGACY_MISSING = {
+    "date": "Date not found",
+    "source_url": "Source not found",
+    "data": "Data not found",
+    "img_src": "Image not found",
+    "location": "Location not found",
+}
+
+
+def clean_value(field, value):
+    """None for empty values and legacy placeholders, interned strings for low-cardinality fields."""
+    if value is None or value == "" or value == LEGACY_MISSING.get(field):
+        return None
+    if field in INTERNED_FIELDS and type(value) is str:
+        return sys.intern(value)
+    if field in FLOAT_FIELDS:
+        return float(value)
+    return value
+
+
+class EventRecord:
+    """One scraped event: fixed slots instead of a per-event dict, None where a field is missing.
+
+    Supports the read/write subset of the dict interface the scrapers and
+    sinks use (`record["date"]`, `.get()`, `.items()`), so it can be passed
+    anywhere an event dict used to go. `duplicate_of` and `seen_key` are not
+    output fields: dedup sets `duplicate_of` to the canonical event's key when
+    the record repeats an event already seen in another region, and the
+    scrapers set `seen_key` to the event's seen_index.event_key so the caller
+    can mark it seen once the event is stored.
+    """
+
+    __slots__ = FIELDS + ("duplicate_of", "seen_key")
+
+    def __init__(self, region=None, date=None, time=None, time_precision=None, source_url=None, data=None,
+                 img_src=None, location=None, lat=None, lon=None, img_sha256=None, img_path=None, regions=None):
+        self.region = clean_value("region", region)
+        self.date = clean_value("date", date)
+        self.time = clean_value("time", time)
+        self.time_precision = clean_value("time_precision", time_precision)
+        self.source_url = clean_value("source_url", source_url)
+        self.data = clean_value("data", data)
+        self.img_src = clean_value("img_src", img_src)
+        self.location = clean_value("location", location)
+        self.lat = clean_value("lat", lat)
+        self.lon = clean_value("lon", lon)
+        self.img_sha256 = img_sha256
+        self.img_path = img_path
+        self.regions = regions
+        self.duplicate_of = None
+        self.seen_key = None
+
+    @classmethod
+    def from_fields(cls, region, fields, location, scraped_at=None, coordinates=None):
+        """Record for a just-scraped event from its extracted fields, with its date normalized to UTC.
+
+        `coordinates` is the exact (lat, lon) from the page's data when it had
+        them; otherwise lat/lon come from the location text (e.g. the marker
+        popup's '14°20′N 42°17′E'), which is only precise to the arc-minute.
+        """
+        time, time_precision = normalize_event_time(fields.get("date"), fields.get("timestamp"), scraped_at)
+        if coordinates is not None:
+            lat, lon = coordinates
+            location = location or format_coordinates(lat, lon)
+        else:
+            lat, lon = parse_coordinates(location) or (None, None)
+        return cls(region=region, date=fields.get("date"), time=time, time_precision=time_precision,
+                   source_url=fields.get("source_url"), data=fields.get("data"), img_src=fields.get("img_src"),
+                   location=location, lat=lat, lon=lon)
+
+    @classmethod
+    def from_dict(cls, mapping):
+        """Build a record from an event dict (or CSV row); unknown keys are dropped."""
+        values = {field: mapping.get(field) for field in FIELDS}
+        if isinstance(values["regions"], str):
+            values["regions"] = values["regions"].split(";")
+        return cls(**values)
+
+    def __getitem__(self, field):
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in FIELDS:
+            raise KeyError(field)
+        setattr(self, field, clean_value(field, value))
+
+    def __contains__(self, field):
+        return field in FIELDS
+
+    def get(self, field, default=None):
+        if field not in FIELDS:
+            return default
+        return getattr(self, field)
+
+    def keys(self):
+        return list(FIELDS)
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in FIELDS]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, EventRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    def __repr__(self):
+        return f"EventRecord(region={self.region!r}, date={self.date!r}, source_url={self.source_url!r})"
+
+
+def as_record(event):
+    return event if isinstance(event, EventRecord) else EventRecord.from_dict(event)
+
+
+def read_event_file(path):
+    """EventRecords from a scraped_events CSV or JSONL file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [EventRecord.from_dict(json.loads(line)) for line in f if line.strip()]
+        return [EventRecord.from_dict(row) for row in csv.DictReader(f)]
+
+
+class EventBatch:
+    """A run of events stored column by column, which is how the sinks write them.
+
+    Built once per flush or per region and shared by every sink, so each
+    output serializes straight from the columns rather than from per-event
+    dicts. Iterating yields the EventRecords the batch was built from.
+    """
+
+    def __init__(self, records):
+        self.records = [as_record(event) for event in records]
+        self.columns = {field: [getattr(record, field) for record in self.records] for field in FIELDS}
+
+    @classmethod
+    def of(cls, events):
+        return events if isinstance(events, EventBatch) else cls(events)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def slice(self, start, stop):
+        return EventBatch(self.records[start:stop])
+
+    def rows(self, fields=FIELDS, flat=False):
+        """Tuples in `fields` order; fields the records don't have come out as None.
+
+        With flat=True list values (regions) are joined with ';' for CSV cells.
+        """
+        empty = [None] * len(self.records)
+        columns = [self.columns.get(field, empty) for field in fields]
+        if flat:
+            columns = [[";".join(value) if isinstance(value, list) else value for value in column]
+                       if field == "regions" else column for field, column in zip(fields, columns)]
+        return zip(*columns)
+
+    def normalized_times(self, scraped_at=None):
+        """(time, time_precision) per event; records from files written before times were
+        normalized get them from their date, anchored on `scraped_at` (default: now)."""
+        normalized = {}
+        times = []
+        for time, precision, date in zip(self.columns["time"], self.columns["time_precision"], self.columns["date"]):
+            if time is None and date is not None:
+                if date not in normalized:
+                    normalized[date] = normalize_event_time(date, scraped_at=scraped_at)
+                time, precision = normalized[date]
+            times.append((time, precision))
+        return times
+
+    def documents(self, exclude=()):
+        """One dict per event for BSON encoding, nulls included and `time` as a UTC datetime."""
+        fields = [field for field in FIELDS if field not in exclude]
+        documents = [dict(zip(fields, row)) for row in self.rows(fields)]
+        if "time" in fields:
+            for document in documents:
+                document["time"] = parse_timestamp(document["time"])
+        return documents
+
+    def jsonl_lines(self, fields=FILE_FIELDS):
+        """One JSON object per event, each column encoded once per distinct value."""
+        encoded = []
+        for field in fields:
+            cache = {}
+            values = []
+            for value in self.columns[field]:
+                text = cache.get(value) if field in INTERNED_FIELDS else None
+                if text is None:
+                    text = json.dumps(value, ensure_ascii=False, default=str)
+                    if field in INTERNED_FIELDS:
+                        cache[value] = text
+                values.append(text)
+            encoded.append(values)
+        keys = [json.dumps(field) for field in fields]
+        return ["{" + ", ".join(f"{key}: {value}" for key, value in zip(keys, row)) + "}"
+                for row in zip(*encoded)]
@@ -0,0 +1,312 @@
+import os
+import json
+import shutil
+import logging
+import argparse
+import itertools
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from coordinates import parse_coordinate_columns
+from event_record import EventBatch, EventRecord, read_event_file
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.environ.get("LIVEUAMAP_EVENT_STORE", "event_store")
+# A day partition holding more parts than this is merged back into one after a write
+COMPACT_PARTS = int(os.environ.get("LIVEUAMAP_STORE_COMPACT_PARTS", "32"))
+
+# Numeric columns, one .npy file each, opened memory-mapped at query time
+COLUMNS = {"lat": np.float64, "lon": np.float64, "time": "datetime64[s]", "scraped_at": "datetime64[s]"}
+RECORDS_FILE = "records.jsonl"
+OFFSETS_FILE = "offsets.npy"
+
+
+def to_datetime64(value):
+    """UTC seconds from a datetime (naive means UTC), ISO string or numpy datetime64."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(value, "s")
+    return np.datetime64(value, "s")
+
+
+def event_coordinates(batch):
+    """lat and lon arrays: each record's own coordinates, else parsed from its location text (older files)."""
+    columns = batch.columns
+    pending = [location if lat is None or lon is None else None
+               for lat, lon, location in zip(columns["lat"], columns["lon"], columns["location"])]
+    parsed_lats, parsed_lons = parse_coordinate_columns(pending)
+    lats, lons = [], []
+    for lat, lon, parsed_lat, parsed_lon in zip(columns["lat"], columns["lon"], parsed_lats, parsed_lons):
+        if lat is None or lon is None:
+            lat, lon = parsed_lat, parsed_lon
+        lats.append(np.nan if lat is None else lat)
+        lons.append(np.nan if lon is None else lon)
+    return np.array(lats, dtype=np.float64), np.array(lons, dtype=np.float64)
+
+
+def event_times(batch, scraped_at):
+    """The batch with each event's normalized UTC time and precision, and the times as an array.
+
+    Records from older files have no time; theirs is normalized from the
+    date against scraped_at and kept, with its precision, on a copy of the
+    record, so the caller's records (shared with other sinks) are unchanged.
+    """
+    anchor = scraped_at.astype(datetime).replace(tzinfo=timezone.utc)
+    records = []
+    times = []
+    for record, (time, precision) in zip(batch.records, batch.normalized_times(anchor)):
+        if record.time is None and time is not None:
+            record = EventRecord.from_dict(dict(record.to_dict(), time=time, time_precision=precision))
+        records.append(record)
+        # Events with no readable date at all are filed under when they were scraped
+        times.append(time.rstrip("Z") if time else scraped_at)
+    return EventBatch(records), np.array(times, dtype="datetime64[s]")
+
+
+class EventStore:
+    """Events on disk as NumPy columns, partitioned as <root>/region=<r>/day=<YYYY-MM-DD>/<part>/.
+
+    The day is that of the event's normalized UTC time. Each part holds
+    lat/lon/time/scraped_at arrays plus the full records as JSON lines with
+    a byte-offset index. Queries prune partitions by region and day from
+    the directory names, filter the memory-mapped arrays with vectorized
+    masks and only read the records that match.
+    """
+
+    def __init__(self, root=STORE_DIR, compact_parts=COMPACT_PARTS):
+        self.root = root
+        self.compact_parts = compact_parts
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    # Writing
+
+    def append(self, events, region=None, scraped_at=None):
+        """Store a batch of events; `region` fills in records that don't name one. Returns the count."""
+        batch = EventBatch.of(events)
+        if not batch:
+            return 0
+        scraped_at = to_datetime64(scraped_at or datetime.now(timezone.utc))
+        batch, times = event_times(batch, scraped_at)
+        lats, lons = event_coordinates(batch)
+        columns = {
+            "lat": lats,
+            "lon": lons,
+            "time": times,
+            "scraped_at": np.full(len(batch), scraped_at, dtype="datetime64[s]"),
+        }
+
+        regions = np.array([r or region or "unknown" for r in batch.columns["region"]], dtype=object)
+        days = columns["time"].astype("datetime64[D]")
+        with metrics.timer("sink write", sink="store"), self._lock:
+            for partition_region in np.unique(regions):
+                in_region = regions == partition_region
+                for day in np.unique(days[in_region]):
+                    indexes = np.flatnonzero(in_region & (days == day))
+                    directory = self._partition_dir(partition_region, day)
+                    self._write_part(directory, batch, columns, indexes)
+                    if self.compact_parts and len(self._parts(directory)) > self.compact_parts:
+                        self._compact_partition(directory)
+        return len(batch)
+
+    def _partition_dir(self, region, day):
+        return os.path.join(self.root, f"region={region}", f"day={day}")
+
+    def _write_part(self, directory, batch, columns, indexes):
+        name = f"part-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{os.getpid()}-{next(self._sequence)}"
+        tmp_dir = os.path.join(directory, f".{name}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        for column in COLUMNS:
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), columns[column][indexes])
+
+        lines = EventBatch([batch.records[idx] for idx in indexes]).jsonl_lines()
+        encoded = [f"{line}\n".encode("utf-8") for line in lines]
+        offsets = np.zeros(len(encoded), dtype=np.int64)
+        if encoded:
+            offsets[1:] = np.cumsum([len(line) for line in encoded[:-1]])
+        with open(os.path.join(tmp_dir, RECORDS_FILE), "wb") as f:
+            f.writelines(encoded)
+        np.save(os.path.join(tmp_dir, OFFSETS_FILE), offsets)
+        # Parts appear whole or not at all; readers skip dot-prefixed directories
+        os.replace(tmp_dir, os.path.join(directory, name))
+
+    @staticmethod
+    def _parts(directory):
+        try:
+            names = sorted(name for name in os.listdir(directory) if not name.startswith("."))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(directory, name) for name in names]
+
+    def _compact_partition(self, directory):
+        parts = self._parts(directory)
+        if len(parts) < 2:
+            return
+        merged = {column: np.concatenate([np.load(os.path.join(part, f"{column}.npy")) for part in parts])
+                  for column in COLUMNS}
+        records = []
+        for part in parts:
+            with open(os.path.join(part, RECORDS_FILE), encoding="utf-8") as f:
+                records.extend(EventRecord.from_dict(json.loads(line)) for line in f)
+        self._write_part(directory, EventBatch(records), merged, np.arange(len(records)))
+        for part in parts:
+            shutil.rmtree(part, ignore_errors=True)
+        logger.info(f"🗜️ Compacted {len(parts)} parts in {directory}.")
+
+    def compact(self, regions=None):
+        with self._lock:
+            for _, directory in self._partitions(regions):
+                self._compact_partition(directory)
+
+    # Reading
+
+    def _partitions(self, regions=None, start=None, end=None):
+        """(region, partition dir) pairs that can hold events for these regions and [start, end)."""
+        start_day = None if start is None else start.astype("datetime64[D]")
+        end_day = None if end is None else end.astype("datetime64[D]")
+        try:
+            region_names = sorted(os.listdir(self.root))
+        except FileNotFoundError:
+            return
+        for region_name in region_names:
+            if not region_name.startswith("region="):
+                continue
+            region = region_name[len("region="):]
+            if regions and region not in regions:
+                continue
+            region_dir = os.path.join(self.root, region_name)
+            for day_name in sorted(os.listdir(region_dir)):
+                if not day_name.startswith("day="):
+                    continue
+                day = np.datetime64(day_name[len("day="):], "D")
+                if start_day is not None and day < start_day:
+                    continue
+                if end_day is not None and day > end_day:
+                    continue
+                yield region, os.path.join(region_dir, day_name)
+
+    @staticmethod
+    def _mask(part, bbox, start, end):
+        columns = {column: np.load(os.path.join(part, f"{column}.npy"), mmap_mode="r")
+                   for column in ("lat", "lon", "time")}
+        mask = np.ones(len(columns["time"]), dtype=bool)
+        if bbox is not None:
+            south, west, north, east = bbox
+            lat, lon = columns["lat"], columns["lon"]
+            # NaN (no coordinates) fails every comparison, so those events drop out here
+            mask &= (lat >= south) & (lat <= north)
+            if west <= east:
+                mask &= (lon >= west) & (lon <= east)
+            else:
+                # Box crossing the antimeridian
+                mask &= (lon >= west) | (lon <= east)
+        if start is not None:
+            mask &= columns["time"] >= start
+        if end is not None:
+            mask &= columns["time"] < end
+        return mask, columns
+
+    def _matches(self, bbox=None, start=None, end=None, regions=None):
+        start, end = to_datetime64(start), to_datetime64(end)
+        regions = set(regions) if regions else None
+        for region, directory in self._partitions(regions, start, end):
+            for part in self._parts(directory):
+                mask, columns = self._mask(part, bbox, start, end)
+                indexes = np.flatnonzero(mask)
+                if len(indexes):
+                    yield part, indexes, columns
+
+    def count(self, bbox=None, start=None, end=None, regions=None):
+        return int(sum(len(indexes) for _, indexes, _ in self._matches(bbox, start, end, regions)))
+
+    def arrays(self, bbox=None, start=None, end=None, regions=None):
+        """Matching lat/lon/time as concatenated arrays, without reading any records."""
+        chunks = {"lat": [], "lon": [], "time": []}
+        for _, indexes, columns in self._matches(bbox, start, end, regions):
+            for column in chunks:
+                chunks[column].append(np.asarray(columns[column][indexes]))
+        return {column: np.concatenate(values) if values else np.array([], dtype=COLUMNS[column])
+                for column, values in chunks.items()}
+
+    def query(self, bbox=None, start=None, end=None, regions=None, limit=None):
+        """Matching events as dicts with lat, lon and ISO time added, in region then day order.
+
+        `bbox` is (south, west, north, east) in decimal degrees; `start` and
+        `end` bound the event time as a half-open UTC window. An event with no
+        readable date has the time it was scraped and a null time_precision.
+        """
+        results = []
+        for part, indexes, columns in self._matches(bbox, start, end, regions):
+            offsets = np.load(os.path.join(part, OFFSETS_FILE), mmap_mode="r")
+            with open(os.path.join(part, RECORDS_FILE), "rb") as f:
+                for idx in indexes:
+                    f.seek(int(offsets[idx]))
+                    event = json.loads(f.readline())
+                    lat, lon = float(columns["lat"][idx]), float(columns["lon"][idx])
+                    event["lat"] = None if np.isnan(lat) else lat
+                    event["lon"] = None if np.isnan(lon) else lon
+                    event["time"] = f"{columns['time'][idx]}Z"
+                    results.append(event)
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+
+def parse_bbox(text):
+    values = [float(value) for value in text.split(",")]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("expected south,west,north,east")
+    return tuple(values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar event store with bounding-box and time queries.")
+    parser.add_argument("--store", default=STORE_DIR, help=f"store directory (default: {STORE_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="load scraped CSV/JSONL files into the store")
+    load.add_argument("paths", nargs="+")
+    load.add_argument("--region", help="region for rows that don't have one")
+    load.add_argument("--scraped-at", help="when the file was scraped, ISO UTC (default: the file's mtime)")
+
+    query = commands.add_parser("query", help="print matching events as JSON lines")
+    query.add_argument("--bbox", type=parse_bbox, metavar="S,W,N,E", help="e.g. 12,32,30,44 for the Red Sea")
+    query.add_argument("--start", help="ISO UTC time, inclusive")
+    query.add_argument("--end", help="ISO UTC time, exclusive")
+    query.add_argument("--regions", help="comma-separated subdomains")
+    query.add_argument("--limit", type=int)
+    query.add_argument("--count", action="store_true", help="only print the number of matches")
+
+    commands.add_parser("compact", help="merge each partition's parts into one")
+    args = parser.parse_args(argv)
+
+    store = EventStore(args.store)
+    if args.command == "import":
+        for path in args.paths:
+            scraped_at = args.scraped_at or datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+            stored = store.append(read_event_file(path), region=args.region, scraped_at=scraped_at)
+            print(f"{path}: {stored} events")
+    elif args.command == "query":
+        regions = args.regions.split(",") if args.regions else None
+        if args.count:
+            print(store.count(args.bbox, args.start, args.end, regions))
+            return
+        for event in store.query(args.bbox, args.start, args.end, regions, limit=args.limit):
+            print(json.dumps(event, ensure_ascii=False))
+    else:
+        store.compact()
+
+
+if __name__ == "__main__":
+    # Red Sea events from the last week: python event_store.py query --bbox 12,32,30,44 --start 2025-07-01
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
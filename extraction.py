@@ -0,0 +1,120 @@
+import logging
+import time
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from event_parser import EVENT_FIELDS, parse_events
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EVENT_SELECTOR = "div[class^='event cat']"
+
+# field -> (css selector inside the event div, attribute to read or None for text)
+FIELD_SELECTORS = {
+    "date": ("span.date_add", None),
+    "timestamp": ("span.date_add", "datetime"),
+    "source_url": ("a.source-link", "href"),
+    "data": ("div.title", None),
+    "img_src": ("label img", "src"),
+}
+
+# Extraction modes, tried in this order until one returns a record per event node
+EXTRACTION_MODES = ["bulk", "html", "element"]
+
+# One round trip: walk every event node in the page and return plain objects.
+# When arguments[1] names an attribute, each node is stamped with it so a later
+# ":not([attr])" selector skips nodes that were already extracted.
+BULK_EXTRACT_JS = """
+var nodes = document.querySelectorAll(arguments[0]);
+var mark = arguments[1];
+var records = [];
+function text(node, selector) {
+    var el = node.querySelector(selector);
+    return el ? (el.innerText || el.textContent || "").trim() : null;
+}
+function attr(node, selector, name) {
+    var el = node.querySelector(selector);
+    return el ? (el[name] || el.getAttribute(name)) : null;
+}
+function timestamp(node) {
+    return node.getAttribute("data-time") || node.getAttribute("data-timestamp")
+        || attr(node, "span.date_add", "datetime");
+}
+for (var i = 0; i < nodes.length; i++) {
+    var node = nodes[i];
+    records.push({
+        event_id: node.id || node.getAttribute("data-id"),
+        date: text(node, "span.date_add"),
+        timestamp: timestamp(node),
+        source_url: attr(node, "a.source-link", "href"),
+        data: text(node, "div.title"),
+        img_src: attr(node, "label img", "src")
+    });
+    if (mark) { node.setAttribute(mark, "1"); }
+}
+return records;
+"""
+
+
+def _fill_missing(record):
+    for field in EVENT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = " ".join(value.split())
+        record[field] = value or None
+    return record
+
+
+def extract_events_bulk(driver, selector=EVENT_SELECTOR, mark=None):
+    """Extract every event's fields with a single execute_script call."""
+    try:
+        records = driver.execute_script(BULK_EXTRACT_JS, selector, mark)
+    except WebDriverException as e:
+        logger.warning(f"⚠️ Bulk extraction script failed: {e}")
+        return None
+    if not isinstance(records, list):
+        return None
+    return [_fill_missing(dict(record)) for record in records]
+
+
+def extract_event_fields(event_div):
+    """Per-element fallback: one find_element round trip per field."""
+    try:
+        record = {"event_id": event_div.get_attribute("id")}
+    except WebDriverException:
+        record = {"event_id": None}
+
+    for field, (selector, attribute) in FIELD_SELECTORS.items():
+        try:
+            element = event_div.find_element(By.CSS_SELECTOR, selector)
+            record[field] = element.get_attribute(attribute) if attribute else element.text
+        except NoSuchElementException:
+            record[field] = None
+    return _fill_missing(record)
+
+
+def extract_events(driver, event_divs, base_url=None, mode="bulk"):
+    """Return one field record per node in event_divs, using the cheapest mode that lines up."""
+    start = time.perf_counter()
+    modes = EXTRACTION_MODES[EXTRACTION_MODES.index(mode):]
+
+    for current in modes:
+        if current == "bulk":
+            records = extract_events_bulk(driver)
+        elif current == "html":
+            records = parse_events(driver.page_source, base_url=base_url)
+        else:
+            records = [extract_event_fields(event_div) for event_div in event_divs]
+
+        if records is not None and len(records) == len(event_divs):
+            elapsed = time.perf_counter() - start
+            metrics.observe("extraction", elapsed, mode=current)
+            elapsed_ms = elapsed * 1000
+            logger.info(f"Extracted {len(records)} events via '{current}' mode in {elapsed_ms:.1f} ms.")
+            return records
+
+        if records is not None:
+            metrics.incr("extraction fallbacks", mode=current)
+            logger.warning(f"⚠️ '{current}' extraction returned {len(records)} records for {len(event_divs)} nodes, falling back.")
+
+    return []
@@ -0,0 +1,262 @@
+import os
+import csv
+import sys
+import json
+import html
+import logging
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from coordinates import parse_coordinates
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.environ.get("LIVEUAMAP_FIXTURE_DIR", "fixtures")
+# A frozen copy of a real scrape; the scrapers' own scraped_events.csv changes with every run
+CAPTURED_EVENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "captured_events.csv")
+EVENTS_PER_REGION = 60
+PAGE_SIZE = 20
+
+# Standalone regions and one parent with subregions, enough to exercise both discovery paths
+FIXTURE_REGIONS = [
+    {"name": "Pirates", "subdomain": "pirates", "parent": None},
+    {"name": "Ukraine", "subdomain": "ukraine", "parent": None},
+    {"name": "China", "subdomain": "china", "parent": None},
+    {"name": "Yemen", "subdomain": "yemen", "parent": "Middle East"},
+    {"name": "Israel", "subdomain": "israel", "parent": "Middle East"},
+    {"name": "Syria", "subdomain": "syria", "parent": "Middle East"},
+]
+
+# 1x1 transparent GIF served for every /pics/ URL
+PIXEL = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+
+def _age_label(index):
+    hours = index * 2
+    if hours == 0:
+        return "just now"
+    if hours == 2:
+        return "2 hours ago"
+    if hours < 24:
+        return f"{hours} hours ago"
+    days = hours // 24
+    return "a day ago" if days == 1 else f"{days} days ago"
+
+
+def load_captured_events(path=CAPTURED_EVENTS):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class FixtureSite:
+    """Liveuamap-like pages built from captured events, so scrapers can run without the network."""
+
+    def __init__(self, captured=None, events_per_region=EVENTS_PER_REGION, page_size=PAGE_SIZE,
+                 embed_coordinates=True, fixture_dir=FIXTURE_DIR):
+        self.captured = captured if captured is not None else load_captured_events()
+        self.events_per_region = events_per_region
+        self.page_size = page_size
+        self.embed_coordinates = embed_coordinates
+        self.fixture_dir = fixture_dir
+        self._events = {}
+
+    def events_for(self, subdomain):
+        if subdomain not in self._events:
+            events = []
+            for index in range(self.events_per_region):
+                row = self.captured[index % len(self.captured)]
+                img_src = row.get("img_src") or ""
+                if img_src.startswith("http") and "/pics/" in img_src:
+                    img_src = "/pics/" + img_src.split("/pics/", 1)[1]
+                else:
+                    img_src = None
+                events.append({
+                    "id": f"{zlib.crc32(subdomain.encode()) % 10000}{index:05d}",
+                    "date": _age_label(index),
+                    "source_url": row["source_url"],
+                    "data": row["data"],
+                    "img_src": img_src,
+                    "location": row["location"],
+                    "coords": parse_coordinates(row["location"]),
+                })
+            self._events[subdomain] = events
+        return self._events[subdomain]
+
+    def render_events(self, events):
+        parts = []
+        for event in events:
+            img = f'<label><img src="{html.escape(event["img_src"])}"></label>' if event["img_src"] else ""
+            parts.append(
+                f'<div class="event cat{int(event["id"]) % 7} sourcetw" id="post-{event["id"]}" '
+                f'data-id="{event["id"]}" data-location="{html.escape(event["location"])}">'
+                f'<div class="time"><span class="date_add">{event["date"]}</span>'
+                f'<a class="source-link" href="{html.escape(event["source_url"])}">source</a></div>'
+                f'<div class="title">{html.escape(event["data"])}</div>{img}</div>'
+            )
+        return "".join(parts)
+
+    def region_page(self, subdomain):
+        captured_path = os.path.join(self.fixture_dir, f"{subdomain}.html")
+        if os.path.exists(captured_path):
+            with open(captured_path, encoding="utf-8") as f:
+                return f.read()
+
+        events = self.events_for(subdomain)
+        ovens = []
+        if self.embed_coordinates:
+            ovens = [{"id": f"post-{e['id']}", "lat": e["coords"][0], "lng": e["coords"][1]}
+                     for e in events if e["coords"]]
+        return f"""<!DOCTYPE html>
+<html><head><title>{subdomain} - fixture</title></head>
+<body>
+<div id="top"><div></div><div><div></div><div><div></div><div>
+  <div></div><div></div><div></div>
+  <div class="map_link_par"><a class="map-link" href="#map" onclick="closePopup(); return false;">Jump to map</a></div>
+</div></div></div></div>
+<div id="popup"></div>
+<div class="scroller" style="height:600px; overflow-y:scroll;">{self.render_events(events[:self.page_size])}</div>
+<script>
+window.ovens = {json.dumps(ovens)};
+var offset = {self.page_size};
+var loading = false;
+function closePopup() {{ document.getElementById("popup").innerHTML = ""; }}
+document.querySelector(".scroller").addEventListener("click", function (e) {{
+    var node = e.target.closest("div.event");
+    if (!node) {{ return; }}
+    var a = document.createElement("a");
+    a.textContent = node.getAttribute("data-location");
+    var marker = document.createElement("div");
+    marker.className = "marker-time";
+    marker.appendChild(a);
+    closePopup();
+    document.getElementById("popup").appendChild(marker);
+}});
+function loadMore() {{
+    if (loading) {{ return; }}
+    loading = true;
+    fetch("/{subdomain}/feed?offset=" + offset).then(function (r) {{ return r.json(); }}).then(function (data) {{
+        var scroller = document.querySelector(".scroller");
+        scroller.insertAdjacentHTML("beforeend", data.html);
+        window.ovens = window.ovens.concat(data.ovens);
+        offset += data.count;
+        loading = false;
+    }});
+}}
+document.querySelector(".scroller").addEventListener("scroll", function () {{
+    var s = this;
+    if (s.scrollTop + s.clientHeight >= s.scrollHeight - 50) {{ loadMore(); }}
+}});
+</script>
+</body></html>"""
+
+    def feed_chunk(self, subdomain, offset):
+        events = self.events_for(subdomain)[offset:offset + self.page_size]
+        ovens = []
+        if self.embed_coordinates:
+            ovens = [{"id": f"post-{e['id']}", "lat": e["coords"][0], "lng": e["coords"][1]}
+                     for e in events if e["coords"]]
+        return {"html": self.render_events(events), "ovens": ovens, "count": len(events)}
+
+    def home_page(self):
+        standalone = [r for r in FIXTURE_REGIONS if not r["parent"]]
+        parents = sorted({r["parent"] for r in FIXTURE_REGIONS if r["parent"]})
+        links = "".join(
+            f'<li><a class="modalRegName" href="https://{r["subdomain"]}.liveuamap.com/" title="{r["name"]}">{r["name"]}</a></li>'
+            for r in standalone
+        )
+        links += "".join(
+            f'<li><a class="modalRegName hasLvl" href="#" title="{p}" onclick="showParent(this.title); return false;">{p}</a></li>'
+            for p in parents
+        )
+        children = {p: [r for r in FIXTURE_REGIONS if r["parent"] == p] for p in parents}
+        return f"""<!DOCTYPE html>
+<html><head><title>liveuamap fixture</title></head>
+<body>
+<button id="modalRegions" onclick="document.getElementById('regions').style.display='block';">Select regions</button>
+<div id="regions" class="modal" style="display:none;">
+  <div class="modal-body" style="height:400px; overflow-y:scroll;">
+    <ul id="all">{links}</ul>
+    <div id="sub" style="display:none;"><a class="retallregs" href="#" onclick="showAll(); return false;">All regions</a><ul id="sublist"></ul></div>
+  </div>
+</div>
+<script>
+var children = {json.dumps(children)};
+function showParent(title) {{
+    var list = document.getElementById("sublist");
+    list.innerHTML = children[title].map(function (r) {{
+        return '<li class="col-md-4"><a href="https://' + r.subdomain + '.liveuamap.com/" title="' + r.name + '">' + r.name + '</a></li>';
+    }}).join("");
+    document.getElementById("all").style.display = "none";
+    document.getElementById("sub").style.display = "block";
+}}
+function showAll() {{
+    document.getElementById("sublist").innerHTML = "";
+    document.getElementById("sub").style.display = "none";
+    document.getElementById("all").style.display = "block";
+}}
+</script>
+</body></html>"""
+
+
+def _make_handler(site):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def _send(self, body, content_type="text/html; charset=utf-8", status=200):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            parts = [part for part in parsed.path.split("/") if part]
+            if not parts:
+                return self._send(site.home_page())
+            if parts[0] == "pics":
+                return self._send(PIXEL, "image/gif")
+            if len(parts) == 1:
+                return self._send(site.region_page(parts[0]))
+            if len(parts) == 2 and parts[1] == "feed":
+                offset = int(parse_qs(parsed.query).get("offset", ["0"])[0])
+                return self._send(json.dumps(site.feed_chunk(parts[0], offset)), "application/json")
+            self._send("Not found", "text/plain", status=404)
+
+        def log_message(self, format, *args):
+            logger.debug("fixture: " + format, *args)
+
+    return FixtureHandler
+
+
+def start_fixture_server(site=None, host="127.0.0.1", port=0):
+    """Serve a FixtureSite on a background thread; returns (server, base_url)."""
+    site = site or FixtureSite()
+    server = ThreadingHTTPServer((host, port), _make_handler(site))
+    thread = threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}"
+    logger.info(f"Fixture site serving at {base_url}/")
+    return server, base_url
+
+
+def use_fixture_site(base_url):
+    """Point the scrapers' URL helpers at a running fixture server."""
+    import site_config
+
+    site_config.REGION_URL_TEMPLATE = base_url + "/{subdomain}/"
+    site_config.HOME_URL = base_url + "/"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, base_url = start_fixture_server(port=port)
+    print(f"Serving fixture site at {base_url}/  (set LIVEUAMAP_HOME_URL={base_url}/ "
+          f"LIVEUAMAP_REGION_URL={base_url}/{{subdomain}}/)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from concurrent_scrape import WORKERS, scrape_regions_concurrently
+from event_parser import parse_events
+from event_record import EventRecord
+from location_resolver import resolve_coordinates_from_html
+from metrics import metrics
+from rate_limit import throttle
+from seen_index import INCREMENTAL, STATE_DIR, SeenIndex, event_key, select_new_events
+from site_config import region_url
+
+logger = logging.getLogger(__name__)
+
+HTTP_WORKERS = int(os.environ.get("LIVEUAMAP_HTTP_WORKERS", "8"))
+HTTP_TIMEOUT = float(os.environ.get("LIVEUAMAP_HTTP_TIMEOUT", "20"))
+TIER_STATS_PATH = os.path.join(STATE_DIR, "tier_stats.json")
+TIERS = ["auto", "http", "browser"]
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0"
+
+
+class NeedsBrowser(Exception):
+    """The raw HTML didn't carry everything the event records need."""
+
+
+def http_client(workers=HTTP_WORKERS):
+    import urllib3
+
+    # Every region is its own host, so keep a pool per subdomain rather than many connections to one
+    return urllib3.PoolManager(
+        num_pools=max(16, workers * 2), maxsize=2, block=False,
+        timeout=urllib3.Timeout(connect=5, read=HTTP_TIMEOUT),
+        retries=urllib3.Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+        headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+    )
+
+
+def scrape_region_http(http, subdomain, emit=None):
+    """Scrape a region from its server-rendered HTML; raise NeedsBrowser if the page falls short."""
+    url = region_url(subdomain)
+    throttle(url)
+    with metrics.timer("http fetch"):
+        response = http.request("GET", url)
+    if response.status != 200:
+        raise NeedsBrowser(f"HTTP {response.status}")
+    html = response.data.decode("utf-8", errors="replace")
+    metrics.incr("http bytes", len(response.data), region=subdomain)
+
+    with metrics.timer("extraction", mode="http"):
+        records = parse_events(html, base_url=url, region=subdomain)
+    if not records:
+        raise NeedsBrowser("no events in the HTML (feed is rendered client-side)")
+
+    seen = SeenIndex(subdomain) if INCREMENTAL else None
+    new_indexes = select_new_events(records, seen) if seen is not None else list(range(len(records)))
+    new_records = [records[idx] for idx in new_indexes]
+    page_coordinates = resolve_coordinates_from_html(html, new_records)
+
+    # Decide before emitting anything, so a region handed to the browser isn't written twice
+    missing = sum(1 for coordinates in page_coordinates if coordinates is None)
+    if missing:
+        raise NeedsBrowser(f"{missing}/{len(new_records)} events have no coordinates in the HTML")
+    incomplete = sum(1 for record in new_records if record["date"] is None or record["data"] is None)
+    if incomplete:
+        raise NeedsBrowser(f"{incomplete}/{len(new_records)} events are missing their date or text")
+
+    event_data_list = []
+    for record, coordinates in zip(new_records, page_coordinates):
+        event_data = EventRecord.from_fields(subdomain, record, None, coordinates=coordinates)
+        # The caller marks it seen once the region is stored
+        event_data.seen_key = event_key(record)
+        event_data_list.append(event_data)
+        metrics.incr("events scraped", region=subdomain)
+        if emit:
+            emit(event_data)
+
+    logger.info(f"🌐 {subdomain}: {len(event_data_list)} new of {len(records)} events over plain HTTP.")
+    return event_data_list
+
+
+def _write_tier_stats(stats, path=TIER_STATS_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"updated_at": time.time(), "regions": stats}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def scrape_regions_hybrid(pool, subdomains, scrape_fn, workers=WORKERS, http_workers=HTTP_WORKERS,
+                          on_result=None, emit=None, tier="auto"):
+    """Try every region over HTTP first, then send the ones that need a browser to scrape_fn.
+
+    Returns ({subdomain: event_count}, {subdomain: tier stats}). With
+    tier="browser" the HTTP pass is skipped; with tier="http" regions that
+    need a browser are reported and left out.
+    """
+    counts = {}
+    stats = {}
+    fallback = list(subdomains)
+
+    if tier != "browser":
+        fallback = []
+        http = http_client(http_workers)
+
+        def timed_http(subdomain):
+            start = time.perf_counter()
+            events = scrape_region_http(http, subdomain, emit)
+            return events, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=max(1, http_workers), thread_name_prefix="http") as executor:
+            futures = {executor.submit(timed_http, subdomain): subdomain for subdomain in subdomains}
+            for future in as_completed(futures):
+                subdomain = futures[future]
+                try:
+                    events, seconds = future.result()
+                except Exception as e:
+                    # NeedsBrowser, or a network error the browser might get past
+                    stats[subdomain] = {"tier": "browser" if tier == "auto" else "skipped", "http_result": str(e)}
+                    logger.info(f"🌐 {subdomain}: {'handing to browser' if tier == 'auto' else 'skipped'} ({e}).")
+                    fallback.append(subdomain)
+                    continue
+                stats[subdomain] = {"tier": "http", "seconds": round(seconds, 3), "events": len(events)}
+                counts[subdomain] = len(events)
+                if on_result is not None:
+                    try:
+                        on_result(subdomain, events)
+                    except Exception as e:
+                        logger.error(f"❌ Failed to store results for {subdomain}: {e}")
+        http.clear()
+
+    if fallback and tier != "http":
+        started = {}
+
+        def timed(driver, subdomain):
+            started[subdomain] = time.perf_counter()
+            return scrape_fn(driver, subdomain)
+
+        def record(subdomain, events):
+            entry = stats.setdefault(subdomain, {"tier": "browser"})
+            entry.update(seconds=round(time.perf_counter() - started.get(subdomain, time.perf_counter()), 3),
+                         events=len(events))
+            if on_result is not None:
+                on_result(subdomain, events)
+
+        counts.update(scrape_regions_concurrently(pool, fallback, timed, workers=workers, on_result=record))
+
+    for subdomain, entry in stats.items():
+        metrics.incr("regions by tier", tier=entry["tier"])
+    served = {name: sum(1 for entry in stats.values() if entry["tier"] == name) for name in ["http", "browser"]}
+    logger.info(f"🌐 Fetch tiers: {served['http']} regions over HTTP, {served['browser']} through the browser.")
+    try:
+        _write_tier_stats(stats)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write tier stats: {e}")
+    return counts, stats
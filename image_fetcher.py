@@ -0,0 +1,229 @@
+import os
+import sys
+import csv
+import json
+import hashlib
+import logging
+import mimetypes
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import urllib3
+
+from metrics import metrics
+from seen_index import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DIR = os.environ.get("LIVEUAMAP_IMAGE_DIR", os.path.join(STATE_DIR, "images"))
+IMAGE_WORKERS = int(os.environ.get("LIVEUAMAP_IMAGE_WORKERS", "8"))
+IMAGE_TIMEOUT = float(os.environ.get("LIVEUAMAP_IMAGE_TIMEOUT", "15"))
+MAX_IMAGE_BYTES = 20 * 2 ** 20
+CHUNK_SIZE = 64 * 1024
+INDEX_FILE = "url_index.json"
+IMAGE_FIELDS = ["img_sha256", "img_path"]
+
+
+class ImageFetcher:
+    """Downloads event images on background threads into a content-addressed cache.
+
+    Files are stored as <cache_dir>/<sha[:2]>/<sha><ext>, so the same picture
+    posted to several regions is kept once. A URL -> hash index lets URLs that
+    were already fetched skip the network entirely. Each event gets
+    `img_sha256` and `img_path` (None when there is no image or it failed).
+    """
+
+    def __init__(self, cache_dir=IMAGE_DIR, workers=IMAGE_WORKERS, timeout=IMAGE_TIMEOUT):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.http = urllib3.PoolManager(
+            num_pools=16, maxsize=workers, block=False,
+            timeout=urllib3.Timeout(connect=5, read=timeout),
+            retries=urllib3.Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+            headers={"User-Agent": "Mozilla/5.0 (liveuamap-scraper image cache)"},
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="image")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._inflight = {}
+        self._index = self._load_index()
+        self.stats = {"downloaded": 0, "cached": 0, "deduplicated": 0, "failed": 0, "bytes": 0}
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            index = dict(self._index)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+        metrics.incr(f"images {name}", amount)
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+        if entry and os.path.exists(os.path.join(self.cache_dir, entry["path"])):
+            return entry
+        return None
+
+    def fetch(self, url):
+        """Download url into the cache (or find it there) and return {"sha256", "path"}."""
+        entry = self._cached(url)
+        if entry:
+            self._count("cached")
+            return entry
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with metrics.timer("image fetch"):
+            response = self.http.request("GET", url, preload_content=False)
+            tmp = tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False)
+            try:
+                with tmp:
+                    if response.status != 200:
+                        raise IOError(f"HTTP {response.status}")
+                    for chunk in response.stream(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > MAX_IMAGE_BYTES:
+                            raise IOError("image too large")
+                        digest.update(chunk)
+                        tmp.write(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+            finally:
+                response.release_conn()
+
+        sha = digest.hexdigest()
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if not ext or len(ext) > 5:
+            ext = mimetypes.guess_extension(response.headers.get("Content-Type", "").split(";")[0]) or ""
+        relative = os.path.join(sha[:2], sha + ext)
+        target = os.path.join(self.cache_dir, relative)
+        if os.path.exists(target):
+            os.unlink(tmp.name)
+            self._count("deduplicated")
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp.name, target)
+            self._count("downloaded")
+            self._count("bytes", size)
+
+        entry = {"sha256": sha, "path": relative}
+        with self._lock:
+            self._index[url] = entry
+        return entry
+
+    def _fill(self, event, entry):
+        event["img_sha256"] = entry["sha256"] if entry else None
+        event["img_path"] = os.path.join(self.cache_dir, entry["path"]) if entry else None
+        return event
+
+    def submit(self, event, then=None):
+        """Queue the event's image without blocking; then(event) runs once its image fields are set."""
+        url = event.get("img_src")
+        if not url or not url.startswith(("http://", "https://")):
+            self._fill(event, None)
+            if then:
+                then(event)
+            return None
+
+        entry = self._cached(url)
+        if entry:
+            self._count("cached")
+            self._fill(event, entry)
+            if then:
+                then(event)
+            return None
+
+        with self._lock:
+            # One download per URL, however many events share it
+            future = self._inflight.get(url)
+            if future is None:
+                future = self._inflight[url] = self._executor.submit(self.fetch, url)
+            self._outstanding += 1
+
+        def done(f):
+            with self._lock:
+                self._inflight.pop(url, None)
+            try:
+                entry = f.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Image download failed for {url}: {e}")
+                self._count("failed")
+                entry = None
+            try:
+                self._fill(event, entry)
+                if then:
+                    then(event)
+            finally:
+                with self._idle:
+                    self._outstanding -= 1
+                    self._idle.notify_all()
+
+        future.add_done_callback(done)
+        return future
+
+    def submit_many(self, events, then=None):
+        for event in events:
+            self.submit(event, then)
+
+    def wait(self, timeout=None):
+        """Block until every queued event has its image fields set and its callback has run."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def close(self):
+        self.wait()
+        self._executor.shutdown(wait=True)
+        self.save_index()
+        self.http.clear()
+        logger.info(
+            f"🖼️ Images: {self.stats['downloaded']} downloaded ({self.stats['bytes'] / 2 ** 20:.1f} MiB), "
+            f"{self.stats['cached']} already cached, {self.stats['deduplicated']} duplicates, "
+            f"{self.stats['failed']} failed."
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _read_events(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+if __name__ == "__main__":
+    # Fetch images for events already saved to CSV/JSONL: python image_fetcher.py scraped_events.csv
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) < 2:
+        print("Usage: python image_fetcher.py EVENTS.csv|EVENTS.jsonl [OUTPUT.jsonl]")
+        sys.exit(1)
+    events = _read_events(sys.argv[1])
+    with ImageFetcher() as fetcher:
+        fetcher.submit_many(events)
+        fetcher.wait()
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
@@ -0,0 +1,141 @@
+import re
+import logging
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Reads coordinates that are already in the page, keyed by event DOM id:
+#   1. data-lat/data-lng (or data-ll) attributes on the event node
+#   2. globals holding event arrays with id + lat/lng
+#   3. Leaflet marker layers whose options/feature carry the event id
+RESOLVE_LOCATIONS_JS = """
+var selector = arguments[0];
+var found = {};
+function put(id, lat, lng) {
+    if (id === undefined || id === null) { return; }
+    lat = parseFloat(lat); lng = parseFloat(lng);
+    if (isNaN(lat) || isNaN(lng)) { return; }
+    id = String(id);
+    if (!(id in found)) { found[id] = [lat, lng]; }
+}
+function bareId(id) {
+    return id ? String(id).replace(/^[^0-9]*/, "") : id;
+}
+
+var nodes = document.querySelectorAll(selector);
+for (var i = 0; i < nodes.length; i++) {
+    var node = nodes[i];
+    var id = node.id || node.getAttribute("data-id");
+    var ll = node.getAttribute("data-ll");
+    if (ll && ll.indexOf(",") > 0) {
+        put(id, ll.split(",")[0], ll.split(",")[1]);
+    }
+    put(id, node.getAttribute("data-lat"), node.getAttribute("data-lng") || node.getAttribute("data-lon"));
+}
+
+var globals = ["ovens", "events", "markers", "points"];
+for (var g = 0; g < globals.length; g++) {
+    var arr = window[globals[g]];
+    if (!Array.isArray(arr)) { continue; }
+    for (var j = 0; j < arr.length; j++) {
+        var item = arr[j] || {};
+        put(item.id, item.lat, item.lng !== undefined ? item.lng : item.lon);
+    }
+}
+
+var keys = Object.keys(window);
+for (var k = 0; k < keys.length; k++) {
+    var candidate;
+    try { candidate = window[keys[k]]; } catch (e) { continue; }
+    if (!candidate || typeof candidate !== "object" || !candidate._layers || !candidate.getCenter) { continue; }
+    for (var layerId in candidate._layers) {
+        var layer = candidate._layers[layerId];
+        if (!layer || !layer.getLatLng) { continue; }
+        var opts = layer.options || {};
+        var props = (layer.feature && layer.feature.properties) || {};
+        var eventId = opts.id || opts.eventId || props.id || props.eventId;
+        var latlng = layer.getLatLng();
+        put(eventId, latlng.lat, latlng.lng);
+    }
+}
+
+var result = {};
+for (var n = 0; n < nodes.length; n++) {
+    var domId = nodes[n].id || nodes[n].getAttribute("data-id");
+    if (!domId) { continue; }
+    var hit = found[domId] || found[bareId(domId)];
+    if (hit) { result[domId] = hit; }
+}
+return result;
+"""
+
+
+def resolve_coordinates(driver, records, event_selector="div[class^='event cat']"):
+    """Return the page's exact (lat, lng) (or None) per record without clicking anything."""
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+        with metrics.timer("location resolve"):
+            coordinates = driver.execute_script(RESOLVE_LOCATIONS_JS, event_selector) or {}
+    except WebDriverException as e:
+        logger.warning(f"⚠️ Could not read coordinates from page data: {e}")
+        coordinates = {}
+
+    resolved_coordinates = []
+    for record in records:
+        hit = coordinates.get(record.get("event_id") or "")
+        resolved_coordinates.append((float(hit[0]), float(hit[1])) if hit else None)
+
+    resolved = sum(1 for hit in resolved_coordinates if hit)
+    metrics.incr("locations from page data", resolved)
+    logger.info(f"📍 Resolved {resolved}/{len(records)} locations from page data.")
+    return resolved_coordinates
+
+
+# Same sources as RESOLVE_LOCATIONS_JS, read from raw markup for pages fetched without a browser
+_TAG_RE = re.compile(r"<[a-z]+\s[^>]*\bdata-(?:lat|ll)\b[^>]*>", re.I)
+_ATTR_RE = re.compile(r"""([\w-]+)\s*=\s*["']([^"']*)["']""")
+_OBJECT_RE = re.compile(r"\{[^{}]*\}")
+_ID_RE = re.compile(r"""["']?\bid["']?\s*:\s*["']?([\w-]+)""")
+_LAT_RE = re.compile(r"""["']?\blat["']?\s*:\s*["']?(-?\d+(?:\.\d+)?)""")
+_LNG_RE = re.compile(r"""["']?\bl(?:ng|on)["']?\s*:\s*["']?(-?\d+(?:\.\d+)?)""")
+
+
+def _bare_id(event_id):
+    return re.sub(r"^[^0-9]*", "", str(event_id))
+
+
+def coordinates_from_html(html):
+    """{event id: (lat, lng)} from data-lat/lng/ll attributes and inline objects with id + lat/lng."""
+    found = {}
+    for tag in _TAG_RE.finditer(html):
+        attrs = dict((name.lower(), value) for name, value in _ATTR_RE.findall(tag.group(0)))
+        event_id = attrs.get("id") or attrs.get("data-id")
+        try:
+            if "data-ll" in attrs and "," in attrs["data-ll"]:
+                lat, lng = attrs["data-ll"].split(",")[:2]
+            else:
+                lat, lng = attrs["data-lat"], attrs.get("data-lng") or attrs["data-lon"]
+            if event_id:
+                found.setdefault(event_id, (float(lat), float(lng)))
+        except (KeyError, ValueError):
+            continue
+
+    for match in _OBJECT_RE.finditer(html):
+        text = match.group(0)
+        event_id, lat, lng = _ID_RE.search(text), _LAT_RE.search(text), _LNG_RE.search(text)
+        if event_id and lat and lng:
+            found.setdefault(event_id.group(1), (float(lat.group(1)), float(lng.group(1))))
+    return found
+
+
+def resolve_coordinates_from_html(html, records):
+    """Like resolve_coordinates(), for markup fetched over plain HTTP."""
+    coordinates = coordinates_from_html(html)
+    resolved_coordinates = []
+    for record in records:
+        event_id = record.get("event_id") or ""
+        hit = coordinates.get(event_id) or coordinates.get(_bare_id(event_id)) if event_id else None
+        resolved_coordinates.append(hit)
+    return resolved_coordinates
@@ -0,0 +1,214 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from seen_index import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.environ.get("LIVEUAMAP_METRICS", "1") != "0"
+METRICS_DIR = os.path.join(STATE_DIR, "metrics")
+PROMETHEUS_PREFIX = "liveuamap"
+
+_NULL_TIMER = nullcontext()
+
+
+def _wait_summary():
+    # Only if a browser ran: importing waits here would pull in selenium for HTTP/CSV-only runs
+    waits = sys.modules.get("waits")
+    return waits.wait_stats.summary() if waits else {}
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+def _metric_name(name):
+    return PROMETHEUS_PREFIX + "_" + re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_").lower()
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """Named stage timers and counters for a run; a disabled instance costs one attribute check per call."""
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+        self._marks = {}
+        self.started_at = time.time()
+        # Reference point for mark(); entry scripts reset it to the moment they started importing
+        self.process_started = time.perf_counter()
+
+    def observe(self, name, elapsed, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._timers.get(_key(name, labels))
+            if entry is None:
+                entry = self._timers[_key(name, labels)] = {"count": 0, "total": 0.0, "max": 0.0}
+            entry["count"] += 1
+            entry["total"] += elapsed
+            if elapsed > entry["max"]:
+                entry["max"] = elapsed
+
+    @contextmanager
+    def _timer(self, name, labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timer(self, name, **labels):
+        """`with metrics.timer("page load"):` records the block's duration under `name`."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name, labels)
+
+    def incr(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            key = _key(name, labels)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def mark(self, name):
+        """Record, once, how long after process_started `name` first happened (e.g. "first request")."""
+        if not self.enabled or name in self._marks:
+            return
+        with self._lock:
+            self._marks.setdefault(name, time.perf_counter() - self.process_started)
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._marks.clear()
+            self.started_at = time.time()
+
+    def summary(self):
+        def named(name, labels):
+            return name + "".join(f"[{k}={v}]" for k, v in labels)
+
+        with self._lock:
+            timers = {named(*key): {**entry, "total": round(entry["total"], 4), "max": round(entry["max"], 4)}
+                      for key, entry in self._timers.items()}
+            counters = {named(*key): value for key, value in self._counters.items()}
+            marks = {name: round(value, 4) for name, value in self._marks.items()}
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "timers": timers,
+            "counters": counters,
+            "startup": marks,
+            "waits": _wait_summary(),
+        }
+
+    def log_summary(self):
+        summary = self.summary()
+        for name, entry in sorted(summary["timers"].items(), key=lambda item: -item[1]["total"]):
+            logger.info(f"📊 {name}: {entry['count']} x, {entry['total']:.2f}s total, {entry['max']:.2f}s max")
+        for name, value in sorted(summary["counters"].items()):
+            logger.info(f"📊 {name}: {value}")
+        for name, value in sorted(summary["startup"].items(), key=lambda item: item[1]):
+            logger.info(f"🚀 {name}: {value:.3f}s after start")
+
+    def write_summary(self, path=None):
+        """Write the run summary as JSON (default STATE_DIR/metrics/run-<timestamp>.json)."""
+        if not self.enabled:
+            return None
+        path = path or os.path.join(METRICS_DIR, f"run-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        logger.info(f"📊 Metrics summary written to {path}")
+        return path
+
+    def prometheus_text(self):
+        """Timers as <name>_seconds_total/_count/_max, counters as <name>_total, waits labelled by name."""
+        lines = []
+        with self._lock:
+            timers = sorted(self._timers.items())
+            counters = sorted(self._counters.items())
+            marks = sorted(self._marks.items())
+
+        def family(metric, kind, samples):
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f"{metric}{_label_text(labels)} {value}" for labels, value in samples)
+
+        by_name = {}
+        for (name, labels), entry in timers:
+            by_name.setdefault(name, []).append((labels, entry))
+        for name, samples in by_name.items():
+            metric = _metric_name(name)
+            family(f"{metric}_seconds_total", "counter", [(l, round(e["total"], 6)) for l, e in samples])
+            family(f"{metric}_count", "counter", [(l, e["count"]) for l, e in samples])
+            family(f"{metric}_max_seconds", "gauge", [(l, round(e["max"], 6)) for l, e in samples])
+
+        by_name = {}
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append((labels, value))
+        for name, samples in by_name.items():
+            family(f"{_metric_name(name)}_total", "counter", samples)
+
+        if marks:
+            family(f"{PROMETHEUS_PREFIX}_startup_seconds", "gauge",
+                   [((("stage", name),), round(value, 6)) for name, value in marks])
+
+        waits = sorted(_wait_summary().items())
+        if waits:
+            family(f"{PROMETHEUS_PREFIX}_wait_seconds_total", "counter",
+                   [((("wait", name),), round(entry["total"], 6)) for name, entry in waits])
+            family(f"{PROMETHEUS_PREFIX}_wait_timeouts_total", "counter",
+                   [((("wait", name),), entry["timeouts"]) for name, entry in waits])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically rewrite a Prometheus text file (e.g. for node_exporter's textfile collector)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def serve_prometheus(self, port, host="0.0.0.0"):
+        """Expose /metrics over HTTP on a background thread; returns the server."""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📊 Serving Prometheus metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+
+metrics = Metrics()
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from event_record import EventBatch
+from metrics import metrics
+from seen_index import event_key
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "events"
+BATCH_SIZE = 500
+DUPLICATE_KEY_ERROR = 11000
+
+
+class MongoEventSink:
+    """Writes one document per event, upserted on (region, event_key) with unordered bulk writes.
+
+    Works with any pymongo-compatible database object, including a mongomock one.
+    """
+
+    def __init__(self, db, collection_name=EVENTS_COLLECTION, batch_size=BATCH_SIZE):
+        self.collection = db[collection_name]
+        self.batch_size = batch_size
+        self.totals = {"inserted": 0, "updated": 0, "duplicates": 0, "errors": 0}
+        self._indexes_ready = False
+
+    def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        self.collection.create_index(
+            [("region", ASCENDING), ("event_key", ASCENDING)], unique=True, name="region_event_key"
+        )
+        self.collection.create_index([("region", ASCENDING), ("scraped_at", DESCENDING)], name="region_scraped_at")
+        self.collection.create_index([("scraped_at", DESCENDING)], name="scraped_at")
+        # Normalized event time, so time windows are index range scans
+        self.collection.create_index([("time", DESCENDING)], name="time")
+        self.collection.create_index([("region", ASCENDING), ("time", DESCENDING)], name="region_time")
+        self._indexes_ready = True
+
+    def _operation(self, event, fields, region, scraped_at):
+        region = event.region or region
+        key = event_key(event)
+        # The first scrape is the closest to the event, so its normalized time is kept
+        first_seen = {"region": region, "event_key": key, "scraped_at": scraped_at,
+                      "time": fields.pop("time"), "time_precision": fields.pop("time_precision")}
+        regions = fields.pop("regions") or [region]
+        return UpdateOne(
+            {"region": region, "event_key": key},
+            {
+                "$set": fields,
+                "$setOnInsert": first_seen,
+                "$addToSet": {"regions": {"$each": regions}},
+            },
+            upsert=True,
+        )
+
+    def write_batch(self, events, region=None, scraped_at=None):
+        scraped_at = scraped_at or datetime.now(timezone.utc)
+        batch = EventBatch.of(events)
+        operations = [self._operation(event, fields, region, scraped_at)
+                      for event, fields in zip(batch, batch.documents(exclude=("region",)))]
+        counts = {"inserted": 0, "updated": 0, "duplicates": 0, "errors": 0}
+        if not operations:
+            return counts
+
+        try:
+            with metrics.timer("sink write", sink="mongo-events"):
+                result = self.collection.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            # Unordered: every other operation in the batch still ran
+            details = e.details
+            for error in details.get("writeErrors", []):
+                if error.get("code") == DUPLICATE_KEY_ERROR:
+                    counts["duplicates"] += 1
+                else:
+                    counts["errors"] += 1
+                    logger.error(f"❌ Mongo write error: {error.get('errmsg')}")
+
+        counts["inserted"] = details.get("nUpserted", 0)
+        counts["updated"] = details.get("nModified", 0)
+        # Matched but unchanged documents are events we already stored verbatim
+        counts["duplicates"] += details.get("nMatched", 0) - details.get("nModified", 0)
+
+        for name, value in counts.items():
+            self.totals[name] += value
+        logger.info(
+            f"🗄️ Mongo batch of {len(operations)}: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['duplicates']} duplicates, {counts['errors']} errors."
+        )
+        return counts
+
+    def add_region(self, region, key, other_region):
+        """Record that the event stored under (region, key) also appeared in other_region."""
+        self.collection.update_one({"region": region, "event_key": key}, {"$addToSet": {"regions": other_region}})
+
+    def find_between(self, start=None, end=None, regions=None):
+        """Events whose normalized time is in [start, end), newest first, e.g. the last 6 hours everywhere."""
+        query = {}
+        if start is not None or end is not None:
+            query["time"] = {}
+            if start is not None:
+                query["time"]["$gte"] = start
+            if end is not None:
+                query["time"]["$lt"] = end
+        if regions:
+            query["region"] = {"$in": list(regions)}
+        return self.collection.find(query).sort("time", DESCENDING)
+
+    def write(self, events, region=None):
+        self.ensure_indexes()
+        scraped_at = datetime.now(timezone.utc)
+        events = EventBatch.of(events)
+        for start in range(0, len(events), self.batch_size):
+            self.write_batch(events.slice(start, start + self.batch_size), region, scraped_at)
+        return dict(self.totals)
@@ -0,0 +1,68 @@
+import os
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Requests per second allowed toward *.liveuamap.com, shared by every worker in the process
+LIVEUAMAP_MAX_RPS = float(os.environ.get("LIVEUAMAP_MAX_RPS", "1.0"))
+LIVEUAMAP_BURST = int(os.environ.get("LIVEUAMAP_BURST", "2"))
+
+
+class RateLimiter:
+    """Thread-safe token bucket: wait() blocks until a request may be sent."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_host_limiters = {}
+_host_lock = threading.Lock()
+
+
+def limiter_for(url):
+    """One limiter per site: every liveuamap.com subdomain shares the same bucket."""
+    host = (urlparse(url).hostname or "").lower()
+    key = "liveuamap.com" if host == "liveuamap.com" or host.endswith(".liveuamap.com") else host
+    with _host_lock:
+        limiter = _host_limiters.get(key)
+        if limiter is None:
+            if key == "liveuamap.com":
+                limiter = RateLimiter(LIVEUAMAP_MAX_RPS, LIVEUAMAP_BURST)
+            else:
+                limiter = RateLimiter(0)
+            _host_limiters[key] = limiter
+        return limiter
+
+
+def throttle(url):
+    # Every outbound page request passes through here, so this times startup to first request
+    metrics.mark("first request")
+    waited = limiter_for(url).wait()
+    if waited:
+        logger.debug(f"Rate limit held request to {url} for {waited:.2f}s.")
+    return waited
@@ -0,0 +1,97 @@
+import os
+import json
+import logging
+import time
+
+from seen_index import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.environ.get("LIVEUAMAP_REGION_CATALOG", os.path.join(STATE_DIR, "regions.json"))
+CATALOG_TTL = float(os.environ.get("LIVEUAMAP_REGION_TTL", str(24 * 3600)))
+
+
+def load_catalog(path=CATALOG_PATH, ttl=CATALOG_TTL):
+    """Return the cached regions, or None when the cache is missing, unreadable or older than ttl."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable region catalog {path}: {e}")
+        return None
+
+    age = time.time() - payload.get("fetched_at", 0)
+    if ttl is not None and age > ttl:
+        logger.info(f"Region catalog is {age / 3600:.1f}h old, refreshing.")
+        return None
+    return payload.get("regions") or None
+
+
+def save_catalog(regions, path=CATALOG_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), "regions": regions}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_regions(discover, refresh=False, path=CATALOG_PATH, ttl=CATALOG_TTL):
+    """Cached catalog of {name, subdomain, parent}; discover() is only called on a miss or refresh."""
+    if not refresh:
+        regions = load_catalog(path, ttl)
+        if regions:
+            logger.info(f"✅ Loaded {len(regions)} regions from cache {path}.")
+            return regions
+
+    regions = discover()
+    if regions:
+        save_catalog(regions, path)
+        logger.info(f"💾 Cached {len(regions)} regions to {path}.")
+    return regions
+
+
+def needs_catalog(spec):
+    """True when a selection can't be resolved without the catalog ('all', indexes)."""
+    tokens = [token.strip() for token in spec.split(",") if token.strip()]
+    return not tokens or any(token.lower() == "all" or token.isdigit() for token in tokens)
+
+
+def select_regions(regions, spec):
+    """Resolve 'all' or a comma-separated list of subdomains, names or 1-based indexes."""
+    tokens = [token.strip() for token in spec.split(",") if token.strip()]
+    if any(token.lower() == "all" for token in tokens):
+        return [r["subdomain"] for r in regions]
+
+    by_subdomain = {r["subdomain"].lower(): r["subdomain"] for r in regions}
+    by_name = {r["name"].lower(): r["subdomain"] for r in regions}
+    selected = []
+    for token in tokens:
+        key = token.lower()
+        if token.isdigit() and 0 < int(token) <= len(regions):
+            subdomain = regions[int(token) - 1]["subdomain"]
+        elif key in by_subdomain:
+            subdomain = by_subdomain[key]
+        elif key in by_name:
+            subdomain = by_name[key]
+        else:
+            if regions:
+                # Without a catalog (explicit subdomains, nothing cached) every token is taken as given
+                logger.warning(f"⚠️ '{token}' is not in the region catalog, using it as a subdomain.")
+            subdomain = key
+        if subdomain not in selected:
+            selected.append(subdomain)
+    return selected
+
+
+def load_run_config(path):
+    """JSON run config, e.g. {"regions": "pirates,yemen", "output": "csv"}."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    regions = config.get("regions")
+    if isinstance(regions, list):
+        config["regions"] = ",".join(str(region) for region in regions)
+    return config
@@ -0,0 +1,296 @@
+import sys
+import logging
+import time
+from selenium.webdriver.common.by import By
+
+from metrics import metrics
+from rate_limit import throttle
+from site_config import home_url
+from waits import (
+    backoff,
+    wait_for_dom_settled,
+    wait_for_element,
+    wait_for_elements,
+    wait_for_network_idle,
+    wait_for_page_ready,
+    wait_until
+)
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_SUBDOMAINS = ["login", "about", "privacy", "terms"]
+SUBREGION_SELECTOR = "li.col-md-4 > a[href*='liveuamap.com']"
+
+# Whole modal in one call: every region link, plus any subregion anchors the
+# markup already carries for a parent (nested lists or hidden panels)
+REGION_TREE_JS = """
+function anchor(a) {
+    return {href: a.href || a.getAttribute("href"), text: (a.textContent || "").trim(), title: (a.getAttribute("title") || "").trim()};
+}
+var links = document.querySelectorAll("a.modalRegName");
+var out = [];
+for (var i = 0; i < links.length; i++) {
+    var link = links[i];
+    var entry = anchor(link);
+    entry.parent = (link.getAttribute("class") || "").indexOf("hasLvl") !== -1;
+    entry.children = [];
+    if (entry.parent) {
+        var scope = link.closest("li") || link.parentElement;
+        var nested = scope ? scope.querySelectorAll("ul a[href*='liveuamap.com']") : [];
+        for (var j = 0; j < nested.length; j++) {
+            if (nested[j] !== link) { entry.children.push(anchor(nested[j])); }
+        }
+    }
+    out.push(entry);
+}
+return out;
+"""
+
+SUBREGIONS_JS = """
+var anchors = document.querySelectorAll(arguments[0]);
+var out = [];
+for (var i = 0; i < anchors.length; i++) {
+    out.push({href: anchors[i].href, text: (anchors[i].textContent || "").trim(), title: (anchors[i].getAttribute("title") || "").trim()});
+}
+return out;
+"""
+
+FIND_PARENT_JS = """
+var links = document.querySelectorAll("a.modalRegName");
+for (var i = 0; i < links.length; i++) {
+    if ((links[i].getAttribute("title") || "").trim() === arguments[0]) { return links[i]; }
+}
+return null;
+"""
+
+
+def open_region_modal(driver):
+    url = home_url()
+    throttle(url)
+    with metrics.timer("page load", page="home"):
+        driver.get(url)
+        wait_for_page_ready(driver)
+    wait_for_network_idle(driver, name="home network idle")
+
+    try:
+        select_button = wait_for_element(driver, (By.ID, "modalRegions"), name="region button", clickable=True)
+        driver.execute_script("arguments[0].scrollIntoView(true);", select_button)
+        select_button.click()
+        logger.info("Clicked 'Select regions' button.")
+        wait_for_element(driver, (By.CSS_SELECTOR, "div.modal-body"), name="region modal open")
+        wait_for_dom_settled(driver, name="region modal animation")
+
+        # Scroll modal to bottom to ensure all regions load
+        scroll_modal_to_bottom(driver)
+
+        wait_for_elements(driver, (By.CSS_SELECTOR, "a.modalRegName"), name="region links")
+        wait_for_dom_settled(driver, name="region modal settled")
+        return True
+
+    except Exception as e:
+        logger.error("❌ Could not open region selector: %s", e)
+        return False
+
+
+def scroll_modal_to_bottom(driver, container_selector="div.modal-body", pause_time=0.5, max_scrolls=30):
+    try:
+        scroll_box = driver.find_element(By.CSS_SELECTOR, container_selector)
+        last_height = driver.execute_script("return arguments[0].scrollHeight", scroll_box)
+        for _ in range(max_scrolls):
+            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_box)
+            # Returns as soon as more regions are appended; pause_time is only the ceiling
+            wait_until(
+                driver,
+                lambda d: d.execute_script("return arguments[0].scrollHeight", scroll_box) != last_height,
+                "modal scroll growth", timeout=pause_time, raise_on_timeout=False
+            )
+            new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_box)
+            if new_height == last_height:
+                break
+            last_height = new_height
+        logger.info("✅ Scrolled modal to bottom.")
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to scroll modal: {e}")
+
+
+def safe_click(driver, element, retries=3):
+    for attempt in range(retries):
+        try:
+            driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", element)
+            wait_for_dom_settled(driver, element, name="scroll into view", timeout=0.5)
+            element.click()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Retry {attempt + 1} clicking failed: {e}")
+            metrics.incr("click retries", fn="safe_click")
+            backoff("safe_click retry", attempt)
+    logger.error("❌ Could not click element after retries.")
+    return False
+
+
+def _subdomain(href):
+    return href.split("//")[1].split(".")[0]
+
+
+def discover_by_expansion(driver):
+    """Original discovery: click into every parent region, read its subregions, click back."""
+    seen = set()
+    links = driver.find_elements(By.CSS_SELECTOR, "a.modalRegName")
+    new_regions = []
+
+    for link in links:
+        try:
+            class_attr = link.get_attribute("class") or ""
+            is_parent = "hasLvl" in class_attr
+            href = link.get_attribute("href")
+            title = link.get_attribute("title").strip()
+
+            # ✅ Parent Region → expand to get subregions
+            if is_parent:
+                logger.debug(f"📂 Expanding parent region: {title}")
+                if not safe_click(driver, link):
+                    logger.warning(f"⚠️ Failed to click or extract subregions for {title}")
+                    continue
+                wait_for_elements(
+                    driver, (By.CSS_SELECTOR, SUBREGION_SELECTOR),
+                    name="subregion list", timeout=5, raise_on_timeout=False
+                )
+
+                try:
+                    subregion_anchors = driver.find_elements(By.CSS_SELECTOR, SUBREGION_SELECTOR)
+                    for sub_a in subregion_anchors:
+                        sub_href = sub_a.get_attribute("href")
+                        sub_name = sub_a.text.strip() or sub_a.get_attribute("title").strip()
+                        if not sub_name:
+                            continue
+                        subdomain = _subdomain(sub_href)
+                        if subdomain not in seen:
+                            seen.add(subdomain)
+                            new_regions.append({"name": sub_name, "subdomain": subdomain, "parent": title})
+                            logger.debug(f"✅ Subregion added: {sub_name} ({subdomain})")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed extracting subregions from {title}: {e}")
+
+                try:
+                    return_link = driver.find_element(By.CSS_SELECTOR, "a.retallregs")
+                    safe_click(driver, return_link)
+                    wait_for_elements(driver, (By.CSS_SELECTOR, "a.modalRegName"), name="region list return", timeout=5)
+                    scroll_modal_to_bottom(driver)  # Scroll again after returning
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not return to all regions after {title}: {e}")
+                continue
+
+            # ✅ Standalone Region
+            if href and "liveuamap.com" in href:
+                subdomain = _subdomain(href)
+                if subdomain.lower() in SKIPPED_SUBDOMAINS:
+                    continue
+                if subdomain not in seen:
+                    name = link.text.strip() or link.get_attribute("title").strip()
+                    if not name:
+                        continue
+                    seen.add(subdomain)
+                    new_regions.append({"name": name, "subdomain": subdomain, "parent": None})
+                    logger.debug(f"✅ Region added: {name} ({subdomain})")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Error processing region link: {e}")
+
+    return new_regions
+
+
+def _expand_parent(driver, title):
+    """Fallback for one parent whose subregions aren't in the markup: click it, read once, go back."""
+    link = driver.execute_script(FIND_PARENT_JS, title)
+    if link is None or not safe_click(driver, link):
+        logger.warning(f"⚠️ Failed to click or extract subregions for {title}")
+        return []
+    wait_for_elements(driver, (By.CSS_SELECTOR, SUBREGION_SELECTOR), name="subregion list", timeout=5,
+                      raise_on_timeout=False)
+    children = driver.execute_script(SUBREGIONS_JS, SUBREGION_SELECTOR) or []
+
+    try:
+        return_link = driver.find_element(By.CSS_SELECTOR, "a.retallregs")
+        safe_click(driver, return_link)
+        wait_for_elements(driver, (By.CSS_SELECTOR, "a.modalRegName"), name="region list return", timeout=5)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not return to all regions after {title}: {e}")
+    return children
+
+
+def discover_regions_fast(driver):
+    """Read the whole region tree in one script call; expand only parents with no embedded children."""
+    tree = driver.execute_script(REGION_TREE_JS) or []
+    regions = []
+    seen = set()
+    expanded = 0
+
+    def add(anchor, parent):
+        href = anchor.get("href") or ""
+        if "liveuamap.com" not in href or "//" not in href:
+            return
+        subdomain = _subdomain(href)
+        if subdomain.lower() in SKIPPED_SUBDOMAINS or subdomain in seen:
+            return
+        name = anchor.get("text") or anchor.get("title")
+        if not name:
+            return
+        seen.add(subdomain)
+        regions.append({"name": name, "subdomain": subdomain, "parent": parent})
+
+    for entry in tree:
+        if not entry.get("parent"):
+            add(entry, None)
+            continue
+        children = entry.get("children") or []
+        if not children:
+            expanded += 1
+            children = _expand_parent(driver, entry.get("title"))
+        for child in children:
+            add(child, entry.get("title"))
+
+    parents = sum(1 for entry in tree if entry.get("parent"))
+    logger.info(f"✅ Found {len(regions)} regions; {parents - expanded}/{parents} parents read without clicking.")
+    return regions
+
+
+def discover_regions(driver, method="fast"):
+    if method == "expand":
+        return discover_by_expansion(driver)
+    try:
+        return discover_regions_fast(driver)
+    except Exception as e:
+        logger.warning(f"⚠️ One-shot region discovery failed, expanding parents one by one: {e}")
+        return discover_by_expansion(driver)
+
+
+def compare_discovery_methods(pool):
+    """Run both discovery methods on a fresh modal and log how long each took."""
+    results = {}
+    for method in ["expand", "fast"]:
+        with pool.session() as driver:
+            if not open_region_modal(driver):
+                continue
+            start = time.perf_counter()
+            regions = discover_regions(driver, method=method)
+            results[method] = {"seconds": time.perf_counter() - start, "regions": len(regions)}
+
+    for method, result in results.items():
+        logger.info(f"⏱️ {method}: {result['regions']} regions in {result['seconds']:.2f}s")
+    if len(results) == 2 and results["fast"]["seconds"] > 0:
+        logger.info(f"⏱️ One-shot discovery is {results['expand']['seconds'] / results['fast']['seconds']:.1f}x faster.")
+    return results
+
+
+if __name__ == "__main__":
+    from driver_pool import DriverPool
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if "--compare" not in sys.argv[1:]:
+        print("Usage: python region_discovery.py --compare")
+        sys.exit(1)
+    pool = DriverPool(size=1)
+    try:
+        compare_discovery_methods(pool)
+    finally:
+        pool.close()
@@ -0,0 +1,176 @@
+import os
+import glob
+import json
+import logging
+import threading
+import time
+
+from seen_index import STATE_DIR, event_key
+
+logger = logging.getLogger(__name__)
+
+RUNS_DIR = os.path.join(STATE_DIR, "runs")
+DEFAULT_RETRIES = int(os.environ.get("LIVEUAMAP_REGION_RETRIES", "1"))
+
+PENDING = "pending"
+IN_PROGRESS = "in-progress"
+DONE = "done"
+FAILED = "failed"
+
+
+class RunManifest:
+    """Status of every region in one sweep, saved after each change so a crashed run can be resumed.
+
+    A region is pending until a worker picks it up, in-progress while it is
+    scraped, then done (with its event count and where the events were
+    committed) or failed. Failed regions are retried until they have used
+    `max_attempts`; in-progress regions in a loaded manifest were cut off by
+    a crash and are treated as unfinished.
+
+    Events streamed to CSV/JSONL are logged per region in `<run>.streamed.jsonl`
+    once the writer has flushed them, so a retried or resumed region can skip
+    rows the run's output file already has.
+    """
+
+    def __init__(self, path, run_id, regions, options=None, created_at=None):
+        self.path = path
+        self.run_id = run_id
+        self.regions = regions
+        self.options = options or {}
+        self.created_at = created_at or time.time()
+        self.streamed_path = f"{os.path.splitext(path)[0]}.streamed.jsonl"
+        self._streamed = {}
+        self._lock = threading.Lock()
+        self._load_streamed()
+
+    @classmethod
+    def create(cls, subdomains, options=None, retries=DEFAULT_RETRIES, runs_dir=RUNS_DIR):
+        """New manifest; `retries` is an int for every region or a {subdomain: retries} mapping."""
+        run_id = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(runs_dir, f"{run_id}.json")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(runs_dir, f"{run_id}-{suffix}.json")
+            suffix += 1
+        regions = {}
+        for subdomain in subdomains:
+            region_retries = retries.get(subdomain, DEFAULT_RETRIES) if isinstance(retries, dict) else retries
+            regions[subdomain] = {"status": PENDING, "attempts": 0, "max_attempts": 1 + max(0, int(region_retries)),
+                                  "events": 0, "outputs": [], "error": None}
+        manifest = cls(path, os.path.splitext(os.path.basename(path))[0], regions, options)
+        manifest.save()
+        logger.info(f"🗒️ Run manifest: {path}")
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(path, payload["run_id"], payload["regions"], payload.get("options"), payload.get("created_at"))
+
+    @classmethod
+    def find(cls, run=None, runs_dir=RUNS_DIR):
+        """Load a run by id or path, or the most recent one when run is None/"latest"."""
+        if run and run != "latest":
+            path = run if os.path.exists(run) else os.path.join(runs_dir, f"{run}.json")
+            return cls.load(path)
+        paths = sorted(glob.glob(os.path.join(runs_dir, "*.json")), key=os.path.getmtime)
+        if not paths:
+            raise FileNotFoundError(f"No run manifests in {runs_dir}")
+        return cls.load(paths[-1])
+
+    def save(self):
+        with self._lock:
+            payload = {"run_id": self.run_id, "created_at": self.created_at, "updated_at": time.time(),
+                       "options": self.options, "regions": self.regions}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def _load_streamed(self):
+        try:
+            with open(self.streamed_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                region, key = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; its batch may be written again
+                continue
+            self._streamed.setdefault(region, set()).add(key)
+
+    def claim_stream(self, region, key):
+        """True the first time this run streams the event; False if it is already in the output."""
+        with self._lock:
+            keys = self._streamed.setdefault(region, set())
+            if key in keys:
+                return False
+            keys.add(key)
+            return True
+
+    def record_streamed(self, events):
+        """Log events the stream writer has just flushed (see StreamingWriter's on_written)."""
+        lines = "".join(json.dumps([event["region"], event_key(event)]) + "\n" for event in events)
+        with self._lock:
+            with open(self.streamed_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _update(self, subdomain, **fields):
+        with self._lock:
+            self.regions[subdomain].update(fields)
+        self.save()
+
+    def status(self, subdomain):
+        return self.regions[subdomain]["status"]
+
+    def mark_started(self, subdomains):
+        """Start an attempt at each region; called once per pass, whichever tier ends up serving it."""
+        started_at = time.time()
+        with self._lock:
+            for subdomain in subdomains:
+                entry = self.regions[subdomain]
+                entry.update(status=IN_PROGRESS, attempts=entry["attempts"] + 1, started_at=started_at, error=None)
+        self.save()
+
+    def mark_done(self, subdomain, events, outputs):
+        self._update(subdomain, status=DONE, events=events, outputs=outputs, finished_at=time.time(), error=None)
+
+    def mark_failed(self, subdomain, error):
+        self._update(subdomain, status=FAILED, error=str(error), finished_at=time.time())
+
+    def unfinished(self):
+        """Regions to run on resume: anything not done, with a fresh set of attempts."""
+        with self._lock:
+            subdomains = [s for s, entry in self.regions.items() if entry["status"] != DONE]
+            for subdomain in subdomains:
+                self.regions[subdomain]["attempts"] = 0
+        self.save()
+        return subdomains
+
+    def retryable(self):
+        with self._lock:
+            return [s for s, entry in self.regions.items()
+                    if entry["status"] == FAILED and entry["attempts"] < entry["max_attempts"]]
+
+    def counts(self):
+        with self._lock:
+            statuses = [entry["status"] for entry in self.regions.values()]
+        return {status: statuses.count(status) for status in [PENDING, IN_PROGRESS, DONE, FAILED]}
+
+    def track(self, scrape_fn):
+        """Wrap scrape_fn(driver, subdomain) so a region that raises is recorded as failed."""
+        def tracked(driver, subdomain):
+            try:
+                return scrape_fn(driver, subdomain)
+            except Exception as e:
+                self.mark_failed(subdomain, e)
+                raise
+        return tracked
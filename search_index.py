@@ -0,0 +1,283 @@
+import os
+import re
+import sys
+import time
+import json
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from date_normalizer import parse_duration, parse_timestamp
+from event_record import EventBatch, read_event_file
+from metrics import metrics
+from seen_index import event_key
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DB = os.environ.get("LIVEUAMAP_SEARCH_DB", "search_index.sqlite")
+SEARCH_INDEX = os.environ.get("LIVEUAMAP_SEARCH_INDEX", "0") != "0"
+
+# Event rows plus an external-content FTS5 table over `data`, kept in sync by triggers.
+# event_regions lists every region an event appeared in (see dedup), so a region filter
+# also finds incidents first stored under another region.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    region TEXT NOT NULL,
+    event_key TEXT NOT NULL,
+    time INTEGER,
+    time_precision TEXT,
+    date TEXT,
+    source_url TEXT,
+    data TEXT,
+    img_src TEXT,
+    location TEXT,
+    UNIQUE (region, event_key)
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE TABLE IF NOT EXISTS event_regions (
+    region TEXT NOT NULL,
+    event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+    PRIMARY KEY (region, event_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    data, content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, data) VALUES (new.id, new.data);
+END;
+CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, data) VALUES ('delete', old.id, old.data);
+END;
+CREATE TRIGGER IF NOT EXISTS events_au AFTER UPDATE OF data ON events WHEN old.data IS NOT new.data BEGIN
+    INSERT INTO events_fts (events_fts, rowid, data) VALUES ('delete', old.id, old.data);
+    INSERT INTO events_fts (rowid, data) VALUES (new.id, new.data);
+END;
+"""
+
+# The first normalized time is kept on re-scrapes, like the mongo-events sink does
+UPSERT_SQL = """
+INSERT INTO events (region, event_key, time, time_precision, date, source_url, data, img_src, location)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (region, event_key) DO UPDATE SET
+    date = excluded.date, source_url = excluded.source_url, data = excluded.data,
+    img_src = excluded.img_src, location = excluded.location,
+    time = coalesce(events.time, excluded.time),
+    time_precision = CASE WHEN events.time IS NULL THEN excluded.time_precision ELSE events.time_precision END
+RETURNING id
+"""
+
+_QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\S+')
+_BARE_TERM_RE = re.compile(r"^\w+\*?$")
+FTS_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def fts_query(text):
+    """`text` as an FTS5 query, quoting terms FTS5 would reject as syntax ('Red-Sea', 'U.S.').
+
+    Quoted phrases, AND/OR/NOT, prefix* terms and parentheses are left as written.
+    """
+    parts = []
+    for token in _QUERY_TOKEN_RE.findall(text):
+        if token in FTS_OPERATORS or (len(token) > 1 and token.startswith('"') and token.endswith('"')):
+            parts.append(token)
+            continue
+        opening = len(token) - len(token.lstrip("("))
+        closing = len(token) - len(token.rstrip(")"))
+        term = token[opening:len(token) - closing]
+        if term and not _BARE_TERM_RE.match(term):
+            term = '"' + term.replace('"', '""') + '"'
+        parts.append("(" * opening + term + ")" * closing)
+    return " ".join(parts)
+
+
+def _epoch(value):
+    moment = parse_timestamp(value)
+    return int(moment.timestamp()) if moment is not None else None
+
+
+def _format_epoch(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if seconds else None
+
+
+class SearchIndex:
+    """Full-text index over event text in one local SQLite file (FTS5), updated as batches are written.
+
+    add() upserts on (region, event key), so indexing the same events again
+    (a re-scrape, or re-importing a CSV) updates rows instead of duplicating
+    them. search() combines an FTS5 match with region and time filters.
+    """
+
+    def __init__(self, path=SEARCH_DB):
+        # Imported here so the scraper only loads SQLite when the index is enabled
+        import sqlite3
+
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Sinks call in from worker threads too (add_region); one connection behind a lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.execute("PRAGMA foreign_keys = ON")
+            self._db.executescript(SCHEMA)
+
+    def add(self, events, region=None, scraped_at=None):
+        """Index a batch of events in one transaction; returns how many were written.
+
+        Records without a normalized time (files from older versions) get one
+        from their date, anchored on `scraped_at`.
+        """
+        batch = EventBatch.of(events)
+        if not batch:
+            return 0
+        columns = batch.columns
+        times = batch.normalized_times(scraped_at)
+        rows = []
+        for idx, event in enumerate(batch):
+            time, time_precision = times[idx]
+            rows.append((
+                columns["region"][idx] or region or "unknown", event_key(event), _epoch(time), time_precision,
+                columns["date"][idx], columns["source_url"][idx], columns["data"][idx], columns["img_src"][idx],
+                columns["location"][idx],
+            ))
+        with metrics.timer("sink write", sink="search"), self._lock, self._db:
+            ids = [self._db.execute(UPSERT_SQL, row).fetchone()[0] for row in rows]
+            memberships = [(region_name, event_id)
+                           for event_id, row, regions in zip(ids, rows, columns["regions"])
+                           for region_name in set(regions or []) | {row[0]}]
+            self._db.executemany("INSERT OR IGNORE INTO event_regions (region, event_id) VALUES (?, ?)",
+                                 memberships)
+        return len(rows)
+
+    def add_region(self, region, key, other_region):
+        """The event indexed under (region, key) also appeared in other_region."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO event_regions (region, event_id) "
+                "SELECT ?, id FROM events WHERE region = ? AND event_key = ?",
+                (other_region, region, key),
+            )
+
+    def search(self, text=None, regions=None, start=None, end=None, limit=50, order="time"):
+        """Matching events, newest first (or best match first with order="rank").
+
+        `text` is an FTS5 query (words, "quoted phrases", prefix*, OR/NOT; see
+        fts_query); `start`/`end` bound the normalized event time as a half-open
+        window. Raises ValueError for a query FTS5 can't parse.
+        """
+        import sqlite3
+
+        clauses, params = [], []
+        source = "events e"
+        if text:
+            source = "events_fts JOIN events e ON e.id = events_fts.rowid"
+            clauses.append("events_fts MATCH ?")
+            params.append(fts_query(text))
+        if regions:
+            placeholders = ", ".join("?" for _ in regions)
+            clauses.append(f"e.id IN (SELECT event_id FROM event_regions WHERE region IN ({placeholders}))")
+            params.extend(regions)
+        if start is not None:
+            clauses.append("e.time >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            clauses.append("e.time < ?")
+            params.append(_epoch(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order_by = "bm25(events_fts)" if order == "rank" and text else "e.time DESC"
+        sql = (f"SELECT e.id, e.region, e.time, e.time_precision, e.date, e.source_url, e.data, e.img_src, "
+               f"e.location FROM {source} {where} ORDER BY {order_by} LIMIT ?")
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, params + [limit]).fetchall()
+            except sqlite3.OperationalError as e:
+                if "fts5" not in str(e):
+                    raise
+                raise ValueError(f"Invalid search query {text!r}: {e}") from e
+            results = []
+            for event_id, *fields in rows:
+                regions = [name for (name,) in self._db.execute(
+                    "SELECT region FROM event_regions WHERE event_id = ? ORDER BY region", (event_id,))]
+                event = dict(zip(["region", "time", "time_precision", "date", "source_url", "data", "img_src",
+                                  "location"], fields))
+                event["time"] = _format_epoch(event["time"])
+                event["regions"] = regions
+                results.append(event)
+        return results
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM events").fetchone()[0]
+
+    def optimize(self):
+        """Merge the FTS segments built up by many small incremental writes."""
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO events_fts (events_fts) VALUES ('optimize')")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over scraped events.")
+    parser.add_argument("--db", default=SEARCH_DB, help=f"index file (default: {SEARCH_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="index scraped CSV/JSONL files")
+    load.add_argument("paths", nargs="+")
+    load.add_argument("--region", help="region for rows that don't have one")
+    load.add_argument("--scraped-at", help="when the file was scraped, ISO UTC (default: the file's mtime)")
+
+    query = commands.add_parser("query", help="search event text")
+    query.add_argument("text", nargs="?", help='FTS5 query, e.g. \'houthi AND "bulk carrier"\' or drone*')
+    query.add_argument("--regions", help="comma-separated subdomains")
+    query.add_argument("--since", type=parse_duration, metavar="AGE", help="only events newer than this, e.g. 6h")
+    query.add_argument("--start", help="ISO UTC time, inclusive")
+    query.add_argument("--end", help="ISO UTC time, exclusive")
+    query.add_argument("--limit", type=int, default=20)
+    query.add_argument("--rank", action="store_true", help="best match first instead of newest first")
+    query.add_argument("--json", action="store_true", help="print JSON lines")
+
+    commands.add_parser("optimize", help="merge index segments after heavy writing")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.db)
+    try:
+        if args.command == "import":
+            for path in args.paths:
+                # Relative dates in files without a time column are read as of when the file was written
+                scraped_at = args.scraped_at or datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+                indexed = index.add(read_event_file(path), region=args.region, scraped_at=scraped_at)
+                print(f"{path}: {indexed} events")
+        elif args.command == "query":
+            start = args.start
+            if args.since:
+                start = datetime.now(timezone.utc) - args.since
+            started = time.perf_counter()
+            try:
+                results = index.search(args.text, args.regions.split(",") if args.regions else None, start,
+                                       args.end, limit=args.limit, order="rank" if args.rank else "time")
+            except ValueError as e:
+                parser.error(str(e))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for event in results:
+                if args.json:
+                    print(json.dumps(event, ensure_ascii=False))
+                else:
+                    print(f"{event['time'] or '?':20} {','.join(event['regions']):20} {event['data']}")
+            print(f"{len(results)} results in {elapsed_ms:.1f} ms", file=sys.stderr)
+        else:
+            index.optimize()
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,94 @@
+import os
+import json
+import hashlib
+import logging
+
+from event_record import LEGACY_MISSING
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = os.environ.get("LIVEUAMAP_STATE_DIR", ".liveuamap_state")
+INCREMENTAL = os.environ.get("LIVEUAMAP_INCREMENTAL", "1") != "0"
+# Stop walking the feed after this many already-seen events in a row
+KNOWN_RUN_LIMIT = int(os.environ.get("LIVEUAMAP_KNOWN_RUN_LIMIT", "5"))
+MAX_SEEN_PER_REGION = 5000
+
+
+def event_key(record):
+    """Stable key for an event: liveuamap DOM id, else source URL, else a hash of the text."""
+    event_id = record.get("event_id")
+    if event_id:
+        return f"id:{event_id}"
+    source_url = record.get("source_url")
+    if source_url and source_url != LEGACY_MISSING["source_url"]:
+        return f"url:{source_url}"
+    text = record.get("data") or ""
+    return "text:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SeenIndex:
+    """Per-region set of already scraped event keys, persisted as JSON under STATE_DIR/seen/."""
+
+    def __init__(self, region, state_dir=STATE_DIR, max_entries=MAX_SEEN_PER_REGION):
+        self.region = region
+        self.path = os.path.join(state_dir, "seen", f"{region}.json")
+        self.max_entries = max_entries
+        self._keys = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                keys = json.load(f).get("keys", [])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable seen index {self.path}: {e}")
+            return
+        # dict keeps insertion order, so the oldest keys are trimmed first
+        self._keys = dict.fromkeys(keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key):
+        self._keys.pop(key, None)
+        self._keys[key] = None
+
+    def save(self):
+        keys = list(self._keys)[-self.max_entries:]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"region": self.region, "keys": keys}, f)
+        os.replace(tmp_path, self.path)
+
+
+def mark_seen(region, events, state_dir=STATE_DIR):
+    """Add a region's events to its seen index; only call once they are stored, or they are never retried."""
+    seen = SeenIndex(region, state_dir)
+    for event in events:
+        seen.add(getattr(event, "seen_key", None) or event_key(event))
+    seen.save()
+
+
+def select_new_events(records, seen, known_run_limit=KNOWN_RUN_LIMIT):
+    """Return indexes of records not in `seen`, stopping at a run of known events.
+
+    The feed is newest-first, so once `known_run_limit` consecutive events are
+    already indexed everything below them was covered by an earlier run.
+    """
+    new_indexes = []
+    known_run = 0
+    for idx, record in enumerate(records):
+        if event_key(record) in seen:
+            known_run += 1
+            if known_run >= known_run_limit:
+                break
+            continue
+        known_run = 0
+        new_indexes.append(idx)
+    return new_indexes
@@ -0,0 +1,263 @@
+import os
+import logging
+import threading
+from datetime import datetime
+
+from event_record import EventBatch
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MONGO_URI = os.environ.get("LIVEUAMAP_MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB = os.environ.get("LIVEUAMAP_MONGO_DB", "liveuamap")
+CSV_PATH = "scraped_events.csv"
+JSONL_PATH = "scraped_events.jsonl"
+
+# --output choice -> sinks it opens
+OUTPUT_SINKS = {
+    "csv": ["csv"],
+    "jsonl": ["jsonl"],
+    "mongo": ["mongo"],
+    "mongo-events": ["mongo-events"],
+    "store": ["store"],
+    "both": ["csv", "mongo"],
+}
+
+_SINKS = {}
+_mongo_db = None
+_indexed_collections = set()
+_mongo_lock = threading.Lock()
+
+
+def register_sink(name):
+    """Decorator adding a sink class under `name`; it's only instantiated when selected."""
+    def decorator(cls):
+        _SINKS[name] = cls
+        return cls
+    return decorator
+
+
+def available_sinks():
+    return sorted(_SINKS)
+
+
+def mongo_db():
+    """The liveuamap database, connecting on first use rather than at import."""
+    global _mongo_db
+    with _mongo_lock:
+        if _mongo_db is None:
+            from pymongo import MongoClient
+
+            with metrics.timer("mongo connect"):
+                _mongo_db = MongoClient(MONGO_URI)[MONGO_DB]
+        return _mongo_db
+
+
+class Sink:
+    """Receives events one at a time as they are scraped and/or per region once it finishes.
+
+    write() gets single EventRecords; write_region() gets the region's events
+    as one EventBatch shared by every sink in the set.
+    """
+
+    def write(self, event):
+        pass
+
+    def write_region(self, subdomain, events):
+        pass
+
+    def flush(self):
+        pass
+
+    def add_region(self, canonical, region):
+        """A duplicate of an already written event turned up in `region` (see dedup.Entry)."""
+        pass
+
+    def on_streamed(self, callback):
+        """Have callback(events) called once events passed to write() are durably written."""
+        pass
+
+    def location(self, subdomain):
+        """Where this sink commits a region's events, for the run manifest."""
+        return None
+
+    def close(self):
+        pass
+
+
+@register_sink("csv")
+class CsvSink(Sink):
+    def __init__(self, path=CSV_PATH):
+        from stream_writer import StreamingWriter
+
+        self.writer = StreamingWriter(path, "csv")
+
+    def write(self, event):
+        self.writer.write(event)
+
+    def flush(self):
+        self.writer.flush()
+
+    def on_streamed(self, callback):
+        self.writer.on_written = callback
+
+    def location(self, subdomain):
+        return os.path.abspath(self.writer.path)
+
+    def close(self):
+        self.writer.close()
+
+
+@register_sink("jsonl")
+class JsonlSink(CsvSink):
+    def __init__(self, path=JSONL_PATH):
+        from stream_writer import StreamingWriter
+
+        self.writer = StreamingWriter(path, "jsonl")
+
+
+@register_sink("mongo")
+class ScrapeDocumentSink(Sink):
+    """Original layout: one document per scrape time per region collection, events in an array."""
+
+    def write_region(self, subdomain, events):
+        if events:
+            store_scrape_document(events, subdomain.lower())
+
+    def location(self, subdomain):
+        return f"mongodb:{MONGO_DB}.{subdomain.lower()}"
+
+
+@register_sink("mongo-events")
+class MongoEventsSink(Sink):
+    """One upserted document per event (see mongo_sink.MongoEventSink)."""
+
+    def __init__(self):
+        from mongo_sink import MongoEventSink
+
+        self.sink = MongoEventSink(mongo_db())
+
+    def write_region(self, subdomain, events):
+        self.sink.write(events, region=subdomain)
+
+    def add_region(self, canonical, region):
+        self.sink.add_region(canonical.region, canonical.event_key, region)
+
+    def location(self, subdomain):
+        return f"mongodb:{MONGO_DB}.{self.sink.collection.name}"
+
+    def close(self):
+        totals = self.sink.totals
+        logger.info(f"✅ Mongo events: {totals['inserted']} inserted, {totals['updated']} updated, "
+                    f"{totals['duplicates']} duplicates, {totals['errors']} errors.")
+
+
+@register_sink("store")
+class EventStoreSink(Sink):
+    """Columnar NumPy store partitioned by region and day (see event_store.EventStore)."""
+
+    def __init__(self):
+        from event_store import EventStore
+
+        self.store = EventStore()
+
+    def write_region(self, subdomain, events):
+        self.store.append(events, region=subdomain)
+
+    def location(self, subdomain):
+        return os.path.abspath(os.path.join(self.store.root, f"region={subdomain}"))
+
+
+@register_sink("search")
+class SearchIndexSink(Sink):
+    """SQLite FTS5 index over event text (see search_index.SearchIndex), updated per region."""
+
+    def __init__(self):
+        from search_index import SearchIndex
+
+        self.index = SearchIndex()
+
+    def write_region(self, subdomain, events):
+        self.index.add(events, region=subdomain)
+
+    def add_region(self, canonical, region):
+        self.index.add_region(canonical.region, canonical.event_key, region)
+
+    def location(self, subdomain):
+        return os.path.abspath(self.index.path)
+
+    def close(self):
+        self.index.close()
+
+
+def store_scrape_document(event_data_list, collection_name):
+    scrape_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    collection = mongo_db()[collection_name]
+    if collection_name not in _indexed_collections:
+        # Multikey index over the embedded events' normalized times
+        collection.create_index("events.time", name="events_time")
+        _indexed_collections.add(collection_name)
+    event_data_list = EventBatch.of(event_data_list).documents(exclude=("regions",))
+    with metrics.timer("sink write", sink="mongo"):
+        existing_document = collection.find_one({"scrape_time": scrape_time})
+
+        if existing_document:
+            collection.update_one(
+                {"scrape_time": scrape_time},
+                {"$push": {"events": {"$each": event_data_list}}}
+            )
+            logger.info(f"Updated existing document with scrape time {scrape_time}.")
+        else:
+            collection.insert_one({
+                "scrape_time": scrape_time,
+                "events": event_data_list
+            })
+            logger.info(f"Inserted new document with scrape time {scrape_time}.")
+
+
+class SinkSet:
+    """The sinks one run writes to, created only for the names passed in."""
+
+    def __init__(self, names):
+        self.sinks = []
+        for name in names:
+            if name not in _SINKS:
+                raise ValueError(f"Unknown sink: {name} (available: {', '.join(available_sinks())})")
+            self.sinks.append(_SINKS[name]())
+
+    @classmethod
+    def for_output(cls, output_choice, extra=()):
+        """Sinks for an --output choice, plus any `extra` sink names (e.g. "search")."""
+        return cls(OUTPUT_SINKS[output_choice] + [name for name in extra if name not in OUTPUT_SINKS[output_choice]])
+
+    def write(self, event):
+        for sink in self.sinks:
+            sink.write(event)
+
+    def write_region(self, subdomain, events):
+        # Columnar once, however many sinks serialize it
+        batch = EventBatch.of(events)
+        for sink in self.sinks:
+            sink.write_region(subdomain, batch)
+
+    def add_region(self, canonical, region):
+        for sink in self.sinks:
+            sink.add_region(canonical, region)
+
+    def on_streamed(self, callback):
+        for sink in self.sinks:
+            sink.on_streamed(callback)
+
+    def commit(self, subdomain, events):
+        """Write a finished region's batch, flush streamed rows and return where they now live."""
+        self.write_region(subdomain, events)
+        for sink in self.sinks:
+            sink.flush()
+        return [location for location in (sink.location(subdomain) for sink in self.sinks) if location]
+
+    def close(self):
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"❌ Failed to close {type(sink).__name__}: {e}")
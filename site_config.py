@@ -0,0 +1,14 @@
+import os
+
+# Where region pages and the home page (with the region modal) are served from.
+# Pointed at the local fixture server for offline runs and benchmarks.
+REGION_URL_TEMPLATE = os.environ.get("LIVEUAMAP_REGION_URL", "https://{subdomain}.liveuamap.com/")
+HOME_URL = os.environ.get("LIVEUAMAP_HOME_URL", "https://liveuamap.com")
+
+
+def region_url(subdomain):
+    return REGION_URL_TEMPLATE.format(subdomain=subdomain)
+
+
+def home_url():
+    return HOME_URL
@@ -0,0 +1,155 @@
+import os
+import csv
+import logging
+import threading
+import time
+from datetime import datetime
+
+from event_record import FILE_FIELDS, EventBatch
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = int(os.environ.get("LIVEUAMAP_FLUSH_EVERY", "25"))
+FLUSH_INTERVAL = float(os.environ.get("LIVEUAMAP_FLUSH_INTERVAL", "5"))
+# 0 disables the corresponding rotation trigger
+ROTATE_BYTES = int(os.environ.get("LIVEUAMAP_ROTATE_BYTES", "0"))
+ROTATE_SECONDS = float(os.environ.get("LIVEUAMAP_ROTATE_SECONDS", "0"))
+
+FORMATS = ("csv", "jsonl")
+
+
+class StreamingWriter:
+    """Appends events to a CSV or JSONL file as they are produced.
+
+    Rows are buffered for at most `flush_every` events or `flush_interval`
+    seconds, then written, flushed and fsynced, so a crash loses at most one
+    small batch. The file is rotated to `<name>.<timestamp><ext>` once it
+    exceeds `rotate_bytes` or has been open for `rotate_seconds`.
+    `on_written(events)` is called after each batch is fsynced.
+    """
+
+    def __init__(self, path, fmt=None, fieldnames=None, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL,
+                 rotate_bytes=ROTATE_BYTES, rotate_seconds=ROTATE_SECONDS, on_written=None):
+        self.path = path
+        self.fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unsupported output format: {self.fmt}")
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.on_written = on_written
+        self.written = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._opened_at = None
+        self._last_flush = time.monotonic()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if self.fmt == "csv" and not is_new and self.fieldnames is None:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None) or []
+            missing = [field for field in FILE_FIELDS if field not in header]
+            if missing:
+                # Written before those columns existed; appending under its header would drop them
+                rotated = self._rotated_path()
+                os.replace(self.path, rotated)
+                logger.warning(f"⚠️ {self.path} has no {', '.join(missing)} columns; moved it to {rotated} "
+                               f"and starting a new file.")
+                is_new = True
+            else:
+                # Keep appending under the header the file already has
+                self.fieldnames = header
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._opened_at = time.monotonic()
+        self._needs_header = self.fmt == "csv" and is_new
+
+    def _rotate_if_needed(self):
+        if self._file is None:
+            return
+        too_big = self.rotate_bytes and self._file.tell() >= self.rotate_bytes
+        too_old = self.rotate_seconds and time.monotonic() - self._opened_at >= self.rotate_seconds
+        if not (too_big or too_old):
+            return
+        self._file.close()
+        self._file = None
+        rotated = self._rotated_path()
+        os.replace(self.path, rotated)
+        logger.info(f"🔄 Rotated {self.path} → {rotated}")
+
+    def _rotated_path(self):
+        stem, ext = os.path.splitext(self.path)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        rotated = f"{stem}.{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(rotated):
+            rotated = f"{stem}.{stamp}-{suffix}{ext}"
+            suffix += 1
+        return rotated
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        with metrics.timer("sink write", sink=self.fmt):
+            self._write_records()
+        if self.on_written is not None:
+            self.on_written(self._buffer)
+        self.written += len(self._buffer)
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _write_records(self):
+        self._rotate_if_needed()
+        if self._file is None:
+            self._open()
+
+        # Serialized column by column; missing fields are empty CSV cells / JSON nulls
+        batch = EventBatch(self._buffer)
+        if self.fmt == "csv":
+            if self.fieldnames is None:
+                self.fieldnames = list(FILE_FIELDS)
+            writer = csv.writer(self._file)
+            if self._needs_header:
+                writer.writerow(self.fieldnames)
+                self._needs_header = False
+            writer.writerows(batch.rows(self.fieldnames, flat=True))
+        else:
+            self._file.write("\n".join(batch.jsonl_lines()) + "\n")
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def write(self, event):
+        with self._lock:
+            self._buffer.append(event)
+            if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._write_buffer()
+
+    def write_many(self, events):
+        for event in events:
+            self.write(event)
+
+    def flush(self):
+        with self._lock:
+            self._write_buffer()
+
+    def close(self):
+        with self._lock:
+            self._write_buffer()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logger.info(f"✅ Streamed {self.written} events to {self.fmt.upper()}: {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The scraper modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def fixture_site():
+    """Base URL of the offline fixture site, with the scrapers' URL helpers pointed at it."""
+    from fixture_server import start_fixture_server, use_fixture_site
+
+    server, base_url = start_fixture_server()
+    use_fixture_site(base_url)
+    yield base_url
+    server.shutdown()
@@ -0,0 +1,38 @@
+import pytest
+
+from coordinates import format_coordinates, parse_coordinates
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Marker popup, degrees and minutes
+    ("14°20′N 42°17′E", (14 + 20 / 60, 42 + 17 / 60)),
+    # Seconds, ASCII marks, longitude first
+    ("42°17'30\"E 14°20'N", (14 + 20 / 60, 42 + 17 / 60 + 30 / 3600)),
+    ("33°51′S 151°12′E", (-(33 + 51 / 60), 151 + 12 / 60)),
+    ("40°43′N 74°0′W", (40 + 43 / 60, -74.0)),
+    ("22°54′S 43°10′W", (-(22 + 54 / 60), -(43 + 10 / 60))),
+    ("14.5°N 42.25°E", (14.5, 42.25)),
+    # data-ll and other decimal pairs
+    ("14.3333,42.2833", (14.3333, 42.2833)),
+    ("-33.86, 151.21", (-33.86, 151.21)),
+    ("14.3333 42.2833", (14.3333, 42.2833)),
+    ("33.86S 151.21E", (-33.86, 151.21)),
+    ("40.71N 74.01W", (40.71, -74.01)),
+])
+def test_parse_coordinates(text, expected):
+    assert parse_coordinates(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", [
+    None, "", "Location not found", "Aden, Yemen",
+    # Two latitudes, or out of range
+    "14°20′N 42°17′N", "95.0,10.0", "10.0,190.0",
+])
+def test_not_coordinates(text):
+    assert parse_coordinates(text) is None
+
+
+def test_format_round_trips_to_the_arc_minute():
+    lat, lon = -22.9068, -43.1729
+    assert format_coordinates(lat, lon) == "22°54′S 43°10′W"
+    assert parse_coordinates(format_coordinates(lat, lon)) == pytest.approx((lat, lon), abs=1 / 60)
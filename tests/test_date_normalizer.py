@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from date_normalizer import normalize_date, normalize_event_time, parse_timestamp, truncate
+
+# A Saturday, mid-morning
+SCRAPED_AT = datetime(2025, 7, 12, 10, 37, 42, tzinfo=timezone.utc)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("text, moment, precision", [
+    ("just now", utc(2025, 7, 12, 10, 37), "minute"),
+    ("30 seconds ago", utc(2025, 7, 12, 10, 37, 12), "second"),
+    ("5 minutes ago", utc(2025, 7, 12, 10, 32), "minute"),
+    ("an hour ago", utc(2025, 7, 12, 9), "hour"),
+    ("11 hours ago", utc(2025, 7, 11, 23), "hour"),
+    ("a day ago", utc(2025, 7, 11), "day"),
+    ("yesterday", utc(2025, 7, 11), "day"),
+    ("4 days ago", utc(2025, 7, 8), "day"),
+    ("one week ago", utc(2025, 6, 30), "week"),
+    ("2 weeks ago", utc(2025, 6, 23), "week"),
+    ("a month ago", utc(2025, 6, 1), "month"),
+    ("3 months ago", utc(2025, 4, 1), "month"),
+    ("a year ago", utc(2024, 1, 1), "year"),
+    ("  4 Days  Ago ", utc(2025, 7, 8), "day"),
+])
+def test_relative_dates_truncate_to_their_unit(text, moment, precision):
+    assert normalize_date(text, scraped_at=SCRAPED_AT) == (moment, precision)
+
+
+def test_repeated_reads_agree():
+    later = SCRAPED_AT.replace(hour=11, minute=58)
+    assert normalize_date("4 days ago", scraped_at=SCRAPED_AT) == normalize_date("4 days ago", scraped_at=later)
+
+
+@pytest.mark.parametrize("text, exact, moment", [
+    # An exact page timestamp beats the text
+    ("4 days ago", "1752141600", utc(2025, 7, 10, 10)),
+    # Milliseconds, as Date.now() writes them
+    ("4 days ago", "1752141600000", utc(2025, 7, 10, 10)),
+    ("2025-07-10T12:30:00+02:00", None, utc(2025, 7, 10, 10, 30)),
+    ("2025-07-10 10:30", None, utc(2025, 7, 10, 10, 30)),
+])
+def test_exact_dates(text, exact, moment):
+    assert normalize_date(text, exact, SCRAPED_AT) == (moment, "exact")
+
+
+@pytest.mark.parametrize("text", [None, "", "Date not found", "sometime last week", "4 fortnights ago"])
+def test_unreadable_dates(text):
+    assert normalize_date(text, scraped_at=SCRAPED_AT) == (None, None)
+
+
+@pytest.mark.parametrize("unit, moment", [
+    ("second", utc(2025, 7, 12, 10, 37, 42)),
+    ("minute", utc(2025, 7, 12, 10, 37)),
+    ("hour", utc(2025, 7, 12, 10)),
+    ("day", utc(2025, 7, 12)),
+    # Weeks start on Monday
+    ("week", utc(2025, 7, 7)),
+    ("month", utc(2025, 7, 1)),
+    ("year", utc(2025, 1, 1)),
+])
+def test_truncate(unit, moment):
+    assert truncate(SCRAPED_AT.replace(microsecond=123456), unit) == moment
+
+
+def test_truncate_week_across_month_and_year():
+    assert truncate(utc(2025, 1, 1, 15), "week") == utc(2024, 12, 30)
+    assert truncate(utc(2025, 6, 2), "week") == utc(2025, 6, 2)
+
+
+def test_event_time_strings():
+    assert normalize_event_time("4 days ago", scraped_at=SCRAPED_AT) == ("2025-07-08T00:00:00Z", "day")
+    assert normalize_event_time("Date not found", scraped_at=SCRAPED_AT) == (None, None)
+    assert parse_timestamp("2025-07-08T00:00:00Z") == utc(2025, 7, 8)
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import dynamic_scraper
+import http_tier
+import sinks
+from run_manifest import DONE, FAILED, RunManifest
+
+
+class FlakySink(sinks.Sink):
+    """Batch sink whose first `failures` commits raise."""
+
+    failures = 0
+    committed = []
+
+    def write_region(self, subdomain, events):
+        if FlakySink.failures:
+            FlakySink.failures -= 1
+            raise OSError("store unavailable")
+        FlakySink.committed.extend((subdomain, event["source_url"]) for event in events)
+
+
+@pytest.fixture
+def flaky_store(fixture_site, tmp_path, monkeypatch):
+    # Run manifests, seen indexes and metrics all live under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(sinks._SINKS, "store", FlakySink)
+    monkeypatch.setattr(http_tier, "throttle", lambda url: 0.0)
+    monkeypatch.setattr(FlakySink, "committed", [])
+    return FlakySink
+
+
+def scrape(*args):
+    dynamic_scraper.main(["--output", "store", "--tier", "http", "--no-dedup", *args])
+    return RunManifest.find()
+
+
+def test_failed_commit_is_retried_in_the_same_run(flaky_store):
+    flaky_store.failures = 1
+    manifest = scrape("--regions", "pirates", "--retries", "1")
+
+    assert manifest.regions["pirates"]["status"] == DONE
+    assert manifest.regions["pirates"]["attempts"] == 2
+    assert len(flaky_store.committed) == 20
+
+
+def test_resume_redelivers_a_region_whose_commit_failed(flaky_store):
+    flaky_store.failures = 1
+    manifest = scrape("--regions", "pirates", "--retries", "0")
+    assert manifest.regions["pirates"]["status"] == FAILED
+    assert flaky_store.committed == []
+
+    manifest = scrape("--resume", manifest.run_id)
+    assert manifest.regions["pirates"]["status"] == DONE
+    assert len(set(flaky_store.committed)) == 20
+
+    # Stored now, so the next run has nothing new
+    scrape("--regions", "pirates")
+    assert len(flaky_store.committed) == 20
+    with open(".liveuamap_state/seen/pirates.json", encoding="utf-8") as f:
+        assert len(json.load(f)["keys"]) == 20
@@ -0,0 +1,27 @@
+import os
+
+from event_parser import parse_events_file
+from event_record import read_event_file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCROLLER_FIXTURE = os.path.join(HERE, "fixtures", "pirates_scroller.html")
+CAPTURED_EVENTS = os.path.join(HERE, "fixtures", "captured_events.csv")
+BASE_URL = "https://pirates.liveuamap.com/"
+
+
+def test_saved_scroller_matches_captured_events():
+    parsed = parse_events_file(SCROLLER_FIXTURE, base_url=BASE_URL, region="pirates")
+    # Same events, in feed order, as the browser run captured in captured_events.csv
+    captured = read_event_file(CAPTURED_EVENTS)[:len(parsed)]
+
+    assert len(parsed) == 6
+    for event, row in zip(parsed, captured):
+        assert event["event_id"].startswith("post-")
+        assert event["timestamp"] is None
+        for field in ("region", "date", "source_url", "data", "img_src"):
+            assert event[field] == row[field], field
+
+
+def test_events_outside_the_feed_are_ignored():
+    parsed = parse_events_file(SCROLLER_FIXTURE, base_url=BASE_URL)
+    assert "Advertisement" not in [event["data"] for event in parsed]
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from event_record import EventRecord
+from event_store import EventStore
+
+SCRAPED_AT = datetime(2025, 7, 12, 10, 0, tzinfo=timezone.utc)
+
+
+def event(n, lat=None, lon=None, time=None, date=None, location=None, region="pirates"):
+    return EventRecord(region=region, date=date, time=time, time_precision="exact" if time else None,
+                       source_url=f"https://example.com/{n}", data=f"Event {n}", location=location, lat=lat, lon=lon)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventStore(str(tmp_path / "store"))
+    store.append([
+        event("aden", 12.8, 45.0, "2025-07-10T08:00:00Z"),
+        event("hodeidah", 14.8, 42.95, "2025-07-11T08:00:00Z"),
+        event("suez", 29.97, 32.55, "2025-07-11T20:00:00Z", region="egypt"),
+        event("fiji", -17.7, 178.0, "2025-07-11T09:00:00Z", region="pacific"),
+        event("samoa", -13.8, -171.8, "2025-07-11T10:00:00Z", region="pacific"),
+        event("nowhere", time="2025-07-11T12:00:00Z"),
+    ], scraped_at=SCRAPED_AT)
+    return store
+
+
+def found(store, **kwargs):
+    return sorted(event["data"].split()[1] for event in store.query(**kwargs))
+
+
+def test_bbox(store):
+    # Red Sea; the event without coordinates never matches a box
+    assert found(store, bbox=(12, 32, 30, 44)) == ["hodeidah", "suez"]
+    assert store.count(bbox=(12, 32, 30, 46)) == 3
+
+
+def test_bbox_across_the_antimeridian(store):
+    assert found(store, bbox=(-20, 170, -10, -170)) == ["fiji", "samoa"]
+    assert found(store, bbox=(-20, 179, -10, -170)) == ["samoa"]
+
+
+def test_time_window_is_half_open(store):
+    assert found(store, start="2025-07-11T08:00:00Z", end="2025-07-11T10:00:00Z") == ["fiji", "hodeidah"]
+    assert found(store, end="2025-07-11T00:00:00Z") == ["aden"]
+    assert found(store, start="2025-07-11T12:00:00Z", bbox=(12, 32, 30, 44)) == ["suez"]
+
+
+def test_regions(store):
+    assert found(store, regions=["pacific", "egypt"]) == ["fiji", "samoa", "suez"]
+    assert store.arrays(regions=["pacific"])["lon"].tolist() == [178.0, -171.8]
+
+
+def test_older_records_get_a_normalized_time_and_precision(tmp_path):
+    store = EventStore(str(tmp_path / "store"))
+    # As read back from a CSV written before times were normalized: a date and a location only
+    records = [event("old", date="4 days ago", location="14°20′N 42°17′E"), event("undated")]
+    store.append(records, scraped_at=SCRAPED_AT)
+
+    by_name = {event["data"]: event for event in store.query()}
+    assert by_name["Event old"]["time"] == "2025-07-08T00:00:00Z"
+    assert by_name["Event old"]["time_precision"] == "day"
+    assert by_name["Event old"]["lat"] == pytest.approx(14 + 20 / 60)
+    # No date at all: filed under when it was scraped
+    assert by_name["Event undated"]["time"] == "2025-07-12T10:00:00Z"
+    assert by_name["Event undated"]["time_precision"] is None
+    # The caller's records are left as they were
+    assert records[0].time is None
+
+
+def test_compaction_keeps_every_event(store):
+    for n in range(3):
+        store.append([event(f"extra{n}", 12.9, 45.1, "2025-07-10T09:00:00Z")], scraped_at=SCRAPED_AT)
+    store.compact()
+    assert found(store, start="2025-07-10", end="2025-07-11") == ["aden", "extra0", "extra1", "extra2"]
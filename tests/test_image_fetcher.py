@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+import pytest
+
+from event_record import EventRecord
+from fixture_server import PIXEL
+from image_fetcher import ImageFetcher
+
+
+def events_for(base_url, names):
+    return [EventRecord(region="pirates", source_url=f"https://example.com/{n}", img_src=f"{base_url}/pics/{name}")
+            for n, name in enumerate(names)]
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = ImageFetcher(cache_dir=str(tmp_path / "images"), workers=4)
+    yield fetcher
+    fetcher.close()
+
+
+def test_downloads_concurrently_and_fills_events(fixture_site, fetcher):
+    request = fetcher.http.request
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_request(*args, **kwargs):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        try:
+            time.sleep(0.05)
+            return request(*args, **kwargs)
+        finally:
+            with lock:
+                active.pop()
+
+    fetcher.http.request = slow_request
+    events = events_for(fixture_site, [f"{n}.gif" for n in range(8)])
+    written = []
+    for event in events:
+        assert fetcher.submit(event, then=written.append) is not None
+    assert fetcher.wait(timeout=10)
+
+    assert max(peak) > 1
+    # then() ran once per event, as each image landed
+    assert len(written) == len(events)
+    for event in events:
+        assert event["img_path"].startswith(fetcher.cache_dir)
+        with open(event["img_path"], "rb") as f:
+            assert f.read() == PIXEL
+
+
+def test_same_bytes_are_stored_once(fixture_site, fetcher):
+    # Every /pics/ URL on the fixture site serves the same pixel
+    events = events_for(fixture_site, ["a.gif", "b.gif", "a.gif"])
+    fetcher.submit_many(events)
+    fetcher.wait(timeout=10)
+
+    assert len({event["img_sha256"] for event in events}) == 1
+    assert len({event["img_path"] for event in events}) == 1
+    stored = [name for _, _, files in os.walk(fetcher.cache_dir) for name in files if name.endswith(".gif")]
+    assert len(stored) == 1
+    # One download per distinct URL: the second is content-deduplicated
+    assert fetcher.stats["downloaded"] == 1
+    assert fetcher.stats["deduplicated"] == 1
+
+
+def test_cached_url_skips_the_network(fixture_site, fetcher):
+    [first] = events_for(fixture_site, ["a.gif"])
+    fetcher.submit(first)
+    fetcher.wait(timeout=10)
+    fetcher.save_index()
+
+    again = ImageFetcher(cache_dir=fetcher.cache_dir)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("cached image was fetched again")
+
+    again.http.request = no_network
+    [event] = events_for(fixture_site, ["a.gif"])
+    written = []
+    # Filled in synchronously from the URL index
+    assert again.submit(event, then=written.append) is None
+    again.close()
+
+    assert written == [event]
+    assert again.stats["cached"] == 1
+    assert (event["img_sha256"], event["img_path"]) == (first["img_sha256"], first["img_path"])
+
+
+def test_events_without_an_image(fetcher):
+    event = EventRecord(region="pirates", img_src=None)
+    fetcher.submit(event)
+    assert event["img_sha256"] is None and event["img_path"] is None
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("pymongo")
+
+from event_record import EventRecord
+from mongo_sink import MongoEventSink
+from seen_index import event_key
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def event(n, region="pirates", time="2025-07-10T12:00:00Z", data=None):
+    return EventRecord(region=region, date="4 days ago", time=time, time_precision="day",
+                       source_url=f"https://example.com/post/{n}", data=data or f"Event {n}")
+
+
+@pytest.fixture
+def sink():
+    return MongoEventSink(mongomock.MongoClient().db, batch_size=2)
+
+
+def test_upserts_on_region_and_event_key(sink):
+    events = [event(1), event(2)]
+    sink.write(events)
+
+    docs = {(doc["region"], doc["event_key"]): doc for doc in sink.collection.find()}
+    assert set(docs) == {("pirates", event_key(e)) for e in events}
+    assert docs["pirates", event_key(events[0])]["regions"] == ["pirates"]
+    unique = [index for index in sink.collection.index_information().values() if index.get("unique")]
+    assert [index["key"] for index in unique] == [[("region", 1), ("event_key", 1)]]
+
+
+def test_counts_per_batch(sink):
+    sink.ensure_indexes()
+    assert sink.write_batch([event(1), event(2)]) == {"inserted": 2, "updated": 0, "duplicates": 0, "errors": 0}
+    # Unchanged events are duplicates, changed ones updates
+    counts = sink.write_batch([event(1), event(2, data="Event 2, corrected"), event(3)])
+    assert counts == {"inserted": 1, "updated": 1, "duplicates": 1, "errors": 0}
+    assert sink.totals == {"inserted": 3, "updated": 1, "duplicates": 1, "errors": 0}
+
+
+def test_unique_index_violations_count_as_duplicates(sink):
+    sink.ensure_indexes()
+    # Stands in for two workers racing to insert the same event: the second insert breaks a unique index
+    sink.collection.create_index("source_url", unique=True)
+    counts = sink.write_batch([event(1), event(1, region="yemen"), event(2)])
+    assert counts == {"inserted": 2, "updated": 0, "duplicates": 1, "errors": 0}
+    assert sink.collection.count_documents({}) == 2
+
+
+def test_first_time_is_kept_on_upsert(sink):
+    sink.write([event(1, time="2025-07-10T12:00:00Z")])
+    sink.write([event(1, time="2025-07-11T00:00:00Z", data="Event 1, edited")])
+
+    doc = sink.collection.find_one()
+    # Stored as a BSON date, which comes back naive UTC
+    assert doc["time"] == datetime(2025, 7, 10, 12)
+    assert doc["data"] == "Event 1, edited"
+
+
+def test_find_between(sink):
+    sink.write([
+        event(1, time="2025-07-10T06:00:00Z"),
+        event(2, time="2025-07-10T12:00:00Z"),
+        event(3, time="2025-07-10T18:00:00Z", region="yemen"),
+        event(4, time="2025-07-11T00:00:00Z"),
+    ])
+
+    def found(**kwargs):
+        return [doc["data"] for doc in sink.find_between(**kwargs)]
+
+    assert found(start=utc(2025, 7, 10, 12), end=utc(2025, 7, 11)) == ["Event 3", "Event 2"]
+    assert found(start=utc(2025, 7, 10, 12), regions=["pirates"]) == ["Event 4", "Event 2"]
+    assert found(end=utc(2025, 7, 10, 12)) == ["Event 1"]
+    assert len(found()) == 4
@@ -0,0 +1,32 @@
+import logging
+
+from region_catalog import needs_catalog, select_regions
+
+CATALOG = [
+    {"name": "Pirates", "subdomain": "pirates", "parent": None},
+    {"name": "Yemen", "subdomain": "yemen", "parent": "Middle East"},
+    {"name": "Israel", "subdomain": "israel", "parent": "Middle East"},
+]
+
+
+def test_select_by_subdomain_name_and_index():
+    assert select_regions(CATALOG, "Yemen, pirates,3,yemen") == ["yemen", "pirates", "israel"]
+    assert select_regions(CATALOG, "all") == ["pirates", "yemen", "israel"]
+
+
+def test_unknown_subdomain_warns_against_a_catalog(caplog):
+    with caplog.at_level(logging.WARNING, logger="region_catalog"):
+        assert select_regions(CATALOG, "pirates,china") == ["pirates", "china"]
+    assert "'china' is not in the region catalog" in caplog.text
+
+
+def test_subdomains_pass_through_without_a_catalog(caplog):
+    with caplog.at_level(logging.WARNING, logger="region_catalog"):
+        assert select_regions([], "Pirates,china") == ["pirates", "china"]
+    assert caplog.text == ""
+
+
+def test_needs_catalog():
+    assert not needs_catalog("pirates,yemen")
+    assert needs_catalog("all")
+    assert needs_catalog("pirates,2")
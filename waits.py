@@ -0,0 +1,142 @@
+import os
+import logging
+import threading
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds only: every wait returns as soon as its condition holds
+DEFAULT_TIMEOUT = float(os.environ.get("LIVEUAMAP_WAIT_TIMEOUT", "10"))
+POLL_INTERVAL = float(os.environ.get("LIVEUAMAP_WAIT_POLL", "0.1"))
+SETTLE_QUIET = 0.15
+NETWORK_QUIET = 0.5
+
+# Layout box of the element (or body), number of running CSS/Web animations and DOM size
+SETTLED_JS = """
+var el = arguments[0] || document.body;
+var r = el.getBoundingClientRect();
+var running = document.getAnimations ? document.getAnimations().filter(function (a) { return a.playState === "running"; }).length : 0;
+return [Math.round(r.top), Math.round(r.left), Math.round(r.width), Math.round(r.height), running, document.getElementsByTagName("*").length];
+"""
+
+NETWORK_JS = """
+var entries = window.performance && performance.getEntriesByType ? performance.getEntriesByType("resource").length : 0;
+return [entries, document.readyState];
+"""
+
+
+class WaitStats:
+    """Collects how long each named wait actually took, so the wait budget is visible."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, elapsed, timed_out=False):
+        with self._lock:
+            entry = self._stats.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+            entry["count"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            if timed_out:
+                entry["timeouts"] += 1
+
+    def summary(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        total = sum(entry["total"] for entry in summary.values())
+        logger.info(f"⏱️ Total time spent waiting: {total:.1f}s")
+        for name, entry in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+            logger.info(
+                f"⏱️ {name}: {entry['count']} waits, {entry['total']:.2f}s total, "
+                f"{entry['max']:.2f}s max, {entry['timeouts']} timeouts"
+            )
+
+
+wait_stats = WaitStats()
+
+
+def wait_until(driver, condition, name, timeout=DEFAULT_TIMEOUT, raise_on_timeout=True):
+    """WebDriverWait.until() that records the time it took under `name`."""
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        wait_stats.record(name, time.perf_counter() - start, timed_out=True)
+        if raise_on_timeout:
+            raise
+        return None
+    wait_stats.record(name, time.perf_counter() - start)
+    return result
+
+
+def wait_for_page_ready(driver, timeout=DEFAULT_TIMEOUT):
+    return wait_until(
+        driver, lambda d: d.execute_script("return document.readyState") == "complete", "page ready", timeout
+    )
+
+
+def wait_for_element(driver, locator, name=None, timeout=DEFAULT_TIMEOUT, clickable=False, raise_on_timeout=True):
+    condition = EC.element_to_be_clickable(locator) if clickable else EC.presence_of_element_located(locator)
+    return wait_until(driver, condition, name or f"element {locator[1]}", timeout, raise_on_timeout)
+
+
+def wait_for_elements(driver, locator, name=None, timeout=DEFAULT_TIMEOUT, raise_on_timeout=True):
+    return wait_until(
+        driver, EC.presence_of_all_elements_located(locator), name or f"elements {locator[1]}", timeout, raise_on_timeout
+    )
+
+
+def _wait_for_stable(driver, script, args, name, quiet, timeout, ready=None):
+    start = time.perf_counter()
+    last = None
+    stable_since = start
+    while True:
+        try:
+            signature = driver.execute_script(script, *args)
+        except WebDriverException:
+            signature = None
+
+        now = time.perf_counter()
+        if signature is not None and signature == last and (ready is None or ready(signature)):
+            if now - stable_since >= quiet:
+                wait_stats.record(name, now - start)
+                return True
+        else:
+            last = signature
+            stable_since = now
+
+        if now - start >= timeout:
+            wait_stats.record(name, now - start, timed_out=True)
+            return False
+        time.sleep(POLL_INTERVAL)
+
+
+def wait_for_dom_settled(driver, element=None, name="dom settled", quiet=SETTLE_QUIET, timeout=2):
+    """Wait until the element's box and the DOM size stop changing and no animation is running."""
+    return _wait_for_stable(driver, SETTLED_JS, [element], name, quiet, timeout, ready=lambda sig: sig[4] == 0)
+
+
+def wait_for_network_idle(driver, name="network idle", quiet=NETWORK_QUIET, timeout=5):
+    """Wait until the page is complete and no new resource has loaded for `quiet` seconds."""
+    return _wait_for_stable(driver, NETWORK_JS, [], name, quiet, timeout, ready=lambda sig: sig[1] == "complete")
+
+
+def backoff(name, attempt, base=0.25, cap=2.0):
+    """Retry delay that grows with the attempt number instead of a fixed sleep."""
+    delay = min(cap, base * (2 ** attempt))
+    time.sleep(delay)
+    wait_stats.record(name, delay)
+    return delay